@@ -23,6 +23,7 @@ from app.helper.module import ModuleHelper
 from app.helper.sites import SitesHelper
 from app.log import logger
 from app.plugins import _PluginBase
+from app.plugins.autosignin.sites import SiteSigninHandlerIndex, site_sessions
 from app.schemas.types import EventType, NotificationType
 from app.utils.http import RequestUtils
 from app.utils.site import SiteUtils
@@ -61,6 +62,8 @@ class AutoSignIn(_PluginBase):
     _scheduler: Optional[BackgroundScheduler] = None
     # 加载的模块
     _site_schema: list = []
+    # 签到类索引
+    _site_handlers: Optional[SiteSigninHandlerIndex] = None
 
     # 配置属性
     _enabled: bool = False
@@ -112,6 +115,7 @@ class AutoSignIn(_PluginBase):
 
             self._site_schema = ModuleHelper.load('app.plugins.autosignin.sites',
                                                   filter_func=lambda _, obj: hasattr(obj, 'match'))
+            self._site_handlers = SiteSigninHandlerIndex(self._site_schema)
 
             # 立即运行一次
             if self._onlyonce:
@@ -731,12 +735,16 @@ class AutoSignIn(_PluginBase):
 
         # 执行签到
         logger.info(f"开始执行{type_str}任务 ...")
-        if type_str == "签到":
-            with ThreadPool(min(len(do_sites), int(self._queue_cnt))) as p:
-                status = p.map(self.signin_site, do_sites)
-        else:
-            with ThreadPool(min(len(do_sites), int(self._queue_cnt))) as p:
-                status = p.map(self.login_site, do_sites)
+        try:
+            if type_str == "签到":
+                with ThreadPool(min(len(do_sites), int(self._queue_cnt))) as p:
+                    status = p.map(self.signin_site, do_sites)
+            else:
+                with ThreadPool(min(len(do_sites), int(self._queue_cnt))) as p:
+                    status = p.map(self.login_site, do_sites)
+        finally:
+            # 任务结束后关闭站点会话，下次任务重新建立连接
+            site_sessions.close()
 
         if status:
             logger.info(f"站点{type_str}任务完成！")
@@ -857,13 +865,9 @@ class AutoSignIn(_PluginBase):
         self.__update_config()
 
     def __build_class(self, url) -> Any:
-        for site_schema in self._site_schema:
-            try:
-                if site_schema.match(url):
-                    return site_schema
-            except Exception as e:
-                logger.error("站点模块加载失败：%s" % str(e))
-        return None
+        if not self._site_handlers:
+            return None
+        return self._site_handlers.get(url)
 
     def signin_by_domain(self, url: str, apikey: str) -> schemas.Response:
         """
@@ -953,12 +957,14 @@ class AutoSignIn(_PluginBase):
                     return True, "仿真签到成功"
             else:
                 res = RequestUtils(cookies=site_cookie,
+                                   session=site_sessions.get(site_url),
                                    ua=ua,
                                    proxies=proxies
                                    ).get_res(url=checkin_url)
                 if not res and site_url != checkin_url:
                     logger.info(f"开始站点模拟登录：{site}，地址：{site_url}...")
                     res = RequestUtils(cookies=site_cookie,
+                                       session=site_sessions.get(site_url),
                                        ua=ua,
                                        proxies=proxies
                                        ).get_res(url=site_url)
@@ -1048,6 +1054,7 @@ class AutoSignIn(_PluginBase):
                     return True, "模拟登录成功"
             else:
                 res = RequestUtils(cookies=site_cookie,
+                                   session=site_sessions.get(site_url),
                                    ua=ua,
                                    proxies=proxies
                                    ).get_res(url=site_url)
@@ -1086,6 +1093,7 @@ class AutoSignIn(_PluginBase):
                 if self._scheduler.running:
                     self._scheduler.shutdown()
                 self._scheduler = None
+            site_sessions.close()
         except Exception as e:
             logger.error("退出插件失败：%s" % str(e))
 
@@ -123,6 +123,7 @@ class Pt52(_ISiteSigninHandler):
         logger.debug(f"签到请求参数 {data}")
 
         sign_res = RequestUtils(cookies=site_cookie,
+                                session=self.get_session(self.site_url),
                                 ua=ua,
                                 proxies=settings.PROXY if proxy else None
                                 ).post_res(url='https://52pt.site/bakatest.php', data=data)
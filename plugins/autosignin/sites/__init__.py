@@ -1,9 +1,15 @@
 # -*- coding: utf-8 -*-
+import codecs
 import re
+import threading
 from abc import ABCMeta, abstractmethod
-from typing import Tuple
+from functools import lru_cache
+from typing import Any, Dict, List, Pattern, Tuple
+from urllib.parse import urlsplit
 
 import chardet
+from requests import Response, Session
+from requests.adapters import HTTPAdapter
 
 from app.core.config import settings
 from app.helper.browser import PlaywrightHelper
@@ -11,6 +17,66 @@ from app.log import logger
 from app.utils.http import RequestUtils
 from app.utils.string import StringUtils
 
+# 响应头及页面meta中声明的字符集
+_HEADER_CHARSET_PATTERN = re.compile(r"charset=[\"']?([\w.:-]+)", re.IGNORECASE)
+_META_CHARSET_PATTERN = re.compile(rb"<meta[^>]+charset=[\"']?([\w.:-]+)", re.IGNORECASE)
+# 查找meta字符集的页面前缀长度
+_META_CHARSET_SIZE = 8 * 1024
+# 未声明字符集时，用于检测字符集的页面前缀长度
+_DETECT_CHARSET_SIZE = 32 * 1024
+
+
+class SiteSessionPool:
+    """
+    站点会话池，同一域名的请求复用同一个保持连接的会话
+    """
+
+    def __init__(self, pool_maxsize: int = 4):
+        self._pool_maxsize = pool_maxsize
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, Session] = {}
+
+    @staticmethod
+    def __domain(url: str) -> str:
+        url = str(url or "").strip()
+        return (urlsplit(url if "://" in url else f"//{url}").hostname or url).lower()
+
+    def get(self, url: str) -> Session:
+        """
+        获取站点会话，url可以是完整地址或域名
+        """
+        domain = self.__domain(url)
+        with self._lock:
+            session = self._sessions.get(domain)
+            if not session:
+                session = Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self._pool_maxsize)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[domain] = session
+            return session
+
+    def close(self):
+        """
+        关闭全部会话
+        """
+        with self._lock:
+            sessions, self._sessions = list(self._sessions.values()), {}
+        for session in sessions:
+            session.close()
+
+
+# 所有签到类共享的站点会话池
+site_sessions = SiteSessionPool()
+
+
+@lru_cache(maxsize=256)
+def _compile_regexs(regexs: Tuple[str, ...]) -> Pattern:
+    """
+    将一组签到结果正则合并编译为一个正则，同一组正则只编译一次
+    """
+    return re.compile("|".join(f"(?:{regex})" for regex in regexs))
+
 
 class _ISiteSigninHandler(metaclass=ABCMeta):
     """
@@ -19,6 +85,8 @@ class _ISiteSigninHandler(metaclass=ABCMeta):
     """
     # 匹配的站点Url，每一个实现类都需要设置为自己的站点Url
     site_url = ""
+    # 是否按site_url域名精确匹配，为True时注册到域名索引中直接查找，否则逐个调用match判断
+    match_by_domain = True
 
     @abstractmethod
     def match(self, url: str) -> bool:
@@ -40,6 +108,46 @@ class _ISiteSigninHandler(metaclass=ABCMeta):
         """
         pass
 
+    @staticmethod
+    def get_session(url: str) -> Session:
+        """
+        获取站点会话，同一域名的请求复用同一个保持连接的会话
+        :param url: 站点地址或域名
+        """
+        return site_sessions.get(url)
+
+    @staticmethod
+    def decode_content(res: Response) -> str:
+        """
+        解码页面内容，优先使用响应头及meta中声明的字符集，未声明时只检测页面前缀
+        """
+        raw_data = res.content
+        if not raw_data:
+            return res.text
+        match = _HEADER_CHARSET_PATTERN.search(res.headers.get("Content-Type") or "") \
+            or _META_CHARSET_PATTERN.search(raw_data[:_META_CHARSET_SIZE])
+        if match:
+            encoding = match.group(1)
+            if isinstance(encoding, bytes):
+                encoding = encoding.decode("ascii", errors="ignore")
+            try:
+                encoding = codecs.lookup(encoding).name
+                # GB2312/GBK页面中常混有超出范围的字符，统一按GB18030解码
+                if encoding in ("gb2312", "gbk"):
+                    encoding = "gb18030"
+                return raw_data.decode(encoding)
+            except (LookupError, UnicodeDecodeError):
+                pass
+        try:
+            encoding = chardet.detect(raw_data[:_DETECT_CHARSET_SIZE])["encoding"]
+            # 前缀全是ASCII字符时按UTF-8解码
+            if not encoding or encoding.lower() == "ascii":
+                encoding = "utf-8"
+            return raw_data.decode(encoding)
+        except Exception as e:
+            logger.error(f"chardet解码失败：{str(e)}")
+            return res.text
+
     @staticmethod
     def get_page_source(url: str, cookie: str, ua: str, proxy: bool, render: bool, token: str = None) -> str:
         """
@@ -69,21 +177,10 @@ class _ISiteSigninHandler(metaclass=ABCMeta):
                     "Cookie": cookie
                 }
             res = RequestUtils(headers=headers,
+                               session=_ISiteSigninHandler.get_session(url),
                                proxies=settings.PROXY if proxy else None).get_res(url=url)
             if res is not None:
-                # 使用chardet检测字符编码
-                raw_data = res.content
-                if raw_data:
-                    try:
-                        result = chardet.detect(raw_data)
-                        encoding = result['encoding']
-                        # 解码为字符串
-                        return raw_data.decode(encoding)
-                    except Exception as e:
-                        logger.error(f"chardet解码失败：{str(e)}")
-                        return res.text
-                else:
-                    return res.text
+                return _ISiteSigninHandler.decode_content(res)
             return ""
 
     @staticmethod
@@ -91,8 +188,51 @@ class _ISiteSigninHandler(metaclass=ABCMeta):
         """
         判断是否签到成功
         """
-        html_text = re.sub(r"#\d+", "", re.sub(r"\d+px", "", html_res))
-        for regex in regexs:
-            if re.search(str(regex), html_text):
-                return True
-        return False
+        if not html_res or not regexs:
+            return False
+        return _compile_regexs(tuple(str(regex) for regex in regexs)).search(html_res) is not None
+
+
+class SiteSigninHandlerIndex:
+    """
+    签到类索引，按站点域名直接查找签到类，不能按域名匹配的签到类再逐个调用match判断
+    """
+
+    def __init__(self, handlers: List[Any]):
+        # 域名 -> 签到类
+        self._domains: Dict[str, Any] = {}
+        self._others: List[Any] = []
+        for handler in handlers or []:
+            if not getattr(handler, "site_url", None):
+                continue
+            if getattr(handler, "match_by_domain", True):
+                self._domains.setdefault(self.__domain(handler.site_url), handler)
+            else:
+                self._others.append(handler)
+
+    @staticmethod
+    def __domain(url: str) -> str:
+        """
+        与StringUtils.url_equal的比较规则一致
+        """
+        url = str(url or "")
+        if url.startswith("http"):
+            url = urlsplit(url).netloc
+        return url.replace("www.", "")
+
+    def get(self, url: str) -> Any:
+        """
+        查找站点对应的签到类，没有时返回None
+        """
+        if not url:
+            return None
+        handler = self._domains.get(self.__domain(url))
+        if handler:
+            return handler
+        for handler in self._others:
+            try:
+                if handler.match(url):
+                    return handler
+            except Exception as e:
+                logger.error("站点模块加载失败：%s" % str(e))
+        return None
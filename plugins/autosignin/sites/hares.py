@@ -63,6 +63,7 @@ class Hares(_ISiteSigninHandler):
             "User-Agent": ua
         }
         sign_res = RequestUtils(cookies=site_cookie,
+                                session=self.get_session(self.site_url),
                                 headers=headers,
                                 proxies=settings.PROXY if proxy else None
                                 ).get_res(url="https://club.hares.top/attendance.php?action=sign")
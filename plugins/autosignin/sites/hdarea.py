@@ -44,6 +44,7 @@ class HDArea(_ISiteSigninHandler):
             'action': 'sign_in'
         }
         html_res = RequestUtils(cookies=site_cookie,
+                                session=self.get_session(self.site_url),
                                 ua=ua,
                                 proxies=proxies
                                 ).post_res(url="https://www.hdarea.club/sign_in.php", data=data)
@@ -57,6 +57,7 @@ class HDChina(_ISiteSigninHandler):
         site_cookie = cookie
         # 获取页面html
         html_res = RequestUtils(cookies=site_cookie,
+                                session=self.get_session(self.site_url),
                                 ua=ua,
                                 proxies=proxies
                                 ).get_res(url="https://hdchina.org/index.php")
@@ -97,6 +98,7 @@ class HDChina(_ISiteSigninHandler):
             'csrf': x_csrf
         }
         sign_res = RequestUtils(cookies=site_cookie,
+                                session=self.get_session(self.site_url),
                                 ua=ua,
                                 proxies=proxies
                                 ).post_res(url="https://hdchina.org/plugin_sign-in.php?cmd=signin", data=data)
@@ -67,6 +67,7 @@ class HDSky(_ISiteSigninHandler):
         img_hash = None
         while not img_hash and res_times <= 3:
             image_res = RequestUtils(cookies=site_cookie,
+                                     session=self.get_session(self.site_url),
                                      ua=ua,
                                      content_type='application/x-www-form-urlencoded; charset=UTF-8',
                                      referer="https://hdsky.me/index.php",
@@ -115,6 +116,7 @@ class HDSky(_ISiteSigninHandler):
                 }
                 # 访问签到链接
                 res = RequestUtils(cookies=site_cookie,
+                                   session=self.get_session(self.site_url),
                                    ua=ua,
                                    referer=referer,
                                    proxies=settings.PROXY if proxy else None
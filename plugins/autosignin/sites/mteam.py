@@ -12,6 +12,8 @@ class MTorrent(_ISiteSigninHandler):
     """
     # 匹配的站点Url，每一个实现类都需要设置为自己的站点Url
     site_url = "m-team"
+    # 站点有多个域名，按match判断
+    match_by_domain = False
 
     @classmethod
     def match(cls, url: str) -> bool:
@@ -38,6 +40,7 @@ class MTorrent(_ISiteSigninHandler):
         domain = StringUtils.get_url_domain(url)
         # 更新最后访问时间
         res = RequestUtils(headers=headers,
+                           session=self.get_session(self.site_url),
                            timeout=60,
                            proxies=settings.PROXY if site_info.get("proxy") else None,
                            referer=f"{url}index"
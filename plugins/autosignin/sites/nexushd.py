@@ -45,6 +45,7 @@ class NexusHD(_ISiteSigninHandler):
             'content': ''
         }
         html_res = RequestUtils(cookies=site_cookie,
+                                session=self.get_session(self.site_url),
                                 ua=ua,
                                 proxies=proxies
                                 ).post_res(url="https://v6.nexushd.org/signin.php", data=data)
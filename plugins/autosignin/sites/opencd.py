@@ -113,6 +113,7 @@ class Opencd(_ISiteSigninHandler):
             }
             # 访问签到链接
             sign_res = RequestUtils(cookies=site_cookie,
+                                    session=self.get_session(self.site_url),
                                     ua=ua,
                                     proxies=settings.PROXY if proxy else None
                                     ).post_res(url='https://www.open.cd/plugin_sign-in.php?cmd=signin', data=data)
@@ -98,6 +98,7 @@ class Tjupt(_ISiteSigninHandler):
         logger.info(f"获取到签到图片 {img_url}")
         # 获取签到图片hash
         captcha_img_res = RequestUtils(cookies=site_cookie,
+                                       session=self.get_session(self.site_url),
                                        ua=ua,
                                        proxies=settings.PROXY if proxy else None
                                        ).get_res(url=img_url)
@@ -202,6 +203,7 @@ class Tjupt(_ISiteSigninHandler):
         }
         logger.debug(f"提交data {data}")
         sign_in_res = RequestUtils(cookies=site_cookie,
+                                   session=self.get_session(self.site_url),
                                    ua=ua,
                                    proxies=settings.PROXY if proxy else None
                                    ).post_res(url=self._sign_in_url, data=data)
@@ -75,6 +75,7 @@ class TTG(_ISiteSigninHandler):
         }
         # 签到
         sign_res = RequestUtils(cookies=site_cookie,
+                                session=self.get_session(self.site_url),
                                 ua=ua,
                                 proxies=settings.PROXY if proxy else None
                                 ).post_res(url="https://totheglory.im/signed.php",
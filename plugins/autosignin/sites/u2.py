@@ -104,6 +104,7 @@ class U2(_ISiteSigninHandler):
         }
         # 签到
         sign_res = RequestUtils(cookies=site_cookie,
+                                session=self.get_session(self.site_url),
                                 ua=ua,
                                 proxies=settings.PROXY if proxy else None
                                 ).post_res(url="https://u2.dmhy.org/showup.php?action=show",
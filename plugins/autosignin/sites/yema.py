@@ -12,6 +12,8 @@ class YemaPT(_ISiteSigninHandler):
     """
     # 匹配的站点Url，每一个实现类都需要设置为自己的站点Url
     site_url = "yemapt.org"
+    # 站点地址包含site_url即匹配，按match判断
+    match_by_domain = False
 
     @classmethod
     def match(cls, url: str) -> bool:
@@ -35,6 +37,7 @@ class YemaPT(_ISiteSigninHandler):
         }
         # 获取用户信息，更新最后访问时间
         res = (RequestUtils(headers=headers,
+                            session=self.get_session(self.site_url),
                             timeout=15,
                             cookies=site_info.get("cookie"),
                             proxies=settings.PROXY if site_info.get("proxy") else None,
@@ -62,6 +65,7 @@ class YemaPT(_ISiteSigninHandler):
         }
         # 获取用户信息，更新最后访问时间
         res = (RequestUtils(headers=headers,
+                            session=self.get_session(self.site_url),
                             timeout=15,
                             cookies=site_info.get("cookie"),
                             proxies=settings.PROXY if site_info.get("proxy") else None,
@@ -71,6 +71,7 @@ class ZhuQue(_ISiteSigninHandler):
                 "User-Agent": ua
             }
             skill_res = RequestUtils(cookies=site_cookie,
+                                     session=self.get_session(self.site_url),
                                      headers=headers,
                                      proxies=settings.PROXY if proxy else None
                                      ).post_res(url="https://zhuque.in/api/gaming/fireGenshinCharacterMagic", json=data)
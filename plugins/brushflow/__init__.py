@@ -4,6 +4,7 @@ import random
 import re
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime, timedelta
 from threading import Event
 from typing import Any, List, Dict, Tuple, Optional, Union, Set
@@ -24,6 +25,13 @@ from app.log import logger
 from app.modules.qbittorrent import Qbittorrent
 from app.modules.transmission import Transmission
 from app.plugins import _PluginBase
+from app.plugins.brushflow.brush_rules import BrushRules
+from app.plugins.brushflow.delete_planner import DeleteCandidate, DeletePlanEntry, DeletePlanner
+from app.plugins.brushflow.downloader_snapshot import DownloaderSnapshot
+from app.plugins.brushflow.subscribe_matcher import SubscribeTitleMatcher
+from app.plugins.brushflow.task_index import BrushTaskIndex
+from app.plugins.brushflow.task_store import BrushTaskStore
+from app.plugins.brushflow.torrent_sync import TorrentStateTracker, QbTorrentStateTracker, TrTorrentStateTracker
 from app.schemas import NotificationType, TorrentInfo, MediaType
 from app.schemas.types import EventType
 from app.utils.http import RequestUtils
@@ -65,6 +73,9 @@ class BrushConfig:
         self.up_speed = self.__parse_number(config.get("up_speed"))
         self.dl_speed = self.__parse_number(config.get("dl_speed"))
         self.auto_archive_days = self.__parse_number(config.get("auto_archive_days"))
+        self.site_threads = self.__parse_number(config.get("site_threads", 5))
+        self.site_timeout = self.__parse_number(config.get("site_timeout", 120))
+        self.downloader_refresh_interval = self.__parse_number(config.get("downloader_refresh_interval"))
         self.save_path = config.get("save_path")
         self.clear_task = config.get("clear_task", False)
         self.archive_task = config.get("archive_task", False)
@@ -93,6 +104,9 @@ class BrushConfig:
             elif not self.site_config:
                 self.site_config = self.get_demo_site_config()
 
+        # 预先解析刷流规则，配置变更时会重新构建BrushConfig
+        self.rules = BrushRules(config=self)
+
     def __initialize_site_config(self):
         if not self.site_config:
             logger.error(f"没有设置站点配置，已关闭站点独立配置并恢复默认配置示例，请检查配置项")
@@ -140,7 +154,7 @@ class BrushConfig:
                 site_specific_config = {key: config[key] for key in allowed_fields & set(config.keys())}
 
                 full_config = {key: getattr(self, key) for key in vars(self) if
-                               key not in ['group_site_configs', 'site_config']}
+                               key not in ['group_site_configs', 'site_config', 'rules']}
                 full_config.update(site_specific_config)
 
                 self.group_site_configs[sitename] = BrushConfig(config=full_config, process_site_config=False)
@@ -239,7 +253,7 @@ class BrushConfig:
             return str(v)
 
     def __str__(self):
-        attrs = vars(self)
+        attrs = {k: v for k, v in vars(self).items() if k != "rules"}
         # Note the use of self.format_value(v) here to call the instance method
         attrs_str = ', '.join(f'"{k}": {self.__format_value(v)}' for k, v in attrs.items())
         return f'{{ {attrs_str} }}'
@@ -283,6 +297,16 @@ class BrushFlow(_PluginBase):
     _task_brush_enable = False
     # 订阅缓存信息
     _subscribe_infos = None
+    # 订阅标题匹配
+    _subscribe_matcher: Optional[SubscribeTitleMatcher] = None
+    # 刷流任务索引
+    _task_index: Optional[BrushTaskIndex] = None
+    # 刷流周期内的下载器状态快照
+    _downloader_snapshot: Optional[DownloaderSnapshot] = None
+    # 下载器种子状态镜像
+    _torrent_tracker: Optional[TorrentStateTracker] = None
+    # 刷流任务存储
+    _task_store: Optional[BrushTaskStore] = None
     # Brush定时
     _brush_interval = 10
     # Check定时
@@ -301,6 +325,8 @@ class BrushFlow(_PluginBase):
         self.torrents = TorrentsChain()
         self.subscribeoper = SubscribeOper()
         self._task_brush_enable = False
+        self._task_store = BrushTaskStore(db_path=self.get_data_path() / "tasks.db")
+        self.__migrate_task_data()
 
         if not config:
             logger.info("站点刷流任务出错，无法获取插件配置")
@@ -402,7 +428,24 @@ class BrushFlow(_PluginBase):
         pass
 
     def get_api(self) -> List[Dict[str, Any]]:
-        pass
+        return [{
+            "path": "/statistic",
+            "endpoint": self.api_statistic,
+            "methods": ["GET"],
+            "summary": "刷流统计数据",
+            "description": "获取刷流汇总及各站点统计数据",
+        }]
+
+    def api_statistic(self, apikey: str):
+        """
+        API获取刷流统计数据
+        """
+        if apikey != settings.API_TOKEN:
+            return schemas.Response(success=False, message="API密钥错误")
+        return schemas.Response(success=True, data={
+            **self.__get_statistic_info(),
+            "sites": self.__get_site_statistic_info()
+        })
 
     def get_service(self) -> List[Dict[str, Any]]:
         """
@@ -1153,6 +1196,68 @@ class BrushFlow(_PluginBase):
                                                 ]
                                             }
                                         ]
+                                    },
+                                    {
+                                        'component': 'VRow',
+                                        'content': [
+                                            {
+                                                'component': 'VCol',
+                                                'props': {
+                                                    'cols': 12,
+                                                    'md': 4
+                                                },
+                                                'content': [
+                                                    {
+                                                        'component': 'VTextField',
+                                                        'props': {
+                                                            'model': 'site_threads',
+                                                            'label': '站点并发数',
+                                                            'placeholder': '同时获取种子的站点数量',
+                                                            'type': 'number',
+                                                            "min": "1"
+                                                        }
+                                                    }
+                                                ]
+                                            },
+                                            {
+                                                'component': 'VCol',
+                                                'props': {
+                                                    'cols': 12,
+                                                    'md': 4
+                                                },
+                                                'content': [
+                                                    {
+                                                        'component': 'VTextField',
+                                                        'props': {
+                                                            'model': 'site_timeout',
+                                                            'label': '站点超时时间（秒）',
+                                                            'placeholder': '超时后本次跳过该站点',
+                                                            'type': 'number',
+                                                            "min": "0"
+                                                        }
+                                                    }
+                                                ]
+                                            },
+                                            {
+                                                'component': 'VCol',
+                                                'props': {
+                                                    'cols': 12,
+                                                    'md': 4
+                                                },
+                                                'content': [
+                                                    {
+                                                        'component': 'VTextField',
+                                                        'props': {
+                                                            'model': 'downloader_refresh_interval',
+                                                            'label': '下载器状态刷新间隔（秒）',
+                                                            'placeholder': '留空则每轮刷流仅获取一次',
+                                                            'type': 'number',
+                                                            "min": "0"
+                                                        }
+                                                    }
+                                                ]
+                                            }
+                                        ]
                                     }
                                 ]
                             },
@@ -1851,12 +1956,14 @@ class BrushFlow(_PluginBase):
             "downloader_monitor": False,
             "auto_qb_category": False,
             "qb_first_last_piece": False,
+            "site_threads": 5,
+            "site_timeout": 120,
             "site_config": BrushConfig.get_demo_site_config()
         }
 
     def get_page(self) -> List[dict]:
         # 种子明细
-        torrents = self.get_data("torrents") or {}
+        torrents = self._task_store.load(BrushTaskStore.TORRENTS) if self._task_store else {}
 
         if not torrents:
             return [
@@ -1973,8 +2080,12 @@ class BrushFlow(_PluginBase):
         with lock:
             logger.info(f"开始执行刷流任务 ...")
 
-            torrent_tasks: Dict[str, dict] = self.get_data("torrents") or {}
+            torrent_tasks: Dict[str, dict] = self._task_store.load(BrushTaskStore.TORRENTS)
             torrents_size = self.__calculate_seeding_torrents_size(torrent_tasks=torrent_tasks)
+            # 每个周期重建一次任务索引，后续随任务变化增量维护
+            self._task_index = BrushTaskIndex(torrent_tasks=torrent_tasks)
+            # 每个周期重新获取下载器状态，新增任务时在本地同步更新
+            self._downloader_snapshot = DownloaderSnapshot(torrents_size=torrents_size)
 
             # 判断能否通过保种体积前置条件
             size_condition_passed, reason = self.__evaluate_size_condition_for_brush(torrents_size=torrents_size)
@@ -1990,8 +2101,6 @@ class BrushFlow(_PluginBase):
                 logger.info(f"刷流任务执行完成")
                 return
 
-            statistic_info = self.__get_statistic_info()
-
             # 获取所有站点的信息，并过滤掉不存在的站点
             site_infos = []
             for siteid in brush_config.brushsites:
@@ -2005,38 +2114,83 @@ class BrushFlow(_PluginBase):
 
             logger.info(f"即将针对站点 {', '.join(site.name for site in site_infos)} 开始刷流")
 
-            # 获取订阅标题
-            subscribe_titles = self.__get_subscribe_titles()
+            # 获取订阅标题匹配
+            subscribe_matcher = self.__get_subscribe_matcher()
+
+            # 并发获取所有站点的种子，后续仍按站点顺序依次进行刷流
+            site_torrents = self.__browse_sites_torrents(site_infos=site_infos)
 
             # 处理所有站点
             for site in site_infos:
                 # 如果站点刷流没有正确响应，说明没有通过前置条件，其他站点也不需要继续刷流了
-                if not self.__brush_site_torrents(siteid=site.id, torrent_tasks=torrent_tasks,
-                                                  statistic_info=statistic_info,
-                                                  subscribe_titles=subscribe_titles):
+                if not self.__brush_site_torrents(siteinfo=site, torrents=site_torrents.get(site.id),
+                                                  torrent_tasks=torrent_tasks,
+                                                  subscribe_matcher=subscribe_matcher):
                     logger.info(f"站点 {site.name} 刷流中途结束，停止后续刷流")
                     break
                 else:
                     logger.info(f"站点 {site.name} 刷流完成")
 
-            # 保存数据
-            self.save_data("torrents", torrent_tasks)
-            # 保存统计数据
-            self.save_data("statistic", statistic_info)
+            # 保存数据，统计数据随任务写入同步更新
+            self._task_store.save(BrushTaskStore.TORRENTS, torrent_tasks)
             logger.info(f"刷流任务执行完成")
 
-    def __brush_site_torrents(self, siteid, torrent_tasks: Dict[str, dict], statistic_info: Dict[str, int],
-                              subscribe_titles: Set[str]) -> bool:
+    def __browse_sites_torrents(self, site_infos: List[Any]) -> Dict[int, List[TorrentInfo]]:
         """
-        针对站点进行刷流
+        使用线程池并发获取站点种子，超时或获取失败的站点不会出现在返回结果中
         """
-        siteinfo = self.siteoper.get(siteid)
-        if not siteinfo:
-            logger.warn(f"站点不存在：{siteid}")
-            return True
+        site_torrents = {}
+        if not site_infos:
+            return site_torrents
 
-        logger.info(f"开始获取站点 {siteinfo.name} 的新种子 ...")
-        torrents = self.torrents.browse(domain=siteinfo.domain)
+        brush_config = self.__get_brush_config()
+        max_workers = max(1, min(int(brush_config.site_threads or 1), len(site_infos)))
+        site_timeout = brush_config.site_timeout or 0
+        # 站点实际开始获取的时间，排队中的站点不计入超时
+        started_at: Dict[int, float] = {}
+
+        def browse_site(site):
+            started_at[site.id] = time.time()
+            logger.info(f"开始获取站点 {site.name} 的新种子 ...")
+            return self.torrents.browse(domain=site.domain)
+
+        logger.info(f"正在并发获取站点种子，并发数 {max_workers}，"
+                    f"站点超时时间 {f'{site_timeout} 秒' if site_timeout else '不限制'}")
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="BrushFlow-Browse")
+        futures = {executor.submit(browse_site, site): site for site in site_infos}
+        pending = set(futures)
+        try:
+            while pending:
+                if self._event.is_set():
+                    logger.warn("站点刷流服务停止，取消获取站点种子")
+                    break
+                done, pending = wait(pending, timeout=1, return_when=FIRST_COMPLETED)
+                for future in done:
+                    site = futures[future]
+                    try:
+                        site_torrents[site.id] = future.result() or []
+                    except Exception as e:
+                        logger.error(f"获取站点 {site.name} 的种子失败，错误详情: {e}")
+                if not site_timeout:
+                    continue
+                now = time.time()
+                for future in list(pending):
+                    site = futures[future]
+                    start = started_at.get(site.id)
+                    if start and now - start > site_timeout:
+                        logger.warn(f"获取站点 {site.name} 的种子超过 {site_timeout} 秒，本次跳过该站点")
+                        pending.discard(future)
+        finally:
+            # 超时的请求无法中断，这里不等待其结束，未开始的任务直接取消
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return site_torrents
+
+    def __brush_site_torrents(self, siteinfo: Any, torrents: Optional[List[TorrentInfo]],
+                              torrent_tasks: Dict[str, dict], subscribe_matcher: SubscribeTitleMatcher) -> bool:
+        """
+        针对站点进行刷流
+        """
         if not torrents:
             logger.info(f"站点 {siteinfo.name} 没有获取到种子")
             return True
@@ -2048,12 +2202,13 @@ class BrushFlow(_PluginBase):
 
         # 排除包含订阅的种子
         if brush_config.except_subscribe:
-            torrents = self.__filter_torrents_contains_subscribe(torrents=torrents, subscribe_titles=subscribe_titles)
+            torrents = self.__filter_torrents_contains_subscribe(torrents=torrents,
+                                                                 subscribe_matcher=subscribe_matcher)
 
         # 按发布日期降序排列
         torrents.sort(key=lambda x: x.pubdate or '', reverse=True)
 
-        torrents_size = self.__calculate_seeding_torrents_size(torrent_tasks=torrent_tasks)
+        snapshot = self.__get_downloader_snapshot()
 
         logger.info(f"正在准备种子刷流，数量 {len(torrents)}")
 
@@ -2068,15 +2223,15 @@ class BrushFlow(_PluginBase):
             logger.debug(f"种子详情：{torrent}")
 
             # 判断能否通过保种体积刷流条件
-            size_condition_passed, reason = self.__evaluate_size_condition_for_brush(torrents_size=torrents_size,
-                                                                                     add_torrent_size=torrent.size)
+            size_condition_passed, reason = self.__evaluate_size_condition_for_brush(
+                torrents_size=snapshot.torrents_size, add_torrent_size=torrent.size)
             self.__log_brush_conditions(passed=size_condition_passed, reason=reason, torrent=torrent)
             if not size_condition_passed:
                 continue
 
             # 判断能否通过刷流条件
             condition_passed, reason = self.__evaluate_conditions_for_brush(torrent=torrent,
-                                                                            torrent_tasks=torrent_tasks)
+                                                                            task_index=self._task_index)
             self.__log_brush_conditions(passed=condition_passed, reason=reason, torrent=torrent)
             if not condition_passed:
                 continue
@@ -2129,10 +2284,10 @@ class BrushFlow(_PluginBase):
                 "data": torrent_task
             })
             torrent_tasks[hash_string] = torrent_task
+            self._task_index.add(torrent_hash=hash_string, task=torrent_task)
 
             # 统计数据
-            torrents_size += torrent.size
-            statistic_info["count"] += 1
+            snapshot.add_torrent(size=torrent.size)
             logger.info(f"站点 {siteinfo.name}，新增刷流种子下载：{torrent.title}|{torrent.description}")
             self.__send_add_message(torrent)
 
@@ -2143,69 +2298,31 @@ class BrushFlow(_PluginBase):
         """
         过滤体积不符合条件的种子
         """
-        brush_config = self.__get_brush_config()
-
-        # 如果没有明确指定增加的种子大小，则检查配置中是否有种子大小下限，如果有，使用这个大小作为增加的种子大小
-        preset_condition = False
-        if not add_torrent_size and brush_config.size:
-            size_limits = [float(size) * 1024 ** 3 for size in brush_config.size.split("-")]
-            add_torrent_size = size_limits[0]  # 使用配置的种子大小下限
-            preset_condition = True
-
-        total_size = self.__bytes_to_gb(torrents_size + add_torrent_size)  # 预计总做种体积
-
-        def generate_message(config):
-            if add_torrent_size:
-                if preset_condition:
-                    return (f"当前做种体积 {self.__bytes_to_gb(torrents_size):.1f} GB，"
-                            f"刷流种子下限 {self.__bytes_to_gb(add_torrent_size):.1f} GB，"
-                            f"预计做种体积 {total_size:.1f} GB，"
-                            f"超过设定的保种体积 {config} GB，暂时停止新增任务")
-                else:
-                    return (f"当前做种体积 {self.__bytes_to_gb(torrents_size):.1f} GB，"
-                            f"刷流种子大小 {self.__bytes_to_gb(add_torrent_size):.1f} GB，"
-                            f"预计做种体积 {total_size:.1f} GB，"
-                            f"超过设定的保种体积 {config} GB")
-            else:
-                return (f"当前做种体积 {self.__bytes_to_gb(torrents_size):.1f} GB，"
-                        f"超过设定的保种体积 {config} GB，暂时停止新增任务")
-
-        reasons = [
-            ("disksize",
-             lambda config: torrents_size + add_torrent_size > float(config) * 1024 ** 3, generate_message)
-        ]
-
-        for condition, check, message in reasons:
-            config_value = getattr(brush_config, condition, None)
-            if config_value and check(config_value):
-                reason = message(config_value)
-                return False, reason
-
-        return True, None
+        return self.__get_brush_config().rules.evaluate_disk_size(torrents_size=torrents_size,
+                                                                  add_torrent_size=add_torrent_size)
 
     def __evaluate_pre_conditions_for_brush(self, include_network_conditions: bool = True) \
             -> Tuple[bool, Optional[str]]:
         """
         前置过滤不符合条件的种子
         """
+        snapshot = self.__get_downloader_snapshot()
         reasons = [
-            ("maxdlcount", lambda config: self.__get_downloading_count() >= int(config),
+            ("maxdlcount", lambda config: snapshot.downloading_count >= int(config),
              lambda config: f"当前同时下载任务数已达到最大值 {config}，暂时停止新增任务")
         ]
 
         if include_network_conditions:
-            downloader_info = self.__get_downloader_info()
-            if downloader_info:
-                current_upload_speed = downloader_info.upload_speed or 0
-                current_download_speed = downloader_info.download_speed or 0
-                reasons.extend([
-                    ("maxupspeed", lambda config: current_upload_speed >= float(config) * 1024,
-                     lambda config: f"当前总上传带宽 {StringUtils.str_filesize(current_upload_speed)}，"
-                                    f"已达到最大值 {config} KB/s，暂时停止新增任务"),
-                    ("maxdlspeed", lambda config: current_download_speed >= float(config) * 1024,
-                     lambda config: f"当前总下载带宽 {StringUtils.str_filesize(current_download_speed)}，"
-                                    f"已达到最大值 {config} KB/s，暂时停止新增任务"),
-                ])
+            current_upload_speed = snapshot.upload_speed
+            current_download_speed = snapshot.download_speed
+            reasons.extend([
+                ("maxupspeed", lambda config: current_upload_speed >= float(config) * 1024,
+                 lambda config: f"当前总上传带宽 {StringUtils.str_filesize(current_upload_speed)}，"
+                                f"已达到最大值 {config} KB/s，暂时停止新增任务"),
+                ("maxdlspeed", lambda config: current_download_speed >= float(config) * 1024,
+                 lambda config: f"当前总下载带宽 {StringUtils.str_filesize(current_download_speed)}，"
+                                f"已达到最大值 {config} KB/s，暂时停止新增任务"),
+            ])
 
         brush_config = self.__get_brush_config()
         for condition, check, message in reasons:
@@ -2216,91 +2333,19 @@ class BrushFlow(_PluginBase):
 
         return True, None
 
-    def __evaluate_conditions_for_brush(self, torrent, torrent_tasks) -> Tuple[bool, Optional[str]]:
+    def __evaluate_conditions_for_brush(self, torrent, task_index: BrushTaskIndex) -> Tuple[bool, Optional[str]]:
         """
         过滤不符合条件的种子
         """
         brush_config = self.__get_brush_config(torrent.site_name)
 
         # 排除重复种子
-        # 默认根据标题和站点名称进行排除
-        task_key = f"{torrent.site_name}{torrent.title}"
-        if any(task_key == f"{task.get('site_name')}{task.get('title')}" for task in torrent_tasks.values()):
-            return False, "重复种子"
-
-        # 部分站点标题会上新时携带后缀，这里进一步根据种子详情地址进行排除
-        if torrent.page_url:
-            task_page_url = f"{torrent.site_name}{torrent.page_url}"
-            if any(task_page_url == f"{task.get('site_name')}{task.get('page_url')}" for task in
-                   torrent_tasks.values()):
-                return False, "重复种子"
-
-        # 不同站点如果遇到相同种子，判断前一个种子是否已经在做种，否则排除处理
-        if torrent.title:
-            if any(torrent.site_name != f"{task.get('site_name')}" and torrent.title == f"{task.get('title')}"
-                   and not task.get("seed_time") for task in torrent_tasks.values()):
-                return False, "其他站点存在尚未下载完成的相同种子"
-
-        # 促销条件
-        if brush_config.freeleech and torrent.downloadvolumefactor != 0:
-            return False, "非免费种子"
-        if brush_config.freeleech == "2xfree" and torrent.uploadvolumefactor != 2:
-            return False, "非双倍上传种子"
-
-        # H&R
-        if brush_config.hr == "yes" and torrent.hit_and_run:
-            return False, "存在H&R"
-
-        # 包含规则
-        if brush_config.include and not (
-                re.search(brush_config.include, torrent.title, re.I) or re.search(brush_config.include,
-                                                                                  torrent.description, re.I)):
-            return False, "不符合包含规则"
-
-        # 排除规则
-        if brush_config.exclude and (
-                re.search(brush_config.exclude, torrent.title, re.I) or re.search(brush_config.exclude,
-                                                                                  torrent.description, re.I)):
-            return False, "符合排除规则"
-
-        # 种子大小（GB）
-        if brush_config.size:
-            sizes = [float(size) * 1024 ** 3 for size in brush_config.size.split("-")]
-            if len(sizes) == 1 and torrent.size < sizes[0]:
-                return False, f"种子大小 {self.__bytes_to_gb(torrent.size):.1f} GB，不符合条件"
-            elif len(sizes) > 1 and not sizes[0] <= torrent.size <= sizes[1]:
-                return False, f"种子大小 {self.__bytes_to_gb(torrent.size):.1f} GB，不在指定范围内"
-
-        # 做种人数
-        if brush_config.seeder:
-            seeders_range = [float(n) for n in brush_config.seeder.split("-")]
-            # 检查是否仅指定了一个数字，即做种人数需要小于等于该数字
-            if len(seeders_range) == 1:
-                # 当做种人数大于该数字时，不符合条件
-                if torrent.seeders > seeders_range[0]:
-                    return False, f"做种人数 {torrent.seeders}，超过单个指定值"
-            # 如果指定了一个范围
-            elif len(seeders_range) > 1:
-                # 检查做种人数是否在指定的范围内（包括边界）
-                if not (seeders_range[0] <= torrent.seeders <= seeders_range[1]):
-                    return False, f"做种人数 {torrent.seeders}，不在指定范围内"
-
-        # 发布时间
-        pubdate_minutes = self.__get_pubminutes(torrent.pubdate)
-        # 已支持独立站点配置，取消单独适配站点时区逻辑，可通过配置项「pubtime」自行适配
-        # pubdate_minutes = self.__adjust_site_pubminutes(pubdate_minutes, torrent)
-        if brush_config.pubtime:
-            pubtimes = [float(n) for n in brush_config.pubtime.split("-")]
-            if len(pubtimes) == 1:
-                # 单个值：选择发布时间小于等于该值的种子
-                if pubdate_minutes > pubtimes[0]:
-                    return False, f"发布时间 {torrent.pubdate}，{pubdate_minutes:.0f} 分钟前，不符合条件"
-            else:
-                # 范围值：选择发布时间在范围内的种子
-                if not (pubtimes[0] <= pubdate_minutes <= pubtimes[1]):
-                    return False, f"发布时间 {torrent.pubdate}，{pubdate_minutes:.0f} 分钟前，不在指定范围内"
+        reason = task_index.check_duplicate(torrent=torrent)
+        if reason:
+            return False, reason
 
-        return True, None
+        # 促销、H&R、包含/排除规则、种子大小、做种人数、发布时间
+        return brush_config.rules.evaluate(torrent=torrent)
 
     @staticmethod
     def __log_brush_conditions(passed: bool, reason: str, torrent: Any = None):
@@ -2328,15 +2373,16 @@ class BrushFlow(_PluginBase):
 
         with lock:
             logger.info("开始检查刷流下载任务 ...")
-            torrent_tasks: Dict[str, dict] = self.get_data("torrents") or {}
-            unmanaged_tasks: Dict[str, dict] = self.get_data("unmanaged") or {}
+            torrent_tasks: Dict[str, dict] = self._task_store.load(BrushTaskStore.TORRENTS)
+            unmanaged_tasks: Dict[str, dict] = self._task_store.load(BrushTaskStore.UNMANAGED)
+            self._task_index = BrushTaskIndex(torrent_tasks=torrent_tasks)
 
             downloader = self.__get_downloader(brush_config.downloader)
             if not downloader:
                 logger.warn("无法获取下载器实例，将在下个时间周期重试")
                 return
 
-            seeding_torrents, error = downloader.get_torrents()
+            seeding_torrents, error = self.__get_downloader_torrents(downloader=downloader)
             if error:
                 logger.warn("连接下载器出错，将在下个时间周期重试")
                 return
@@ -2412,14 +2458,14 @@ class BrushFlow(_PluginBase):
                         for torrent_hash in need_delete_hashes:
                             torrent_tasks[torrent_hash]["deleted"] = True
                             torrent_tasks[torrent_hash]["deleted_time"] = time.time()
+                        if self._torrent_tracker:
+                            self._torrent_tracker.remove(hashes=need_delete_hashes)
 
             # 归档数据
             self.__auto_archive_tasks(torrent_tasks=torrent_tasks)
 
             self.__update_and_save_statistic_info(torrent_tasks)
 
-            self.save_data("torrents", torrent_tasks)
-
             logger.info("刷流下载任务检查完成")
 
     def __update_torrent_tasks_state(self, torrents: List[Any], torrent_tasks: Dict[str, dict]):
@@ -2442,6 +2488,7 @@ class BrushFlow(_PluginBase):
                 "ratio": torrent_info.get("ratio"),
                 "seeding_time": torrent_info.get("seeding_time"),
             })
+            self.__update_task_index(torrent_hash=torrent_hash, torrent_task=torrent_task)
 
     def __update_seeding_tasks_based_on_tags(self, torrent_tasks: Dict[str, dict], unmanaged_tasks: Dict[str, dict],
                                              seeding_torrents_dict: Dict[str, Any]):
@@ -2473,6 +2520,7 @@ class BrushFlow(_PluginBase):
                         # 如果在 unmanaged_tasks 中，移除并转移到 torrent_tasks
                         torrent_task = unmanaged_tasks.pop(torrent_hash)
                         torrent_tasks[torrent_hash] = torrent_task
+                        self.__update_task_index(torrent_hash=torrent_hash, torrent_task=torrent_task)
                         added_tasks.append(torrent_task)
                         logger.info(f"站点 {torrent_task.get('site_name')}，"
                                     f"刷流任务种子再次加入：{torrent_task.get('title')}|{torrent_task.get('description')}")
@@ -2480,6 +2528,7 @@ class BrushFlow(_PluginBase):
                         # 否则，创建一个新的任务
                         torrent_task = self.__convert_torrent_info_to_task(torrent)
                         torrent_tasks[torrent_hash] = torrent_task
+                        self.__update_task_index(torrent_hash=torrent_hash, torrent_task=torrent_task)
                         added_tasks.append(torrent_task)
                         logger.info(f"站点 {torrent_task.get('site_name')}，"
                                     f"刷流任务种子加入：{torrent_task.get('title')}|{torrent_task.get('description')}")
@@ -2497,13 +2546,14 @@ class BrushFlow(_PluginBase):
                 if torrent_hash in torrent_tasks:
                     # 如果种子不符合刷流条件但在 torrent_tasks 中，移除并加入 unmanaged_tasks
                     torrent_task = torrent_tasks.pop(torrent_hash)
+                    self.__remove_task_index(torrent_hash=torrent_hash)
                     unmanaged_tasks[torrent_hash] = torrent_task
                     removed_tasks.append(torrent_task)
                     logger.info(f"站点 {torrent_task.get('site_name')}，"
                                 f"刷流任务种子移除：{torrent_task.get('title')}|{torrent_task.get('description')}")
 
-        self.save_data("torrents", torrent_tasks)
-        self.save_data("unmanaged", unmanaged_tasks)
+        self._task_store.save(BrushTaskStore.TORRENTS, torrent_tasks)
+        self._task_store.save(BrushTaskStore.UNMANAGED, unmanaged_tasks)
 
         # 发送汇总消息
         if added_tasks:
@@ -2517,90 +2567,21 @@ class BrushFlow(_PluginBase):
                                                             reason="在下载器中找到已标记删除的刷流任务对应的种子信息",
                                                             torrent_tasks=reset_tasks)
 
-    def __group_torrents_by_proxy_delete(self, torrents: List[Any], torrent_tasks: Dict[str, dict]):
-        """
-        根据是否启用动态删种进行分组
-        """
-        proxy_delete_torrents = []
-        not_proxy_delete_torrents = []
-
-        for torrent in torrents:
-            torrent_hash = self.__get_hash(torrent)
-            torrent_task = torrent_tasks.get(torrent_hash, None)
-
-            # 如果找不到种子任务，说明不在管理的种子范围内，直接跳过
-            if not torrent_task:
-                continue
-
-            site_name = torrent_task.get("site_name", "")
-
-            brush_config = self.__get_brush_config(site_name)
-            if brush_config.proxy_delete:
-                proxy_delete_torrents.append(torrent)
-            else:
-                not_proxy_delete_torrents.append(torrent)
-
-        return proxy_delete_torrents, not_proxy_delete_torrents
-
     def __evaluate_conditions_for_delete(self, site_name: str, torrent_info: dict, torrent_task: dict) \
             -> Tuple[bool, str]:
         """
         评估删除条件并返回是否应删除种子及其原因
         """
         brush_config = self.__get_brush_config(sitename=site_name)
-
-        reason = "未能满足设置的删除条件"
-
-        # 当配置了H&R做种时间/分享率时，则H&R种子只有达到预期行为时，才会进行删除，如果没有配置H&R做种时间/分享率，则普通种子的删除规则也适用于H&R种子
-        # 判断是否为H&R种子并且是否配置了特定的H&R条件
-        hit_and_run = torrent_task.get("hit_and_run", False)
-        hr_specific_conditions_configured = hit_and_run and (brush_config.hr_seed_time or brush_config.seed_ratio)
-        if hr_specific_conditions_configured:
-            if (brush_config.hr_seed_time and torrent_info.get("seeding_time")
-                    >= float(brush_config.hr_seed_time) * 3600):
-                return True, (f"H&R种子，做种时间 {torrent_info.get('seeding_time') / 3600:.1f} 小时，"
-                              f"大于 {brush_config.hr_seed_time} 小时")
-            if brush_config.seed_ratio and torrent_info.get("ratio") >= float(brush_config.seed_ratio):
-                return True, f"H&R种子，分享率 {torrent_info.get('ratio'):.2f}，大于 {brush_config.seed_ratio}"
-            return False, "H&R种子，未能满足设置的H&R删除条件"
-
-        # 处理其他场景，1. 不是H&R种子；2. 是H&R种子但没有特定条件配置
-        reason = reason if not hit_and_run else "H&R种子（未设置H&R条件），未能满足设置的删除条件"
-        if brush_config.seed_time and torrent_info.get("seeding_time") >= float(brush_config.seed_time) * 3600:
-            reason = f"做种时间 {torrent_info.get('seeding_time') / 3600:.1f} 小时，大于 {brush_config.seed_time} 小时"
-        elif brush_config.seed_ratio and torrent_info.get("ratio") >= float(brush_config.seed_ratio):
-            reason = f"分享率 {torrent_info.get('ratio'):.2f}，大于 {brush_config.seed_ratio}"
-        elif brush_config.seed_size and torrent_info.get("uploaded") >= float(brush_config.seed_size) * 1024 ** 3:
-            reason = f"上传量 {torrent_info.get('uploaded') / 1024 ** 3:.1f} GB，大于 {brush_config.seed_size} GB"
-        elif brush_config.download_time and torrent_info.get("downloaded") < torrent_info.get(
-                "total_size") and torrent_info.get("dltime") >= float(brush_config.download_time) * 3600:
-            reason = f"下载耗时 {torrent_info.get('dltime') / 3600:.1f} 小时，大于 {brush_config.download_time} 小时"
-        elif brush_config.seed_avgspeed and torrent_info.get("avg_upspeed") <= float(
-                brush_config.seed_avgspeed) * 1024 and torrent_info.get("seeding_time") >= 30 * 60:
-            reason = f"平均上传速度 {torrent_info.get('avg_upspeed') / 1024:.1f} KB/s，低于 {brush_config.seed_avgspeed} KB/s"
-        elif brush_config.seed_inactivetime and torrent_info.get("iatime") >= float(
-                brush_config.seed_inactivetime) * 60:
-            reason = f"未活动时间 {torrent_info.get('iatime') / 60:.0f} 分钟，大于 {brush_config.seed_inactivetime} 分钟"
-        else:
-            return False, reason
-
-        return True, reason if not hit_and_run else "H&R种子（未设置H&R条件），" + reason
+        return brush_config.rules.evaluate_delete(torrent_info=torrent_info,
+                                                  hit_and_run=torrent_task.get("hit_and_run", False))
 
     def __evaluate_proxy_pre_conditions_for_delete(self, site_name: str, torrent_info: dict) -> Tuple[bool, str]:
         """
         评估动态删除前置条件并返回是否应删除种子及其原因
         """
         brush_config = self.__get_brush_config(sitename=site_name)
-
-        reason = "未能满足动态删除设置的前置删除条件"
-
-        if brush_config.download_time and torrent_info.get("downloaded") < torrent_info.get(
-                "total_size") and torrent_info.get("dltime") >= float(brush_config.download_time) * 3600:
-            reason = f"下载耗时 {torrent_info.get('dltime') / 3600:.1f} 小时，大于 {brush_config.download_time} 小时"
-        else:
-            return False, reason
-
-        return True, reason
+        return brush_config.rules.evaluate_proxy_pre_delete(torrent_info=torrent_info)
 
     def __delete_torrent_for_evaluate_conditions(self, torrents: List[Any], torrent_tasks: Dict[str, dict],
                                                  proxy_delete: bool = False) -> List:
@@ -2637,44 +2618,6 @@ class BrushFlow(_PluginBase):
 
         return delete_hashes
 
-    def __delete_torrent_for_evaluate_proxy_pre_conditions(self, torrents: List[Any],
-                                                           torrent_tasks: Dict[str, dict]) -> List:
-        """
-        根据动态删除前置条件排除H&R种子后删除种子并获取已删除列表
-        """
-        brush_config = self.__get_brush_config()
-        delete_hashes = []
-
-        for torrent in torrents:
-            torrent_hash = self.__get_hash(torrent)
-            torrent_task = torrent_tasks.get(torrent_hash, None)
-            # 如果找不到种子任务，说明不在管理的种子范围内，直接跳过
-            if not torrent_task:
-                continue
-
-            # 如果是H&R种子，前置条件中不进行处理
-            if torrent_task.get('hit_and_run', False):
-                continue
-
-            site_name = torrent_task.get("site_name", "")
-            torrent_title = torrent_task.get("title", "")
-            torrent_desc = torrent_task.get("description", "")
-
-            torrent_info = self.__get_torrent_info(torrent)
-
-            # 删除种子的具体实现可能会根据实际情况略有不同
-            should_delete, reason = self.__evaluate_proxy_pre_conditions_for_delete(site_name=site_name,
-                                                                                    torrent_info=torrent_info)
-            if should_delete:
-                delete_hashes.append(torrent_hash)
-                self.__send_delete_message(site_name=site_name, torrent_title=torrent_title, torrent_desc=torrent_desc,
-                                           reason=reason)
-                logger.info(f"站点：{site_name}，{reason}，删除种子：{torrent_title}|{torrent_desc}")
-            else:
-                logger.debug(f"站点：{site_name}，{reason}，不删除种子：{torrent_title}|{torrent_desc}")
-
-        return delete_hashes
-
     def __delete_torrent_for_proxy(self, torrents: List[Any], torrent_tasks: Dict[str, dict]) -> List:
         """
         动态删除种子，删除规则如下；
@@ -2688,132 +2631,58 @@ class BrushFlow(_PluginBase):
         brush_config = self.__get_brush_config()
 
         # 如果没有启用动态删除或没有设置删除阈值，则不执行删除操作
-        if not (brush_config.proxy_delete and brush_config.delete_size_range):
+        if not (brush_config.proxy_delete and brush_config.rules.delete_size_range):
             return []
 
-        # 获取种子信息Map
-        torrent_info_map = {self.__get_hash(torrent): self.__get_torrent_info(torrent=torrent) for torrent in torrents}
-
-        # 计算当前总做种体积
-        total_torrent_size = self.__calculate_seeding_torrents_size(torrent_tasks=torrent_tasks)
-
-        logger.info(
-            f"当前做种体积 {self.__bytes_to_gb(total_torrent_size):.1f} GB，正在准备计算满足动态前置删除条件的种子")
-
-        # 执行排除H&R种子后满足前置删除条件的种子
-        pre_delete_hashes = self.__delete_torrent_for_evaluate_proxy_pre_conditions(torrents=torrents,
-                                                                                    torrent_tasks=torrent_tasks) or []
-
-        # 如果存在前置删除种子，这里进行额外判断，总做种体积排除前置删除种子的体积
-        if pre_delete_hashes:
-            pre_delete_total_size = sum(torrent_info_map[self.__get_hash(torrent)].get("total_size", 0)
-                                        for torrent in torrents if self.__get_hash(torrent) in pre_delete_hashes)
-            total_torrent_size = total_torrent_size - pre_delete_total_size
-            torrents = [torrent for torrent in torrents if self.__get_hash(torrent) not in pre_delete_hashes]
-            logger.info(
-                f"满足动态删除前置条件的种子共 {len(pre_delete_hashes)} 个，体积 {self.__bytes_to_gb(pre_delete_total_size):.1f} GB，"
-                f"删除种子后，当前做种体积 {self.__bytes_to_gb(total_torrent_size):.1f} GB")
-        else:
-            logger.info(f"没有找到任何满足动态删除前置条件的种子")
-
-        # 解析删除阈值范围
-        sizes = [float(size) * 1024 ** 3 for size in brush_config.delete_size_range.split("-")]
-        min_size = sizes[0]  # 至少需要达到的做种体积
-        max_size = sizes[1] if len(sizes) > 1 else sizes[0]  # 触发删除操作的做种体积上限
-
-        # 判断是否为区间删除
-        proxy_size_range = len(sizes) > 1
-
-        # 当总体积未超过最大阈值时，不需要执行删除操作
-        if total_torrent_size < max_size:
-            logger.info(
-                f"当前做种体积 {self.__bytes_to_gb(total_torrent_size):.1f} GB，上限 {self.__bytes_to_gb(max_size):.1f} GB，"
-                f"下限 {self.__bytes_to_gb(min_size):.1f} GB，未进一步触发动态删除")
-            return pre_delete_hashes or []
-        else:
-            logger.info(
-                f"当前做种体积 {self.__bytes_to_gb(total_torrent_size):.1f} GB，上限 {self.__bytes_to_gb(max_size):.1f} GB，"
-                f"下限 {self.__bytes_to_gb(min_size):.1f} GB，进一步触发动态删除")
-
-        need_delete_hashes = []
-        need_delete_hashes.extend(pre_delete_hashes)
-
-        # 即使开了动态删除，但是也有可能部分站点单独设置了关闭，这里根据种子托管进行分组，先处理不需要托管的种子，按设置的规则进行删除
-        proxy_delete_torrents, not_proxy_delete_torrents = self.__group_torrents_by_proxy_delete(torrents=torrents,
-                                                                                                 torrent_tasks=torrent_tasks)
-        logger.info(f"托管种子数 {len(proxy_delete_torrents)}，未托管种子数 {len(not_proxy_delete_torrents)}")
-        if not_proxy_delete_torrents:
-            not_proxy_delete_hashes = self.__delete_torrent_for_evaluate_conditions(torrents=not_proxy_delete_torrents,
-                                                                                    torrent_tasks=torrent_tasks) or []
-            need_delete_hashes.extend(not_proxy_delete_hashes)
-            total_torrent_size -= sum(
-                torrent_info_map[self.__get_hash(torrent)].get("total_size", 0) for torrent in not_proxy_delete_torrents
-                if self.__get_hash(torrent) in not_proxy_delete_hashes)
-
-        # 如果删除非托管种子后仍未达到最小体积要求，则处理托管种子
-        if total_torrent_size > min_size and proxy_delete_torrents:
-            proxy_delete_hashes = self.__delete_torrent_for_evaluate_conditions(torrents=proxy_delete_torrents,
-                                                                                torrent_tasks=torrent_tasks,
-                                                                                proxy_delete=True) or []
-            need_delete_hashes.extend(proxy_delete_hashes)
-            total_torrent_size -= sum(
-                torrent_info_map[self.__get_hash(torrent)].get("total_size", 0) for torrent in proxy_delete_torrents if
-                self.__get_hash(torrent) in proxy_delete_hashes)
-
-        # 在完成初始删除步骤后，如果总体积仍然超过最小阈值，则进一步找到已完成种子并排除HR种子后按做种时间正序进行删除
-        if total_torrent_size > min_size:
-            # 重新计算当前的种子列表，排除已删除的种子
-            remaining_hashes = list(
-                {self.__get_hash(torrent) for torrent in proxy_delete_torrents} - set(need_delete_hashes))
-            # 这里根据排除后的种子列表，再次从下载器中找到已完成的任务
-            downloader = self.__get_downloader(brush_config.downloader)
-            completed_torrents = downloader.get_completed_torrents(ids=remaining_hashes)
-            remaining_hashes = {self.__get_hash(torrent) for torrent in completed_torrents}
-            remaining_torrents = [(_hash, torrent_info_map[_hash]) for _hash in remaining_hashes]
-
-            # 准备一个列表，用于存放满足条件的种子，即非HR种子且有明确做种时间
-            filtered_torrents = [(_hash, info['seeding_time']) for _hash, info in remaining_torrents if
-                                 not torrent_tasks[_hash].get("hit_and_run", False)]
-            sorted_torrents = sorted(filtered_torrents, key=lambda x: x[1], reverse=True)
-
-            # 进行额外的删除操作，直到满足最小阈值或没有更多种子可删除
-            for torrent_hash, _ in sorted_torrents:
-                if total_torrent_size <= min_size:
-                    break
-                torrent_task = torrent_tasks.get(torrent_hash, None)
-                torrent_info = torrent_info_map.get(torrent_hash, None)
-                if not torrent_task or not torrent_info:
-                    continue
-
-                need_delete_hashes.append(torrent_hash)
-                total_torrent_size -= torrent_info.get("total_size", 0)
-
-                site_name = torrent_task.get("site_name", "")
-                torrent_title = torrent_task.get("title", "")
-                torrent_desc = torrent_task.get("description", "")
-                seeding_time = torrent_task.get("seeding_time", 0)
-                if seeding_time:
-                    reason = (f"触发动态删除阈值，系统自动删除，做种时间 {seeding_time / 3600:.1f} 小时，"
-                              f"当前做种体积 {self.__bytes_to_gb(total_torrent_size):.1f} GB")
-                    # 如果是区间删除，一次性删除的数据过多，取消消息推送
-                    if not proxy_size_range:
-                        self.__send_delete_message(site_name=site_name, torrent_title=torrent_title,
-                                                   torrent_desc=torrent_desc,
-                                                   reason=reason)
-                    logger.info(f"站点：{site_name}，{reason}，删除种子：{torrent_title}|{torrent_desc}")
-
-        delete_sites = {torrent_tasks[hash_key].get('site_name', '') for hash_key in need_delete_hashes if
-                        hash_key in torrent_tasks}
-        msg = (f"站点：{'，'.join(delete_sites)}\n内容：已完成 {len(need_delete_hashes)} 个种子删除，"
-               f"当前做种体积 {self.__bytes_to_gb(total_torrent_size):.1f} GB\n原因：触发动态删除阈值，系统自动删除")
+        planner = DeletePlanner(
+            delete_size_range=brush_config.rules.delete_size_range,
+            evaluate_pre_conditions=lambda candidate: self.__evaluate_proxy_pre_conditions_for_delete(
+                site_name=candidate.site_name, torrent_info=candidate.torrent_info),
+            evaluate_conditions=lambda candidate: self.__evaluate_conditions_for_delete(
+                site_name=candidate.site_name, torrent_info=candidate.torrent_info,
+                torrent_task=candidate.torrent_task),
+            completed_hashes_getter=lambda hashes: self.__get_completed_hashes(torrent_hashes=hashes))
+        plan = planner.plan(candidates=self.__build_delete_candidates(torrents=torrents, torrent_tasks=torrent_tasks),
+                            total_size=self.__calculate_seeding_torrents_size(torrent_tasks=torrent_tasks))
+
+        for entry in plan.entries:
+            candidate = entry.candidate
+            if entry.notify:
+                self.__send_delete_message(site_name=candidate.site_name, torrent_title=candidate.title,
+                                           torrent_desc=candidate.description, reason=entry.reason)
+            logger.info(f"站点：{candidate.site_name}，{entry.reason}，删除种子：{candidate.title}|{candidate.description}")
+        # 前置删除后总体积未超过最大阈值时，未进一步触发动态删除，直接返回前置删除的种子
+        if not any(entry.stage != DeletePlanEntry.STAGE_PRE for entry in plan.entries) \
+                and plan.final_size < planner.max_size:
+            return plan.hashes
+
+        msg = (f"站点：{'，'.join(plan.sites)}\n内容：已完成 {len(plan.entries)} 个种子删除，"
+               f"当前做种体积 {self.__bytes_to_gb(plan.final_size):.1f} GB\n原因：触发动态删除阈值，系统自动删除")
         logger.info(msg)
 
         # 如果是区间删除，这里则进行统一推送
-        if proxy_size_range:
+        if planner.size_range:
             self.__send_message(title="【刷流任务种子删除】", text=msg)
 
         # 返回所有需要删除的种子的哈希列表
-        return need_delete_hashes
+        return plan.hashes
+
+    def __build_delete_candidates(self, torrents: List[Any], torrent_tasks: Dict[str, dict]) -> List[DeleteCandidate]:
+        """
+        提取动态删种所需的种子指标，每个种子仅获取一次Hash及种子信息
+        """
+        candidates = []
+        for torrent in torrents:
+            torrent_hash = self.__get_hash(torrent)
+            torrent_task = torrent_tasks.get(torrent_hash, None)
+            # 如果找不到种子任务，说明不在管理的种子范围内，直接跳过
+            if not torrent_task:
+                continue
+            site_name = torrent_task.get("site_name", "")
+            candidates.append(DeleteCandidate(torrent_hash=torrent_hash, torrent_task=torrent_task,
+                                              torrent_info=self.__get_torrent_info(torrent=torrent),
+                                              proxy_delete=bool(self.__get_brush_config(site_name).proxy_delete)))
+        return candidates
 
     def __update_undeleted_torrents_missing_in_downloader(self, torrent_tasks, torrent_check_hashes, torrents):
         """
@@ -2891,52 +2760,18 @@ class BrushFlow(_PluginBase):
 
     def __update_and_save_statistic_info(self, torrent_tasks):
         """
-        更新并保存统计信息
+        保存刷流任务，统计数据由任务表增量维护，这里仅输出最新的统计信息
         """
-        total_count, total_uploaded, total_downloaded, total_deleted = 0, 0, 0, 0
-        active_uploaded, active_downloaded, active_count, total_unarchived = 0, 0, 0, 0
-
+        self._task_store.save(BrushTaskStore.TORRENTS, torrent_tasks)
         statistic_info = self.__get_statistic_info()
-        archived_tasks = self.get_data("archived") or {}
-        combined_tasks = {**torrent_tasks, **archived_tasks}
-
-        for task in combined_tasks.values():
-            if task.get("deleted", False):
-                total_deleted += 1
-            total_downloaded += task.get("downloaded", 0)
-            total_uploaded += task.get("uploaded", 0)
-
-        # 计算torrent_tasks中未标记为删除的活跃任务的统计信息，及待归档的任务数
-        for task in torrent_tasks.values():
-            if not task.get("deleted", False):
-                active_uploaded += task.get("uploaded", 0)
-                active_downloaded += task.get("downloaded", 0)
-                active_count += 1
-            else:
-                total_unarchived += 1
-
-        # 更新统计信息
-        total_count = len(combined_tasks)
-        statistic_info.update({
-            "uploaded": total_uploaded,
-            "downloaded": total_downloaded,
-            "deleted": total_deleted,
-            "unarchived": total_unarchived,
-            "count": total_count,
-            "active": active_count,
-            "active_uploaded": active_uploaded,
-            "active_downloaded": active_downloaded
-        })
-
-        logger.info(f"刷流任务统计数据，总任务数：{total_count}，活跃任务数：{active_count}，已删除：{total_deleted}，"
-                    f"待归档：{total_unarchived}，"
-                    f"活跃上传量：{StringUtils.str_filesize(active_uploaded)}，"
-                    f"活跃下载量：{StringUtils.str_filesize(active_downloaded)}，"
-                    f"总上传量：{StringUtils.str_filesize(total_uploaded)}，"
-                    f"总下载量：{StringUtils.str_filesize(total_downloaded)}")
 
-        self.save_data("statistic", statistic_info)
-        self.save_data("torrents", torrent_tasks)
+        logger.info(f"刷流任务统计数据，总任务数：{statistic_info.get('count')}，"
+                    f"活跃任务数：{statistic_info.get('active')}，已删除：{statistic_info.get('deleted')}，"
+                    f"待归档：{statistic_info.get('unarchived')}，"
+                    f"活跃上传量：{StringUtils.str_filesize(statistic_info.get('active_uploaded'))}，"
+                    f"活跃下载量：{StringUtils.str_filesize(statistic_info.get('active_downloaded'))}，"
+                    f"总上传量：{StringUtils.str_filesize(statistic_info.get('uploaded'))}，"
+                    f"总下载量：{StringUtils.str_filesize(statistic_info.get('downloaded'))}")
 
     def __get_brush_config(self, sitename: str = None) -> BrushConfig:
         """
@@ -2969,7 +2804,10 @@ class BrushFlow(_PluginBase):
             "seed_inactivetime": "未活动时间",
             "up_speed": "单任务上传限速",
             "dl_speed": "单任务下载限速",
-            "auto_archive_days": "自动清理记录天数"
+            "auto_archive_days": "自动清理记录天数",
+            "site_threads": "站点并发数",
+            "site_timeout": "站点超时时间",
+            "downloader_refresh_interval": "下载器状态刷新间隔"
         }
 
         config_range_number_attr_to_desc = {
@@ -3042,6 +2880,9 @@ class BrushFlow(_PluginBase):
             "up_speed": brush_config.up_speed,
             "dl_speed": brush_config.dl_speed,
             "auto_archive_days": brush_config.auto_archive_days,
+            "site_threads": brush_config.site_threads,
+            "site_timeout": brush_config.site_timeout,
+            "downloader_refresh_interval": brush_config.downloader_refresh_interval,
             "save_path": brush_config.save_path,
             "clear_task": brush_config.clear_task,
             "archive_task": brush_config.archive_task,
@@ -3070,20 +2911,46 @@ class BrushFlow(_PluginBase):
         brush_config = self.__get_brush_config()
         self.qb = Qbittorrent()
         self.tr = Transmission()
+        self._torrent_tracker = None
 
         if brush_config.downloader == "qbittorrent":
+            self._torrent_tracker = QbTorrentStateTracker(client_getter=lambda: self.qb.qbc if self.qb else None)
             if self.qb.is_inactive():
                 self.__log_and_notify_error("站点刷流任务出错：Qbittorrent未连接")
                 return False
 
         elif brush_config.downloader == "transmission":
-
+            self._torrent_tracker = TrTorrentStateTracker(client_getter=lambda: self.tr.trc if self.tr else None)
             if self.tr.is_inactive():
                 self.__log_and_notify_error("站点刷流任务出错：Transmission未连接")
                 return False
 
         return True
 
+    def __get_downloader_torrents(self, downloader: Union[Transmission, Qbittorrent]) -> Tuple[List[Any], bool]:
+        """
+        获取下载器中的全部种子，优先通过种子状态镜像增量同步，失败时回退为全量获取
+        """
+        if self._torrent_tracker:
+            torrents, error = self._torrent_tracker.sync()
+            if not error:
+                return torrents, error
+            logger.warn("增量同步下载器种子状态失败，尝试全量获取种子")
+        return downloader.get_torrents()
+
+    def __get_completed_hashes(self, torrent_hashes: List[str]) -> List[str]:
+        """
+        获取已完成的种子Hash，优先使用种子状态镜像，避免再次查询下载器
+        """
+        if not torrent_hashes:
+            return []
+        if self._torrent_tracker and self._torrent_tracker.synced:
+            return self._torrent_tracker.get_completed_hashes(hashes=torrent_hashes)
+        brush_config = self.__get_brush_config()
+        downloader = self.__get_downloader(brush_config.downloader)
+        completed_torrents = downloader.get_completed_torrents(ids=torrent_hashes) or []
+        return [self.__get_hash(torrent) for torrent in completed_torrents]
+
     def __get_downloader(self, dtype: str) -> Optional[Union[Transmission, Qbittorrent]]:
         """
         根据类型返回下载器实例
@@ -3632,7 +3499,7 @@ class BrushFlow(_PluginBase):
         获取任务中的种子总大小
         """
         # 读取种子记录
-        task_info = self.get_data("torrents") or {}
+        task_info = self._task_store.load(BrushTaskStore.TORRENTS)
         if not task_info:
             return 0
         total_size = sum([task.get("size") or 0 for task in task_info.values()])
@@ -3664,6 +3531,35 @@ class BrushFlow(_PluginBase):
 
         return ret_info
 
+    def __get_downloader_snapshot(self) -> DownloaderSnapshot:
+        """
+        获取刷流周期内的下载器状态快照，仅在首次获取或超过刷新间隔时查询下载器
+        """
+        brush_config = self.__get_brush_config()
+        if self._downloader_snapshot is None:
+            self._downloader_snapshot = DownloaderSnapshot(
+                torrents_size=self.__calculate_seeding_torrents_size(
+                    torrent_tasks=self._task_store.load(BrushTaskStore.TORRENTS)))
+
+        snapshot = self._downloader_snapshot
+        if not snapshot.is_expired(refresh_interval=brush_config.downloader_refresh_interval):
+            return snapshot
+
+        # 只查询已配置的条件所需要的数据
+        downloading_count = self.__get_downloading_count() if brush_config.maxdlcount else 0
+        upload_speed, download_speed = 0, 0
+        if brush_config.maxupspeed or brush_config.maxdlspeed:
+            downloader_info = self.__get_downloader_info()
+            if downloader_info:
+                upload_speed = downloader_info.upload_speed or 0
+                download_speed = downloader_info.download_speed or 0
+        snapshot.update(downloading_count=downloading_count, upload_speed=upload_speed,
+                        download_speed=download_speed)
+        logger.debug(f"已获取下载器状态，正在下载任务数 {downloading_count}，"
+                     f"上传速度 {StringUtils.str_filesize(upload_speed)}/s，"
+                     f"下载速度 {StringUtils.str_filesize(download_speed)}/s")
+        return snapshot
+
     def __get_downloading_count(self) -> int:
         """
         获取正在下载的任务数量
@@ -3684,22 +3580,6 @@ class BrushFlow(_PluginBase):
             logger.error(f"获取下载数量发生异常: {e}")
             return 0
 
-    @staticmethod
-    def __get_pubminutes(pubdate: str) -> float:
-        """
-        将字符串转换为时间，并计算与当前时间差）（分钟）
-        """
-        try:
-            if not pubdate:
-                return 0
-            pubdate = pubdate.replace("T", " ").replace("Z", "")
-            pubdate = datetime.strptime(pubdate, "%Y-%m-%d %H:%M:%S")
-            now = datetime.now()
-            return (now - pubdate).total_seconds() // 60
-        except Exception as e:
-            logger.error(f"发布时间 {pubdate} 获取分钟失败，错误详情: {e}")
-            return 0
-
     @staticmethod
     def __adjust_site_pubminutes(pub_minutes: float, torrent: TorrentInfo) -> float:
         """
@@ -3746,6 +3626,16 @@ class BrushFlow(_PluginBase):
                 filter_torrents.append(torrent)
         return filter_torrents
 
+    def __get_subscribe_matcher(self) -> SubscribeTitleMatcher:
+        """
+        获取订阅标题匹配，仅在订阅标题集合发生变化时重新构建
+        """
+        if self._subscribe_matcher is None:
+            self._subscribe_matcher = SubscribeTitleMatcher()
+        if self._subscribe_matcher.update(titles=self.__get_subscribe_titles()):
+            logger.info(f"订阅标题发生变化，已重新构建订阅标题匹配，共 {len(self._subscribe_matcher)} 个标题")
+        return self._subscribe_matcher
+
     def __get_subscribe_titles(self) -> Set[str]:
         """
         获取当前订阅的所有标题，返回一个不包含None和空白字符的集合
@@ -3757,8 +3647,10 @@ class BrushFlow(_PluginBase):
 
         logger.info("已开启排除订阅，正在准备订阅标题匹配 ...")
 
-        if not self._subscribe_infos:
-            self._subscribe_infos = {}
+        # 订阅识别结果持久化保存，重启后无需再次识别
+        if self._subscribe_infos is None:
+            self._subscribe_infos = self.get_data("subscribe_infos") or {}
+        changed = False
 
         subscribes = self.subscribeoper.list()
         if subscribes:
@@ -3787,15 +3679,20 @@ class BrushFlow(_PluginBase):
                         subscribe_titles.extend(mediainfo.names)
                         subscribe_titles = [title.strip() for title in subscribe_titles if title and title.strip()]
                         self._subscribe_infos[subscribe_key] = subscribe_titles
+                        changed = True
                     else:
                         logger.info(f"订阅 {subscribe.name} 没有识别到媒体信息，跳过订阅标题匹配")
                 except Exception as e:
                     logger.error(f"识别订阅 {subscribe.name} 媒体信息失败，错误详情: {e}")
 
-            # 移除不再存在的订阅
-            current_keys = {f"{subscribe.id}_{subscribe.name}" for subscribe in subscribes}
-            for key in set(self._subscribe_infos) - current_keys:
-                del self._subscribe_infos[key]
+        # 移除不再存在的订阅，识别结果会持久化保存，订阅全部删除时同样需要清理
+        current_keys = {f"{subscribe.id}_{subscribe.name}" for subscribe in subscribes or []}
+        for key in set(self._subscribe_infos) - current_keys:
+            del self._subscribe_infos[key]
+            changed = True
+
+        if changed:
+            self.save_data("subscribe_infos", self._subscribe_infos)
 
         logger.info("订阅标题匹配完成")
         logger.debug(f"当前订阅的标题集合为：{self._subscribe_infos}")
@@ -3803,7 +3700,7 @@ class BrushFlow(_PluginBase):
         return unique_titles
 
     @staticmethod
-    def __filter_torrents_contains_subscribe(torrents: Any, subscribe_titles: Set[str]):
+    def __filter_torrents_contains_subscribe(torrents: Any, subscribe_matcher: SubscribeTitleMatcher):
         # 初始化两个列表，一个用于收集未被排除的种子，一个用于记录被排除的种子
         included_torrents = []
         excluded_torrents = []
@@ -3814,7 +3711,7 @@ class BrushFlow(_PluginBase):
             title = torrent.title or ''
             description = torrent.description or ''
 
-            if any(subscribe_title in title or subscribe_title in description for subscribe_title in subscribe_titles):
+            if subscribe_matcher.search(title) or subscribe_matcher.search(description):
                 # 如果种子的标题或描述包含订阅标题中的任一项，则记录为被排除
                 excluded_torrents.append(torrent)
                 logger.info(f"命中订阅内容，排除种子：{title}|{description}")
@@ -3858,6 +3755,20 @@ class BrushFlow(_PluginBase):
         except ValueError:
             return False
 
+    def __update_task_index(self, torrent_hash: str, torrent_task: dict):
+        """
+        更新刷流任务索引
+        """
+        if self._task_index is not None:
+            self._task_index.update(torrent_hash=torrent_hash, task=torrent_task)
+
+    def __remove_task_index(self, torrent_hash: str):
+        """
+        从刷流任务索引中移除任务
+        """
+        if self._task_index is not None:
+            self._task_index.remove(torrent_hash=torrent_hash)
+
     @staticmethod
     def __calculate_seeding_torrents_size(torrent_tasks: Dict[str, dict]) -> float:
         """
@@ -3873,8 +3784,8 @@ class BrushFlow(_PluginBase):
             logger.info("自动归档记录天数小于等于0，取消自动归档")
             return
 
-        # 用于存储已删除的数据
-        archived_tasks: Dict[str, dict] = self.get_data("archived") or {}
+        # 用于存储本次需要归档的数据
+        archived_tasks: Dict[str, dict] = {}
 
         current_time = time.time()
         archive_threshold_seconds = self._brush_config.auto_archive_days * 86400  # 将天数转换为秒数
@@ -3898,20 +3809,20 @@ class BrushFlow(_PluginBase):
                 archived_tasks[key] = value
                 continue
 
-        # 从原始字典中移除已删除的条目
+        # 归档任务写入任务表，并从原始字典中移除已删除的条目
+        self._task_store.move(BrushTaskStore.TORRENTS, BrushTaskStore.ARCHIVED, archived_tasks)
         for key in keys_to_delete:
             del torrent_tasks[key]
-
-        self.save_data("archived", archived_tasks)
+            self.__remove_task_index(torrent_hash=key)
 
     def __archive_tasks(self):
         """
         归档已经删除的种子数据
         """
-        torrent_tasks: Dict[str, dict] = self.get_data("torrents") or {}
+        torrent_tasks: Dict[str, dict] = self._task_store.load(BrushTaskStore.TORRENTS)
 
-        # 用于存储已删除的数据
-        archived_tasks: Dict[str, dict] = self.get_data("archived") or {}
+        # 用于存储本次需要归档的数据
+        archived_tasks: Dict[str, dict] = {}
 
         # 准备一个列表，记录所有需要从原始数据中删除的键
         keys_to_delete = set()
@@ -3925,12 +3836,12 @@ class BrushFlow(_PluginBase):
                 # 记录键，稍后删除
                 keys_to_delete.add(key)
 
-        # 从原始字典中移除已删除的条目
+        # 归档任务写入任务表，并从原始字典中移除已删除的条目
+        self._task_store.move(BrushTaskStore.TORRENTS, BrushTaskStore.ARCHIVED, archived_tasks)
         for key in keys_to_delete:
             del torrent_tasks[key]
+            self.__remove_task_index(torrent_hash=key)
 
-        self.save_data("archived", archived_tasks)
-        self.save_data("torrents", torrent_tasks)
         # 归档需要更新一下统计数据
         self.__update_and_save_statistic_info(torrent_tasks=torrent_tasks)
 
@@ -3939,16 +3850,33 @@ class BrushFlow(_PluginBase):
         清除统计数据
         彻底重置所有刷流数据，如当前还存在正在做种的刷流任务，待定时检查任务执行后，会自动纳入刷流管理
         """
-        self.save_data("torrents", {})
-        self.save_data("archived", {})
-        self.save_data("unmanaged", {})
-        self.save_data("statistic", {})
+        self._task_store.clear()
+        self._task_index = None
+
+    def __migrate_task_data(self):
+        """
+        将原有整体保存在插件数据中的刷流任务迁移至任务表
+        """
+        for kind in [BrushTaskStore.TORRENTS, BrushTaskStore.ARCHIVED, BrushTaskStore.UNMANAGED]:
+            tasks = self.get_data(kind)
+            if tasks is None:
+                continue
+            try:
+                if tasks:
+                    self._task_store.upsert(kind, tasks)
+                self.del_data(key=kind)
+                logger.info(f"刷流任务数据 {kind} 已迁移至任务表，共 {len(tasks)} 条")
+            except Exception as e:
+                logger.error(f"刷流任务数据 {kind} 迁移失败，将在下次启动时重试，错误详情: {e}")
+        # 统计数据已改为由任务表维护
+        if self.get_data("statistic") is not None:
+            self.del_data(key="statistic")
 
     def __get_statistic_info(self) -> Dict[str, int]:
         """
         获取统计数据
         """
-        statistic_info = self.get_data("statistic") or {
+        statistic_info = {
             "count": 0,
             "deleted": 0,
             "uploaded": 0,
@@ -3958,8 +3886,52 @@ class BrushFlow(_PluginBase):
             "active_uploaded": 0,
             "active_downloaded": 0
         }
+        if not self._task_store:
+            return statistic_info
+        for row in self._task_store.get_site_statistics():
+            if row["kind"] not in [BrushTaskStore.TORRENTS, BrushTaskStore.ARCHIVED]:
+                continue
+            statistic_info["count"] += row["count"]
+            statistic_info["uploaded"] += row["uploaded"]
+            statistic_info["downloaded"] += row["downloaded"]
+            if row["deleted"]:
+                statistic_info["deleted"] += row["count"]
+            if row["kind"] == BrushTaskStore.TORRENTS:
+                if row["deleted"]:
+                    statistic_info["unarchived"] += row["count"]
+                else:
+                    statistic_info["active"] += row["count"]
+                    statistic_info["active_uploaded"] += row["uploaded"]
+                    statistic_info["active_downloaded"] += row["downloaded"]
         return statistic_info
 
+    def __get_site_statistic_info(self) -> List[dict]:
+        """
+        获取各站点统计数据
+        """
+        sites: Dict[str, dict] = {}
+        if not self._task_store:
+            return []
+        for row in self._task_store.get_site_statistics():
+            if row["kind"] not in [BrushTaskStore.TORRENTS, BrushTaskStore.ARCHIVED]:
+                continue
+            site = sites.setdefault(row["site_name"], {
+                "site_name": row["site_name"],
+                "count": 0,
+                "deleted": 0,
+                "active": 0,
+                "uploaded": 0,
+                "downloaded": 0
+            })
+            site["count"] += row["count"]
+            site["uploaded"] += row["uploaded"]
+            site["downloaded"] += row["downloaded"]
+            if row["deleted"]:
+                site["deleted"] += row["count"]
+            elif row["kind"] == BrushTaskStore.TORRENTS:
+                site["active"] += row["count"]
+        return sorted(sites.values(), key=lambda x: x["uploaded"], reverse=True)
+
     @staticmethod
     def __is_valid_time_range(time_range: str) -> bool:
         """检查时间范围字符串是否有效：格式为"HH:MM-HH:MM"，且时间有效"""
@@ -0,0 +1,261 @@
+import re
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Pattern, Tuple
+
+from app.log import logger
+
+
+class BrushRules:
+    """
+    刷流规则，在配置加载时预先解析数值范围及正则表达式，刷流时按顺序执行各条件判断
+    """
+
+    def __init__(self, config: Any):
+        self.freeleech = config.freeleech
+        self.hr = config.hr
+        self.include = self.__compile_pattern(config.include, desc="包含规则")
+        self.exclude = self.__compile_pattern(config.exclude, desc="排除规则")
+        # 种子大小（Byte）
+        self.size_range = self.__parse_range(config.size, factor=1024 ** 3, desc="种子大小")
+        # 做种人数
+        self.seeder_range = self.__parse_range(config.seeder, desc="做种人数")
+        # 发布时间（分钟）
+        self.pubtime_range = self.__parse_range(config.pubtime, desc="发布时间")
+        # 动态删种阈值（Byte）
+        self.delete_size_range = self.__parse_range(config.delete_size_range, factor=1024 ** 3, desc="动态删种阈值")
+        # 保种体积（GB）
+        self.disksize = config.disksize
+        # 删除条件
+        self.seed_time = config.seed_time
+        self.hr_seed_time = config.hr_seed_time
+        self.seed_ratio = config.seed_ratio
+        self.seed_size = config.seed_size
+        self.download_time = config.download_time
+        self.seed_avgspeed = config.seed_avgspeed
+        self.seed_inactivetime = config.seed_inactivetime
+
+        self._conditions: List[Callable[[Any, Optional[datetime]], Optional[str]]] = self.__build_conditions()
+
+    def evaluate(self, torrent: Any, now: Optional[datetime] = None) -> Tuple[bool, Optional[str]]:
+        """
+        依次执行刷流条件，返回是否通过及未通过的原因
+        :param now: 计算发布时间所使用的当前时间，回放历史数据时使用记录时间
+        """
+        for condition in self._conditions:
+            reason = condition(torrent, now)
+            if reason:
+                return False, reason
+        return True, None
+
+    def evaluate_disk_size(self, torrents_size: float, add_torrent_size: float = 0.0) -> Tuple[bool, Optional[str]]:
+        """
+        判断新增种子后做种体积是否超过保种体积
+        """
+        if not self.disksize:
+            return True, None
+
+        # 如果没有明确指定增加的种子大小，则检查配置中是否有种子大小下限，如果有，使用这个大小作为增加的种子大小
+        preset_condition = False
+        if not add_torrent_size and self.size_range:
+            add_torrent_size = self.size_range[0]  # 使用配置的种子大小下限
+            preset_condition = True
+
+        if torrents_size + add_torrent_size <= float(self.disksize) * 1024 ** 3:
+            return True, None
+
+        total_size = self.__to_gb(torrents_size + add_torrent_size)  # 预计总做种体积
+        if add_torrent_size:
+            if preset_condition:
+                return False, (f"当前做种体积 {self.__to_gb(torrents_size):.1f} GB，"
+                               f"刷流种子下限 {self.__to_gb(add_torrent_size):.1f} GB，"
+                               f"预计做种体积 {total_size:.1f} GB，"
+                               f"超过设定的保种体积 {self.disksize} GB，暂时停止新增任务")
+            return False, (f"当前做种体积 {self.__to_gb(torrents_size):.1f} GB，"
+                           f"刷流种子大小 {self.__to_gb(add_torrent_size):.1f} GB，"
+                           f"预计做种体积 {total_size:.1f} GB，"
+                           f"超过设定的保种体积 {self.disksize} GB")
+        return False, (f"当前做种体积 {self.__to_gb(torrents_size):.1f} GB，"
+                       f"超过设定的保种体积 {self.disksize} GB，暂时停止新增任务")
+
+    def evaluate_delete(self, torrent_info: dict, hit_and_run: bool = False) -> Tuple[bool, str]:
+        """
+        评估删除条件并返回是否应删除种子及其原因
+        """
+        reason = "未能满足设置的删除条件"
+
+        # 当配置了H&R做种时间/分享率时，则H&R种子只有达到预期行为时，才会进行删除，如果没有配置H&R做种时间/分享率，则普通种子的删除规则也适用于H&R种子
+        # 判断是否为H&R种子并且是否配置了特定的H&R条件
+        hr_specific_conditions_configured = hit_and_run and (self.hr_seed_time or self.seed_ratio)
+        if hr_specific_conditions_configured:
+            if (self.hr_seed_time and torrent_info.get("seeding_time")
+                    >= float(self.hr_seed_time) * 3600):
+                return True, (f"H&R种子，做种时间 {torrent_info.get('seeding_time') / 3600:.1f} 小时，"
+                              f"大于 {self.hr_seed_time} 小时")
+            if self.seed_ratio and torrent_info.get("ratio") >= float(self.seed_ratio):
+                return True, f"H&R种子，分享率 {torrent_info.get('ratio'):.2f}，大于 {self.seed_ratio}"
+            return False, "H&R种子，未能满足设置的H&R删除条件"
+
+        # 处理其他场景，1. 不是H&R种子；2. 是H&R种子但没有特定条件配置
+        reason = reason if not hit_and_run else "H&R种子（未设置H&R条件），未能满足设置的删除条件"
+        if self.seed_time and torrent_info.get("seeding_time") >= float(self.seed_time) * 3600:
+            reason = f"做种时间 {torrent_info.get('seeding_time') / 3600:.1f} 小时，大于 {self.seed_time} 小时"
+        elif self.seed_ratio and torrent_info.get("ratio") >= float(self.seed_ratio):
+            reason = f"分享率 {torrent_info.get('ratio'):.2f}，大于 {self.seed_ratio}"
+        elif self.seed_size and torrent_info.get("uploaded") >= float(self.seed_size) * 1024 ** 3:
+            reason = f"上传量 {torrent_info.get('uploaded') / 1024 ** 3:.1f} GB，大于 {self.seed_size} GB"
+        elif self.download_time and torrent_info.get("downloaded") < torrent_info.get(
+                "total_size") and torrent_info.get("dltime") >= float(self.download_time) * 3600:
+            reason = f"下载耗时 {torrent_info.get('dltime') / 3600:.1f} 小时，大于 {self.download_time} 小时"
+        elif self.seed_avgspeed and torrent_info.get("avg_upspeed") <= float(
+                self.seed_avgspeed) * 1024 and torrent_info.get("seeding_time") >= 30 * 60:
+            reason = f"平均上传速度 {torrent_info.get('avg_upspeed') / 1024:.1f} KB/s，低于 {self.seed_avgspeed} KB/s"
+        elif self.seed_inactivetime and torrent_info.get("iatime") >= float(
+                self.seed_inactivetime) * 60:
+            reason = f"未活动时间 {torrent_info.get('iatime') / 60:.0f} 分钟，大于 {self.seed_inactivetime} 分钟"
+        else:
+            return False, reason
+
+        return True, reason if not hit_and_run else "H&R种子（未设置H&R条件），" + reason
+
+    def evaluate_proxy_pre_delete(self, torrent_info: dict) -> Tuple[bool, str]:
+        """
+        评估动态删除前置条件并返回是否应删除种子及其原因
+        """
+        if self.download_time and torrent_info.get("downloaded") < torrent_info.get(
+                "total_size") and torrent_info.get("dltime") >= float(self.download_time) * 3600:
+            return True, f"下载耗时 {torrent_info.get('dltime') / 3600:.1f} 小时，大于 {self.download_time} 小时"
+        return False, "未能满足动态删除设置的前置删除条件"
+
+    def __build_conditions(self) -> List[Callable[[Any, Optional[datetime]], Optional[str]]]:
+        """
+        仅保留已配置的条件，顺序与原有判断保持一致
+        """
+        conditions = []
+        # 促销条件
+        if self.freeleech:
+            conditions.append(self.__check_freeleech)
+        # H&R
+        if self.hr == "yes":
+            conditions.append(self.__check_hr)
+        # 包含规则
+        if self.include is not None:
+            conditions.append(self.__check_include)
+        # 排除规则
+        if self.exclude is not None:
+            conditions.append(self.__check_exclude)
+        # 种子大小
+        if self.size_range:
+            conditions.append(self.__check_size)
+        # 做种人数
+        if self.seeder_range:
+            conditions.append(self.__check_seeder)
+        # 发布时间
+        if self.pubtime_range:
+            conditions.append(self.__check_pubtime)
+        return conditions
+
+    def __check_freeleech(self, torrent: Any, now: Optional[datetime] = None) -> Optional[str]:
+        if torrent.downloadvolumefactor != 0:
+            return "非免费种子"
+        if self.freeleech == "2xfree" and torrent.uploadvolumefactor != 2:
+            return "非双倍上传种子"
+        return None
+
+    @staticmethod
+    def __check_hr(torrent: Any, now: Optional[datetime] = None) -> Optional[str]:
+        if torrent.hit_and_run:
+            return "存在H&R"
+        return None
+
+    def __check_include(self, torrent: Any, now: Optional[datetime] = None) -> Optional[str]:
+        include = self.include
+        if include is False:
+            return "包含规则无效"
+        if not (include.search(torrent.title or "") or include.search(torrent.description or "")):
+            return "不符合包含规则"
+        return None
+
+    def __check_exclude(self, torrent: Any, now: Optional[datetime] = None) -> Optional[str]:
+        exclude = self.exclude
+        if exclude is False:
+            return "排除规则无效"
+        if exclude.search(torrent.title or "") or exclude.search(torrent.description or ""):
+            return "符合排除规则"
+        return None
+
+    def __check_size(self, torrent: Any, now: Optional[datetime] = None) -> Optional[str]:
+        sizes = self.size_range
+        if len(sizes) == 1 and torrent.size < sizes[0]:
+            return f"种子大小 {torrent.size / 1024 ** 3:.1f} GB，不符合条件"
+        elif len(sizes) > 1 and not sizes[0] <= torrent.size <= sizes[1]:
+            return f"种子大小 {torrent.size / 1024 ** 3:.1f} GB，不在指定范围内"
+        return None
+
+    def __check_seeder(self, torrent: Any, now: Optional[datetime] = None) -> Optional[str]:
+        seeders_range = self.seeder_range
+        # 检查是否仅指定了一个数字，即做种人数需要小于等于该数字
+        if len(seeders_range) == 1:
+            if torrent.seeders > seeders_range[0]:
+                return f"做种人数 {torrent.seeders}，超过单个指定值"
+        # 如果指定了一个范围，检查做种人数是否在指定的范围内（包括边界）
+        elif not (seeders_range[0] <= torrent.seeders <= seeders_range[1]):
+            return f"做种人数 {torrent.seeders}，不在指定范围内"
+        return None
+
+    def __check_pubtime(self, torrent: Any, now: Optional[datetime] = None) -> Optional[str]:
+        pubtimes = self.pubtime_range
+        pubdate_minutes = self.get_pubminutes(torrent.pubdate, now=now)
+        if len(pubtimes) == 1:
+            # 单个值：选择发布时间小于等于该值的种子
+            if pubdate_minutes > pubtimes[0]:
+                return f"发布时间 {torrent.pubdate}，{pubdate_minutes:.0f} 分钟前，不符合条件"
+        # 范围值：选择发布时间在范围内的种子
+        elif not (pubtimes[0] <= pubdate_minutes <= pubtimes[1]):
+            return f"发布时间 {torrent.pubdate}，{pubdate_minutes:.0f} 分钟前，不在指定范围内"
+        return None
+
+    @staticmethod
+    def get_pubminutes(pubdate: str, now: Optional[datetime] = None) -> float:
+        """
+        将字符串转换为时间，并计算与当前时间差（分钟）
+        """
+        try:
+            if not pubdate:
+                return 0
+            pubdate = pubdate.replace("T", " ").replace("Z", "")
+            pubdate = datetime.strptime(pubdate, "%Y-%m-%d %H:%M:%S")
+            now = now or datetime.now()
+            return (now - pubdate).total_seconds() // 60
+        except Exception as e:
+            logger.error(f"发布时间 {pubdate} 获取分钟失败，错误详情: {e}")
+            return 0
+
+    @staticmethod
+    def __to_gb(size_in_bytes: float) -> float:
+        return size_in_bytes / (1024 ** 3)
+
+    @staticmethod
+    def __parse_range(value: Any, factor: float = 1, desc: str = "") -> Optional[Tuple[float, ...]]:
+        """
+        解析数字或数字范围（如'5'、'5-10'），返回乘以系数后的元组
+        """
+        if value is None or value == "":
+            return None
+        try:
+            return tuple(float(n) * factor for n in str(value).split("-"))
+        except (ValueError, TypeError):
+            logger.error(f"站点刷流{desc}配置解析失败，已忽略该条件：{value}")
+            return None
+
+    @staticmethod
+    def __compile_pattern(pattern: Optional[str], desc: str = "") -> Optional[Pattern]:
+        """
+        预编译正则表达式，编译失败时返回False，此时对应条件不通过任何种子
+        """
+        if not pattern:
+            return None
+        try:
+            return re.compile(pattern, re.I)
+        except re.error as e:
+            logger.error(f"站点刷流{desc}配置错误：{pattern}，错误详情: {e}")
+            return False
@@ -0,0 +1,202 @@
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.log import logger
+
+
+class DeleteCandidate:
+    """
+    动态删种候选种子，在规划前一次性提取所需的种子指标，规划过程中不再访问下载器种子对象
+    """
+
+    __slots__ = ("hash", "site_name", "title", "description", "size", "seeding_time", "hit_and_run",
+                 "proxy_delete", "torrent_info", "torrent_task")
+
+    def __init__(self, torrent_hash: str, torrent_task: dict, torrent_info: dict, proxy_delete: bool):
+        self.hash = torrent_hash
+        self.site_name = torrent_task.get("site_name", "")
+        self.title = torrent_task.get("title", "")
+        self.description = torrent_task.get("description", "")
+        self.size = torrent_info.get("total_size", 0) or 0
+        self.seeding_time = torrent_info.get("seeding_time", 0) or 0
+        self.hit_and_run = bool(torrent_task.get("hit_and_run", False))
+        self.proxy_delete = proxy_delete
+        self.torrent_info = torrent_info
+        self.torrent_task = torrent_task
+
+
+class DeletePlanEntry:
+    """
+    删种计划中的单个种子及删除原因
+    """
+
+    # 动态删除前置条件
+    STAGE_PRE = "pre"
+    # 未托管种子按用户删除规则
+    STAGE_RULE = "rule"
+    # 托管种子按用户删除规则
+    STAGE_PROXY_RULE = "proxy_rule"
+    # 按做种时间删除至阈值下限
+    STAGE_THRESHOLD = "threshold"
+
+    __slots__ = ("candidate", "stage", "reason", "notify")
+
+    def __init__(self, candidate: DeleteCandidate, stage: str, reason: str, notify: bool = True):
+        self.candidate = candidate
+        self.stage = stage
+        self.reason = reason
+        # 是否需要单独发送删除消息
+        self.notify = notify
+
+
+class DeletePlan:
+    """
+    删种计划，包含需要删除的种子及删除前后的做种体积，可用于试运行时输出删除说明
+    """
+
+    def __init__(self, initial_size: float, min_size: float = 0, max_size: float = 0):
+        self.entries: List[DeletePlanEntry] = []
+        self.initial_size = initial_size
+        self.final_size = initial_size
+        self.min_size = min_size
+        self.max_size = max_size
+
+    @property
+    def hashes(self) -> List[str]:
+        return [entry.candidate.hash for entry in self.entries]
+
+    @property
+    def sites(self) -> Set[str]:
+        return {entry.candidate.site_name for entry in self.entries}
+
+    def add(self, entry: DeletePlanEntry):
+        self.entries.append(entry)
+        self.final_size -= entry.candidate.size
+
+    def explain(self) -> List[str]:
+        """
+        输出删种计划说明
+        """
+        lines = [f"做种体积 {self.initial_size / 1024 ** 3:.1f} GB，上限 {self.max_size / 1024 ** 3:.1f} GB，"
+                 f"下限 {self.min_size / 1024 ** 3:.1f} GB，计划删除 {len(self.entries)} 个种子，"
+                 f"删除后做种体积 {self.final_size / 1024 ** 3:.1f} GB"]
+        for entry in self.entries:
+            candidate = entry.candidate
+            lines.append(f"[{entry.stage}] 站点：{candidate.site_name}，{entry.reason}，"
+                         f"种子：{candidate.title}|{candidate.description}")
+        return lines
+
+
+class DeletePlanner:
+    """
+    动态删种规划，候选种子只遍历常数次，成员判断均使用集合，仅在按做种时间删除时排序一次
+    """
+
+    def __init__(self, delete_size_range: Tuple[float, ...],
+                 evaluate_pre_conditions: Callable[[DeleteCandidate], Tuple[bool, str]],
+                 evaluate_conditions: Callable[[DeleteCandidate], Tuple[bool, str]],
+                 completed_hashes_getter: Callable[[List[str]], Iterable[str]]):
+        """
+        :param delete_size_range: 动态删种阈值（Byte）
+        :param evaluate_pre_conditions: 动态删除前置条件判断
+        :param evaluate_conditions: 用户删除规则判断
+        :param completed_hashes_getter: 获取已完成种子的方法
+        """
+        self.min_size = delete_size_range[0]
+        self.max_size = delete_size_range[1] if len(delete_size_range) > 1 else delete_size_range[0]
+        # 区间删除时一次性删除的种子较多，不单独发送消息
+        self.size_range = len(delete_size_range) > 1
+        self._evaluate_pre_conditions = evaluate_pre_conditions
+        self._evaluate_conditions = evaluate_conditions
+        self._completed_hashes_getter = completed_hashes_getter
+
+    def plan(self, candidates: List[DeleteCandidate], total_size: float) -> DeletePlan:
+        """
+        生成删种计划，删除顺序及原因与原有动态删种规则保持一致
+        """
+        plan = DeletePlan(initial_size=total_size, min_size=self.min_size, max_size=self.max_size)
+
+        logger.info(f"当前做种体积 {self.__to_gb(plan.final_size):.1f} GB，正在准备计算满足动态前置删除条件的种子")
+
+        # 执行排除H&R种子后满足前置删除条件的种子
+        remaining = []
+        pre_delete_size, pre_delete_count = 0, 0
+        for candidate in candidates:
+            if not candidate.hit_and_run:
+                should_delete, reason = self._evaluate_pre_conditions(candidate)
+                if should_delete:
+                    plan.add(DeletePlanEntry(candidate=candidate, stage=DeletePlanEntry.STAGE_PRE, reason=reason))
+                    pre_delete_size += candidate.size
+                    pre_delete_count += 1
+                    continue
+                self.__log_skip(candidate, reason)
+            remaining.append(candidate)
+
+        if pre_delete_count:
+            logger.info(f"满足动态删除前置条件的种子共 {pre_delete_count} 个，体积 {self.__to_gb(pre_delete_size):.1f} GB，"
+                        f"删除种子后，当前做种体积 {self.__to_gb(plan.final_size):.1f} GB")
+        else:
+            logger.info(f"没有找到任何满足动态删除前置条件的种子")
+
+        # 当总体积未超过最大阈值时，不需要执行删除操作
+        if plan.final_size < self.max_size:
+            logger.info(f"当前做种体积 {self.__to_gb(plan.final_size):.1f} GB，上限 {self.__to_gb(self.max_size):.1f} GB，"
+                        f"下限 {self.__to_gb(self.min_size):.1f} GB，未进一步触发动态删除")
+            return plan
+        logger.info(f"当前做种体积 {self.__to_gb(plan.final_size):.1f} GB，上限 {self.__to_gb(self.max_size):.1f} GB，"
+                    f"下限 {self.__to_gb(self.min_size):.1f} GB，进一步触发动态删除")
+
+        # 部分站点可能单独关闭了动态删除，先处理未托管的种子，按设置的规则进行删除
+        proxy_candidates = [candidate for candidate in remaining if candidate.proxy_delete]
+        not_proxy_candidates = [candidate for candidate in remaining if not candidate.proxy_delete]
+        logger.info(f"托管种子数 {len(proxy_candidates)}，未托管种子数 {len(not_proxy_candidates)}")
+        self.__plan_by_conditions(plan=plan, candidates=not_proxy_candidates, stage=DeletePlanEntry.STAGE_RULE)
+
+        # 如果删除未托管种子后仍未达到最小体积要求，则处理托管种子
+        deleted_hashes: Set[str] = set()
+        if plan.final_size > self.min_size and proxy_candidates:
+            deleted_hashes = self.__plan_by_conditions(plan=plan, candidates=proxy_candidates,
+                                                       stage=DeletePlanEntry.STAGE_PROXY_RULE)
+
+        # 如果总体积仍然超过最小阈值，则在已完成的托管种子中排除H&R种子后按做种时间倒序进行删除
+        if plan.final_size > self.min_size:
+            candidate_map: Dict[str, DeleteCandidate] = {candidate.hash: candidate for candidate in proxy_candidates
+                                                         if candidate.hash not in deleted_hashes}
+            completed_hashes = set(self._completed_hashes_getter(list(candidate_map.keys())) or [])
+            completed_candidates = [candidate for torrent_hash, candidate in candidate_map.items()
+                                    if torrent_hash in completed_hashes and not candidate.hit_and_run]
+            completed_candidates.sort(key=lambda x: x.seeding_time, reverse=True)
+            for candidate in completed_candidates:
+                if plan.final_size <= self.min_size:
+                    break
+                # 与原有逻辑保持一致，删除原因中使用刷流任务中记录的做种时间
+                seeding_time = candidate.torrent_task.get("seeding_time", 0)
+                reason = (f"触发动态删除阈值，系统自动删除，做种时间 {(seeding_time or 0) / 3600:.1f} 小时，"
+                          f"当前做种体积 {self.__to_gb(plan.final_size - candidate.size):.1f} GB")
+                plan.add(DeletePlanEntry(candidate=candidate, stage=DeletePlanEntry.STAGE_THRESHOLD, reason=reason,
+                                         notify=bool(seeding_time) and not self.size_range))
+
+        return plan
+
+    def __plan_by_conditions(self, plan: DeletePlan, candidates: List[DeleteCandidate], stage: str) -> Set[str]:
+        """
+        按用户删除规则加入删种计划，返回加入计划的种子Hash
+        """
+        deleted_hashes = set()
+        for candidate in candidates:
+            should_delete, reason = self._evaluate_conditions(candidate)
+            if should_delete:
+                if stage == DeletePlanEntry.STAGE_PROXY_RULE:
+                    reason = "触发动态删除阈值，" + reason
+                plan.add(DeletePlanEntry(candidate=candidate, stage=stage, reason=reason))
+                deleted_hashes.add(candidate.hash)
+            else:
+                self.__log_skip(candidate, reason)
+        return deleted_hashes
+
+    @staticmethod
+    def __log_skip(candidate: DeleteCandidate, reason: Optional[str]):
+        logger.debug(f"站点：{candidate.site_name}，{reason}，不删除种子：{candidate.title}|{candidate.description}")
+
+    @staticmethod
+    def __to_gb(size_in_bytes: float) -> float:
+        return size_in_bytes / (1024 ** 3)
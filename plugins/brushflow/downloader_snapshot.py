@@ -0,0 +1,45 @@
+import time
+from typing import Optional
+
+
+class DownloaderSnapshot:
+    """
+    刷流周期内的下载器状态快照，新增刷流任务时在本地同步更新，避免逐个种子查询下载器
+    """
+
+    def __init__(self, torrents_size: float = 0):
+        # 正在下载的刷流任务数
+        self.downloading_count = 0
+        # 总上传/下载速度 Byte/s
+        self.upload_speed = 0
+        self.download_speed = 0
+        # 保种体积 Byte
+        self.torrents_size = torrents_size or 0
+        # 最近一次从下载器获取状态的时间
+        self.refreshed_at: Optional[float] = None
+
+    def update(self, downloading_count: int = 0, upload_speed: float = 0, download_speed: float = 0):
+        """
+        使用下载器最新状态更新快照，保种体积由刷流任务维护，这里不做调整
+        """
+        self.downloading_count = downloading_count or 0
+        self.upload_speed = upload_speed or 0
+        self.download_speed = download_speed or 0
+        self.refreshed_at = time.time()
+
+    def is_expired(self, refresh_interval: Optional[float] = None) -> bool:
+        """
+        是否需要重新获取下载器状态，没有设置刷新间隔时，整个刷流周期只获取一次
+        """
+        if self.refreshed_at is None:
+            return True
+        if not refresh_interval:
+            return False
+        return time.time() - self.refreshed_at >= float(refresh_interval)
+
+    def add_torrent(self, size: float):
+        """
+        新增刷流任务后同步更新快照
+        """
+        self.downloading_count += 1
+        self.torrents_size += size or 0
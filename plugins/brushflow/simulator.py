@@ -0,0 +1,300 @@
+import hashlib
+import json
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+from app.log import logger
+from app.plugins.brushflow import BrushConfig
+from app.plugins.brushflow.delete_planner import DeleteCandidate, DeletePlanner
+from app.plugins.brushflow.task_index import BrushTaskIndex
+from app.schemas import TorrentInfo
+
+
+class FakeDownloader:
+    """
+    内存下载器，种子数据结构与qBittorrent保持一致，按模拟时间推进下载及上传进度
+    """
+
+    def __init__(self, download_speed: float = 10 * 1024 ** 2, upload_speed_per_peer: float = 100 * 1024):
+        """
+        :param download_speed: 单个种子下载速度 Byte/s
+        :param upload_speed_per_peer: 每个下载者带来的上传速度 Byte/s
+        """
+        self.download_speed = download_speed
+        self.upload_speed_per_peer = upload_speed_per_peer
+        self.torrents: Dict[str, dict] = {}
+        self._now: Optional[float] = None
+
+    def load(self, torrents: Iterable[dict]):
+        """
+        载入记录的下载器种子快照，已存在的种子以快照为准
+        """
+        for torrent in torrents:
+            torrent_hash = torrent.get("hash")
+            if torrent_hash:
+                self.torrents[torrent_hash] = dict(torrent)
+
+    def add_torrent(self, torrent: TorrentInfo, now: float) -> str:
+        torrent_hash = hashlib.sha1(f"{torrent.site_name}{torrent.page_url}{torrent.title}".encode()).hexdigest()
+        self.torrents[torrent_hash] = {
+            "hash": torrent_hash,
+            "name": torrent.title,
+            "total_size": torrent.size or 0,
+            "downloaded": 0,
+            "uploaded": 0,
+            "ratio": 0,
+            "progress": 0,
+            "added_on": int(now),
+            "completion_on": -1,
+            "last_activity": int(now),
+            "num_leechs": torrent.peers or 0,
+            "tags": "刷流",
+        }
+        return torrent_hash
+
+    def delete_torrents(self, ids: Iterable[str]) -> bool:
+        for torrent_hash in ids:
+            self.torrents.pop(torrent_hash, None)
+        return True
+
+    def advance(self, now: float):
+        """
+        推进模拟时间，上传速度按种子下载者数量估算，下载完成后下载者逐步减少
+        """
+        if self._now is None or now <= self._now:
+            self._now = now
+            return
+        elapsed = now - self._now
+        self._now = now
+        for torrent in self.torrents.values():
+            total_size = torrent.get("total_size") or 0
+            if torrent.get("progress", 0) < 1 and total_size:
+                downloaded = min(total_size, torrent.get("downloaded", 0) + self.download_speed * elapsed)
+                torrent["downloaded"] = downloaded
+                torrent["progress"] = downloaded / total_size
+                if downloaded >= total_size:
+                    torrent["completion_on"] = int(now)
+            peers = torrent.get("num_leechs") or 0
+            if peers:
+                torrent["uploaded"] = torrent.get("uploaded", 0) + peers * self.upload_speed_per_peer * elapsed
+                torrent["last_activity"] = int(now)
+                if torrent.get("progress", 0) >= 1:
+                    torrent["num_leechs"] = peers // 2
+            if torrent.get("downloaded"):
+                torrent["ratio"] = torrent["uploaded"] / torrent["downloaded"]
+
+    def get_completed_hashes(self, hashes: Iterable[str]) -> List[str]:
+        return [torrent_hash for torrent_hash in hashes
+                if (self.torrents.get(torrent_hash) or {}).get("progress", 0) >= 1]
+
+    def get_downloading_count(self) -> int:
+        return sum(1 for torrent in self.torrents.values() if torrent.get("progress", 0) < 1)
+
+    def get_torrent_info(self, torrent_hash: str, now: float) -> dict:
+        """
+        按插件获取qBittorrent种子信息的方式计算种子指标，当前时间使用模拟时间
+        """
+        torrent = self.torrents.get(torrent_hash) or {}
+        added_on = torrent.get("added_on") or 0
+        completion_on = torrent.get("completion_on") or 0
+        last_activity = torrent.get("last_activity") or 0
+        dltime = now - added_on if added_on > 0 else 0
+        uploaded = torrent.get("uploaded") or 0
+        return {
+            "hash": torrent_hash,
+            "title": torrent.get("name"),
+            "seeding_time": now - completion_on if completion_on > 0 else 0,
+            "ratio": torrent.get("ratio") or 0,
+            "uploaded": uploaded,
+            "downloaded": torrent.get("downloaded"),
+            "avg_upspeed": int(uploaded / dltime) if dltime else uploaded,
+            "iatime": now - last_activity if last_activity > 0 else 0,
+            "dltime": dltime,
+            "total_size": torrent.get("total_size"),
+        }
+
+
+class SimulationReport:
+    """
+    回放结果，包含刷流及删种的决策统计与耗时
+    """
+
+    def __init__(self):
+        self.rounds = 0
+        self.candidates = 0
+        self.admitted = 0
+        self.deleted = 0
+        self.delete_decisions = 0
+        self.reject_reasons: Counter = Counter()
+        self.brush_elapsed = 0.0
+        self.delete_elapsed = 0.0
+        self.uploaded = 0.0
+        self.downloaded = 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "rounds": self.rounds,
+            "candidates": self.candidates,
+            "admitted": self.admitted,
+            "deleted": self.deleted,
+            "reject_reasons": dict(self.reject_reasons.most_common()),
+            "candidates_per_sec": round(self.candidates / self.brush_elapsed, 1) if self.brush_elapsed else 0,
+            "decisions_per_sec": round(self.delete_decisions / self.delete_elapsed, 1) if self.delete_elapsed else 0,
+            "uploaded": self.uploaded,
+            "downloaded": self.downloaded,
+            "ratio": round(self.uploaded / self.downloaded, 2) if self.downloaded else 0,
+        }
+
+
+class BrushFlowSimulator:
+    """
+    刷流离线回放，使用记录的站点种子及下载器种子快照依次执行删种检查与刷流判断，不访问站点及真实下载器
+    回放数据为按时间排序的列表，每轮格式如下：
+    {
+        "time": 1700000000,
+        "torrents": [{TorrentInfo字段}],
+        "downloader": [{qBittorrent种子字段}]  // 可选，记录的下载器种子快照
+    }
+    """
+
+    def __init__(self, config: dict, downloader: Optional[FakeDownloader] = None):
+        self.brush_config = BrushConfig(config=config)
+        self.downloader = downloader or FakeDownloader()
+        self.torrent_tasks: Dict[str, dict] = {}
+        self.task_index = BrushTaskIndex()
+        self.report = SimulationReport()
+
+    @staticmethod
+    def load_rounds(path: Union[str, Path]) -> List[dict]:
+        with open(path, "r", encoding="utf-8") as f:
+            rounds = json.load(f)
+        return sorted(rounds, key=lambda x: x.get("time") or 0)
+
+    def run(self, rounds: List[dict]) -> SimulationReport:
+        for replay_round in rounds:
+            now = float(replay_round.get("time") or time.time())
+            self.downloader.advance(now)
+            if replay_round.get("downloader"):
+                self.downloader.load(replay_round.get("downloader"))
+            self.__check(now=now)
+            self.__brush(torrents=[TorrentInfo(**torrent) for torrent in replay_round.get("torrents") or []],
+                         now=now)
+            self.report.rounds += 1
+
+        active_tasks = [task for task in self.torrent_tasks.values() if not task.get("deleted")]
+        self.report.uploaded = sum(task.get("uploaded") or 0 for task in self.torrent_tasks.values())
+        self.report.downloaded = sum(task.get("downloaded") or 0 for task in self.torrent_tasks.values())
+        logger.info(f"刷流回放完成，共 {self.report.rounds} 轮，当前刷流任务 {len(active_tasks)} 个，"
+                    f"回放结果：{self.report.to_dict()}")
+        return self.report
+
+    def __brush(self, torrents: List[TorrentInfo], now: float):
+        brush_config = self.brush_config
+        torrents_size = sum(task.get("size") or 0 for task in self.torrent_tasks.values() if not task.get("deleted"))
+        downloading_count = self.downloader.get_downloading_count()
+        current_time = datetime.fromtimestamp(now)
+
+        start = time.perf_counter()
+        for torrent in torrents:
+            self.report.candidates += 1
+            if brush_config.maxdlcount and downloading_count >= int(brush_config.maxdlcount):
+                self.report.reject_reasons["下载任务数已达到最大值"] += 1
+                continue
+            reason = self.task_index.check_duplicate(torrent=torrent)
+            if not reason:
+                site_config = brush_config.get_site_config(sitename=torrent.site_name)
+                passed, reason = site_config.rules.evaluate(torrent=torrent, now=current_time)
+                if passed:
+                    passed, reason = brush_config.rules.evaluate_disk_size(torrents_size=torrents_size,
+                                                                           add_torrent_size=torrent.size)
+                if passed:
+                    torrent_hash = self.downloader.add_torrent(torrent=torrent, now=now)
+                    torrent_task = {
+                        "site_name": torrent.site_name,
+                        "title": torrent.title,
+                        "size": torrent.size,
+                        "description": torrent.description,
+                        "page_url": torrent.page_url,
+                        "hit_and_run": torrent.hit_and_run or site_config.site_hr_active,
+                        "time": now,
+                        "ratio": 0,
+                        "downloaded": 0,
+                        "uploaded": 0,
+                        "deleted": False,
+                    }
+                    self.torrent_tasks[torrent_hash] = torrent_task
+                    self.task_index.add(torrent_hash=torrent_hash, task=torrent_task)
+                    torrents_size += torrent.size or 0
+                    downloading_count += 1
+                    self.report.admitted += 1
+                    continue
+            # 原因中包含具体数值，这里仅按原因类型汇总
+            self.report.reject_reasons[(reason or "").split(" ")[0].rstrip("，")] += 1
+        self.report.brush_elapsed += time.perf_counter() - start
+
+    def __check(self, now: float):
+        brush_config = self.brush_config
+        candidates = []
+        for torrent_hash, torrent_task in self.torrent_tasks.items():
+            if torrent_task.get("deleted"):
+                continue
+            if torrent_hash not in self.downloader.torrents:
+                torrent_task["deleted"] = True
+                torrent_task["deleted_time"] = now
+                continue
+            torrent_info = self.downloader.get_torrent_info(torrent_hash=torrent_hash, now=now)
+            torrent_task.update({
+                "downloaded": torrent_info.get("downloaded"),
+                "uploaded": torrent_info.get("uploaded"),
+                "ratio": torrent_info.get("ratio"),
+                "seeding_time": torrent_info.get("seeding_time"),
+            })
+            self.task_index.update(torrent_hash=torrent_hash, task=torrent_task)
+            site_config = brush_config.get_site_config(sitename=torrent_task.get("site_name"))
+            candidates.append(DeleteCandidate(torrent_hash=torrent_hash, torrent_task=torrent_task,
+                                              torrent_info=torrent_info,
+                                              proxy_delete=bool(site_config.proxy_delete)))
+
+        start = time.perf_counter()
+        if brush_config.proxy_delete and brush_config.rules.delete_size_range:
+            planner = DeletePlanner(
+                delete_size_range=brush_config.rules.delete_size_range,
+                evaluate_pre_conditions=lambda candidate: brush_config.get_site_config(
+                    sitename=candidate.site_name).rules.evaluate_proxy_pre_delete(torrent_info=candidate.torrent_info),
+                evaluate_conditions=lambda candidate: brush_config.get_site_config(
+                    sitename=candidate.site_name).rules.evaluate_delete(torrent_info=candidate.torrent_info,
+                                                                        hit_and_run=candidate.hit_and_run),
+                completed_hashes_getter=self.downloader.get_completed_hashes)
+            plan = planner.plan(candidates=candidates,
+                                total_size=sum(candidate.size for candidate in candidates))
+            delete_hashes = plan.hashes
+            for line in plan.explain():
+                logger.debug(line)
+        else:
+            delete_hashes = [candidate.hash for candidate in candidates
+                             if brush_config.get_site_config(sitename=candidate.site_name).rules.evaluate_delete(
+                                 torrent_info=candidate.torrent_info, hit_and_run=candidate.hit_and_run)[0]]
+        self.report.delete_elapsed += time.perf_counter() - start
+        self.report.delete_decisions += len(candidates)
+
+        if delete_hashes:
+            self.downloader.delete_torrents(ids=delete_hashes)
+            for torrent_hash in delete_hashes:
+                self.torrent_tasks[torrent_hash]["deleted"] = True
+                self.torrent_tasks[torrent_hash]["deleted_time"] = now
+            self.report.deleted += len(delete_hashes)
+
+
+if __name__ == "__main__":
+    # 用法：python -m app.plugins.brushflow.simulator 回放数据.json 刷流配置.json
+    if len(sys.argv) < 3:
+        print("用法：python -m app.plugins.brushflow.simulator <回放数据.json> <刷流配置.json>")
+        sys.exit(1)
+    with open(sys.argv[2], "r", encoding="utf-8") as config_file:
+        simulator = BrushFlowSimulator(config=json.load(config_file))
+    print(json.dumps(simulator.run(rounds=BrushFlowSimulator.load_rounds(sys.argv[1])).to_dict(),
+                     ensure_ascii=False, indent=2))
@@ -0,0 +1,82 @@
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+
+class SubscribeTitleMatcher:
+    """
+    订阅标题多模式匹配（Aho–Corasick），订阅标题集合变化时才重新构建，每个文本只需扫描一次
+    """
+
+    def __init__(self, titles: Optional[Iterable[str]] = None):
+        self._titles: FrozenSet[str] = frozenset()
+        # 状态转移表、失败指针以及每个状态命中的订阅标题
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Optional[str]] = [None]
+        if titles:
+            self.update(titles=titles)
+
+    def __len__(self):
+        return len(self._titles)
+
+    @property
+    def titles(self) -> FrozenSet[str]:
+        return self._titles
+
+    def update(self, titles: Iterable[str]) -> bool:
+        """
+        更新订阅标题，返回是否重新构建
+        """
+        titles = frozenset(title for title in titles if title)
+        if titles == self._titles:
+            return False
+        self._titles = titles
+        self.__build()
+        return True
+
+    def search(self, text: str) -> Optional[str]:
+        """
+        返回文本中包含的任一订阅标题，没有命中时返回None
+        """
+        if not text or not self._titles:
+            return None
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state] is not None:
+                return output[state]
+        return None
+
+    def __build(self):
+        goto: List[Dict[str, int]] = [{}]
+        output: List[Optional[str]] = [None]
+        for title in self._titles:
+            state = 0
+            for char in title:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    output.append(None)
+                state = next_state
+            output[state] = title
+
+        # 按层构建失败指针，并将失败状态命中的标题合并到当前状态，匹配时无需再沿失败链查找
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in goto[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = goto[fallback].get(char, 0) if goto[fallback].get(char) != next_state else 0
+                if output[next_state] is None:
+                    output[next_state] = output[fail[next_state]]
+
+        self._goto, self._fail, self._output = goto, fail, output
@@ -0,0 +1,136 @@
+from typing import Any, Dict, Optional, Set
+
+
+class BrushTaskIndex:
+    """
+    刷流任务索引，用于在刷流时进行重复种子判断
+    - 站点+标题
+    - 站点+详情地址
+    - 标题 -> 尚未完成的任务（hash -> 站点名称）
+    """
+
+    def __init__(self, torrent_tasks: Optional[Dict[str, dict]] = None):
+        self._site_titles: Dict[str, Set[str]] = {}
+        self._site_page_urls: Dict[str, Set[str]] = {}
+        self._unfinished_titles: Dict[str, Dict[str, str]] = {}
+        # hash -> 建立索引时使用的键，用于移除时定位
+        self._task_keys: Dict[str, tuple] = {}
+        if torrent_tasks:
+            self.rebuild(torrent_tasks=torrent_tasks)
+
+    def __len__(self):
+        return len(self._task_keys)
+
+    def __contains__(self, torrent_hash: str):
+        return torrent_hash in self._task_keys
+
+    def rebuild(self, torrent_tasks: Dict[str, dict]):
+        """
+        根据刷流任务重建索引
+        """
+        self._site_titles.clear()
+        self._site_page_urls.clear()
+        self._unfinished_titles.clear()
+        self._task_keys.clear()
+        for torrent_hash, task in torrent_tasks.items():
+            self.add(torrent_hash=torrent_hash, task=task)
+
+    def add(self, torrent_hash: str, task: dict):
+        """
+        添加任务到索引，如任务已存在则先移除旧索引
+        """
+        if not task:
+            return
+        if torrent_hash in self._task_keys:
+            self.remove(torrent_hash=torrent_hash)
+
+        site_name = f"{task.get('site_name')}"
+        title = f"{task.get('title')}"
+        site_title = f"{site_name}{title}"
+        site_page_url = f"{site_name}{task.get('page_url')}"
+        unfinished = self.__is_unfinished(task)
+
+        self._site_titles.setdefault(site_title, set()).add(torrent_hash)
+        self._site_page_urls.setdefault(site_page_url, set()).add(torrent_hash)
+        if unfinished:
+            self._unfinished_titles.setdefault(title, {})[torrent_hash] = site_name
+        self._task_keys[torrent_hash] = (site_title, site_page_url, title if unfinished else None)
+
+    def update(self, torrent_hash: str, task: dict):
+        """
+        任务状态变化后更新索引
+        """
+        self.add(torrent_hash=torrent_hash, task=task)
+
+    def remove(self, torrent_hash: str):
+        """
+        从索引中移除任务
+        """
+        keys = self._task_keys.pop(torrent_hash, None)
+        if not keys:
+            return
+        site_title, site_page_url, title = keys
+        self.__discard(self._site_titles, site_title, torrent_hash)
+        self.__discard(self._site_page_urls, site_page_url, torrent_hash)
+        if title is not None:
+            sites = self._unfinished_titles.get(title)
+            if sites is not None:
+                sites.pop(torrent_hash, None)
+                if not sites:
+                    del self._unfinished_titles[title]
+
+    def check_duplicate(self, torrent: Any) -> Optional[str]:
+        """
+        判断站点种子是否与已有任务重复，返回不通过的原因
+        """
+        # 默认根据标题和站点名称进行排除
+        if self.contains_site_title(site_name=torrent.site_name, title=torrent.title):
+            return "重复种子"
+
+        # 部分站点标题会上新时携带后缀，这里进一步根据种子详情地址进行排除
+        if torrent.page_url:
+            if self.contains_site_page_url(site_name=torrent.site_name, page_url=torrent.page_url):
+                return "重复种子"
+
+        # 不同站点如果遇到相同种子，判断前一个种子是否已经在做种，否则排除处理
+        if torrent.title:
+            if self.contains_unfinished_on_other_site(site_name=torrent.site_name, title=torrent.title):
+                return "其他站点存在尚未下载完成的相同种子"
+        return None
+
+    def contains_site_title(self, site_name: str, title: str) -> bool:
+        """
+        是否存在相同站点、相同标题的任务
+        """
+        return f"{site_name}{title}" in self._site_titles
+
+    def contains_site_page_url(self, site_name: str, page_url: str) -> bool:
+        """
+        是否存在相同站点、相同详情地址的任务
+        """
+        return f"{site_name}{page_url}" in self._site_page_urls
+
+    def contains_unfinished_on_other_site(self, site_name: str, title: str) -> bool:
+        """
+        其他站点是否存在尚未完成的相同标题任务
+        """
+        sites = self._unfinished_titles.get(title)
+        if not sites:
+            return False
+        return any(site != site_name for site in sites.values())
+
+    @staticmethod
+    def __is_unfinished(task: dict) -> bool:
+        """
+        与原有判断保持一致，没有做种时间记录的任务视为尚未完成
+        """
+        return not task.get("seed_time")
+
+    @staticmethod
+    def __discard(index: Dict[str, Set[str]], key: str, torrent_hash: str):
+        hashes = index.get(key)
+        if hashes is None:
+            return
+        hashes.discard(torrent_hash)
+        if not hashes:
+            del index[key]
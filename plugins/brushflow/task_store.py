@@ -0,0 +1,262 @@
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+from app.log import logger
+
+
+class BrushTaskDict(dict):
+    """
+    兼容原有字典用法的刷流任务集合，记录加载时每个任务的序列化结果，保存时仅写入发生变化的任务
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._snapshot: Dict[str, str] = {}
+
+    def mark_clean(self, snapshot: Optional[Dict[str, str]] = None):
+        self._snapshot = snapshot if snapshot is not None else {
+            torrent_hash: BrushTaskStore.dumps(task) for torrent_hash, task in self.items()
+        }
+
+    @property
+    def snapshot(self) -> Dict[str, str]:
+        return self._snapshot
+
+
+class BrushTaskStore:
+    """
+    刷流任务存储，每个任务一行，按类型及Hash进行写入，避免每次保存整个任务集合
+    - torrents：刷流任务
+    - archived：已归档任务
+    - unmanaged：已移除刷流标签的任务
+    统计数据按类型、站点、是否删除汇总在task_statistics表中，由触发器随任务写入同步增量维护
+    """
+
+    TORRENTS = "torrents"
+    ARCHIVED = "archived"
+    UNMANAGED = "unmanaged"
+
+    def __init__(self, db_path: Union[str, Path]):
+        self._db_path = str(db_path)
+        self._lock = threading.RLock()
+        self.__init_db()
+
+    def __connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def __init_db(self):
+        with self._lock:
+            conn = self.__connect()
+            try:
+                with conn:
+                    conn.execute("""
+                        CREATE TABLE IF NOT EXISTS tasks (
+                            kind TEXT NOT NULL,
+                            hash TEXT NOT NULL,
+                            site INTEGER,
+                            site_name TEXT,
+                            deleted INTEGER NOT NULL DEFAULT 0,
+                            time REAL,
+                            deleted_time REAL,
+                            uploaded REAL NOT NULL DEFAULT 0,
+                            downloaded REAL NOT NULL DEFAULT 0,
+                            data TEXT NOT NULL,
+                            PRIMARY KEY (kind, hash)
+                        )""")
+                    conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_kind_site ON tasks (kind, site)")
+                    conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_kind_deleted ON tasks (kind, deleted)")
+                    conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_kind_time ON tasks (kind, time)")
+                    conn.execute("""
+                        CREATE TABLE IF NOT EXISTS task_statistics (
+                            kind TEXT NOT NULL,
+                            site_name TEXT NOT NULL,
+                            deleted INTEGER NOT NULL,
+                            count INTEGER NOT NULL DEFAULT 0,
+                            uploaded REAL NOT NULL DEFAULT 0,
+                            downloaded REAL NOT NULL DEFAULT 0,
+                            PRIMARY KEY (kind, site_name, deleted)
+                        )""")
+                    statistics_created = conn.execute(
+                        "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'tasks_statistics_insert'"
+                    ).fetchone() is None
+                    conn.execute("""
+                        CREATE TRIGGER IF NOT EXISTS tasks_statistics_insert AFTER INSERT ON tasks BEGIN
+                            INSERT INTO task_statistics (kind, site_name, deleted, count, uploaded, downloaded)
+                            VALUES (NEW.kind, COALESCE(NEW.site_name, ''), NEW.deleted, 1, NEW.uploaded, NEW.downloaded)
+                            ON CONFLICT(kind, site_name, deleted) DO UPDATE SET
+                                count = count + 1, uploaded = uploaded + excluded.uploaded,
+                                downloaded = downloaded + excluded.downloaded;
+                        END""")
+                    conn.execute("""
+                        CREATE TRIGGER IF NOT EXISTS tasks_statistics_delete AFTER DELETE ON tasks BEGIN
+                            UPDATE task_statistics SET
+                                count = count - 1, uploaded = uploaded - OLD.uploaded,
+                                downloaded = downloaded - OLD.downloaded
+                            WHERE kind = OLD.kind AND site_name = COALESCE(OLD.site_name, '')
+                                AND deleted = OLD.deleted;
+                        END""")
+                    conn.execute("""
+                        CREATE TRIGGER IF NOT EXISTS tasks_statistics_update AFTER UPDATE ON tasks BEGIN
+                            UPDATE task_statistics SET
+                                count = count - 1, uploaded = uploaded - OLD.uploaded,
+                                downloaded = downloaded - OLD.downloaded
+                            WHERE kind = OLD.kind AND site_name = COALESCE(OLD.site_name, '')
+                                AND deleted = OLD.deleted;
+                            INSERT INTO task_statistics (kind, site_name, deleted, count, uploaded, downloaded)
+                            VALUES (NEW.kind, COALESCE(NEW.site_name, ''), NEW.deleted, 1, NEW.uploaded, NEW.downloaded)
+                            ON CONFLICT(kind, site_name, deleted) DO UPDATE SET
+                                count = count + 1, uploaded = uploaded + excluded.uploaded,
+                                downloaded = downloaded + excluded.downloaded;
+                        END""")
+                    # 首次创建统计触发器时，根据已有任务初始化统计数据
+                    if statistics_created:
+                        self.__rebuild_statistics(conn)
+            finally:
+                conn.close()
+
+    @staticmethod
+    def __rebuild_statistics(conn: sqlite3.Connection):
+        conn.execute("DELETE FROM task_statistics")
+        conn.execute("""
+            INSERT INTO task_statistics (kind, site_name, deleted, count, uploaded, downloaded)
+            SELECT kind, COALESCE(site_name, ''), deleted, COUNT(*), SUM(uploaded), SUM(downloaded)
+            FROM tasks GROUP BY kind, COALESCE(site_name, ''), deleted""")
+
+    @staticmethod
+    def dumps(task: dict) -> str:
+        return json.dumps(task, ensure_ascii=False, default=str)
+
+    @classmethod
+    def __to_row(cls, kind: str, torrent_hash: str, task: dict, data: Optional[str] = None) -> tuple:
+        return (kind, torrent_hash, task.get("site"), task.get("site_name"),
+                1 if task.get("deleted") else 0, task.get("time"), task.get("deleted_time"),
+                task.get("uploaded") or 0, task.get("downloaded") or 0,
+                data if data is not None else cls.dumps(task))
+
+    @staticmethod
+    def __upsert_rows(conn: sqlite3.Connection, rows: List[tuple]):
+        conn.executemany("""
+            INSERT INTO tasks (kind, hash, site, site_name, deleted, time, deleted_time, uploaded, downloaded, data)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(kind, hash) DO UPDATE SET
+                site = excluded.site, site_name = excluded.site_name, deleted = excluded.deleted,
+                time = excluded.time, deleted_time = excluded.deleted_time, uploaded = excluded.uploaded,
+                downloaded = excluded.downloaded, data = excluded.data""", rows)
+
+    @staticmethod
+    def __delete_rows(conn: sqlite3.Connection, kind: str, hashes: Iterable[str]):
+        conn.executemany("DELETE FROM tasks WHERE kind = ? AND hash = ?", [(kind, h) for h in hashes])
+
+    def load(self, kind: str) -> BrushTaskDict:
+        """
+        加载指定类型的全部任务
+        """
+        tasks = BrushTaskDict()
+        snapshot = {}
+        with self._lock:
+            conn = self.__connect()
+            try:
+                for torrent_hash, data in conn.execute("SELECT hash, data FROM tasks WHERE kind = ?", (kind,)):
+                    try:
+                        tasks[torrent_hash] = json.loads(data)
+                        snapshot[torrent_hash] = data
+                    except json.JSONDecodeError as e:
+                        logger.error(f"刷流任务数据解析失败，已忽略：{torrent_hash}，错误详情: {e}")
+            finally:
+                conn.close()
+        tasks.mark_clean(snapshot=snapshot)
+        return tasks
+
+    def save(self, kind: str, tasks: Dict[str, dict]):
+        """
+        保存任务集合，对于通过load加载的集合，仅写入新增、变化以及删除的任务，否则整体替换
+        """
+        snapshot = tasks.snapshot if isinstance(tasks, BrushTaskDict) else None
+        rows, new_snapshot = [], {}
+        for torrent_hash, task in tasks.items():
+            data = self.dumps(task)
+            new_snapshot[torrent_hash] = data
+            if snapshot is None or snapshot.get(torrent_hash) != data:
+                rows.append(self.__to_row(kind, torrent_hash, task, data))
+        with self._lock:
+            conn = self.__connect()
+            try:
+                with conn:
+                    if snapshot is None:
+                        conn.execute("DELETE FROM tasks WHERE kind = ?", (kind,))
+                    else:
+                        self.__delete_rows(conn, kind, snapshot.keys() - new_snapshot.keys())
+                    if rows:
+                        self.__upsert_rows(conn, rows)
+            finally:
+                conn.close()
+        if isinstance(tasks, BrushTaskDict):
+            tasks.mark_clean(snapshot=new_snapshot)
+
+    def upsert(self, kind: str, tasks: Dict[str, dict]):
+        """
+        写入或更新部分任务
+        """
+        if not tasks:
+            return
+        rows = [self.__to_row(kind, torrent_hash, task) for torrent_hash, task in tasks.items()]
+        with self._lock:
+            conn = self.__connect()
+            try:
+                with conn:
+                    self.__upsert_rows(conn, rows)
+            finally:
+                conn.close()
+
+    def move(self, from_kind: str, to_kind: str, tasks: Dict[str, dict]):
+        """
+        在同一事务中将任务从一个类型移动到另一个类型，如归档
+        """
+        if not tasks:
+            return
+        rows = [self.__to_row(to_kind, torrent_hash, task) for torrent_hash, task in tasks.items()]
+        with self._lock:
+            conn = self.__connect()
+            try:
+                with conn:
+                    self.__upsert_rows(conn, rows)
+                    self.__delete_rows(conn, from_kind, tasks.keys())
+            finally:
+                conn.close()
+
+    def clear(self, kind: Optional[str] = None):
+        """
+        清除任务，未指定类型时清除全部
+        """
+        with self._lock:
+            conn = self.__connect()
+            try:
+                with conn:
+                    if kind:
+                        conn.execute("DELETE FROM tasks WHERE kind = ?", (kind,))
+                    else:
+                        conn.execute("DELETE FROM tasks")
+                        conn.execute("DELETE FROM task_statistics")
+            finally:
+                conn.close()
+
+    def get_site_statistics(self) -> List[dict]:
+        """
+        获取按类型、站点、是否删除汇总的统计数据，数据量只与站点数相关
+        """
+        with self._lock:
+            conn = self.__connect()
+            try:
+                rows = conn.execute("SELECT kind, site_name, deleted, count, uploaded, downloaded "
+                                    "FROM task_statistics WHERE count > 0").fetchall()
+            finally:
+                conn.close()
+        return [{"kind": kind, "site_name": site_name, "deleted": bool(deleted), "count": count,
+                 "uploaded": uploaded, "downloaded": downloaded}
+                for kind, site_name, deleted, count, uploaded, downloaded in rows]
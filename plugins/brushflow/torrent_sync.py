@@ -0,0 +1,183 @@
+import time
+from abc import ABCMeta, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.log import logger
+
+
+class TorrentStateTracker(metaclass=ABCMeta):
+    """
+    下载器种子状态镜像，在检查周期之间维护本地种子状态，每次仅从下载器获取发生变化的种子
+    """
+
+    # 增量同步能覆盖的最长间隔（秒），距上次同步超过该间隔时进行全量同步，为None时不限制
+    _incremental_window: Optional[float] = None
+
+    def __init__(self, client_getter: Callable[[], Any], full_sync_interval: int = 3600):
+        """
+        :param client_getter: 获取下载器客户端的方法，客户端重连后也能获取到最新实例
+        :param full_sync_interval: 全量同步间隔（秒），用于兜底修正增量同步可能遗漏的数据
+        """
+        self._client_getter = client_getter
+        self._full_sync_interval = full_sync_interval
+        self._last_full_sync: Optional[float] = None
+        self._last_sync: Optional[float] = None
+
+    @property
+    def synced(self) -> bool:
+        """
+        本地镜像是否可用
+        """
+        return self._last_full_sync is not None
+
+    def reset(self):
+        """
+        清空本地镜像，下次同步时进行全量同步
+        """
+        self._last_full_sync = None
+        self._last_sync = None
+
+    def sync(self) -> Tuple[List[Any], bool]:
+        """
+        同步种子状态，返回全部种子以及是否出错
+        """
+        client = self._client_getter()
+        if not client:
+            return [], True
+        now = time.time()
+        full_sync = self._last_full_sync is None \
+            or now - self._last_full_sync >= self._full_sync_interval \
+            or (self._incremental_window is not None
+                and (self._last_sync is None or now - self._last_sync > self._incremental_window))
+        try:
+            if full_sync:
+                torrents = self._full_sync(client)
+                self._last_full_sync = now
+            else:
+                torrents = self._incremental_sync(client)
+            self._last_sync = now
+            return torrents, False
+        except Exception as e:
+            logger.error(f"同步下载器种子状态失败，下次将进行全量同步，错误详情: {e}")
+            self.reset()
+            return [], True
+
+    @abstractmethod
+    def get_completed_hashes(self, hashes: List[str]) -> List[str]:
+        """
+        根据本地镜像获取已完成的种子
+        """
+        pass
+
+    @abstractmethod
+    def remove(self, hashes: List[str]):
+        """
+        从本地镜像中移除已删除的种子，避免增量同步遗漏删除时种子重新参与检查
+        """
+        pass
+
+    @abstractmethod
+    def _full_sync(self, client: Any) -> List[Any]:
+        """
+        全量同步，重建本地镜像
+        """
+        pass
+
+    @abstractmethod
+    def _incremental_sync(self, client: Any) -> List[Any]:
+        """
+        增量同步，仅更新发生变化的种子
+        """
+        pass
+
+
+class QbTorrentStateTracker(TorrentStateTracker):
+    """
+    基于qBittorrent sync/maindata接口的rid增量同步
+    """
+
+    def __init__(self, client_getter: Callable[[], Any], full_sync_interval: int = 3600):
+        super().__init__(client_getter=client_getter, full_sync_interval=full_sync_interval)
+        self._rid = 0
+        self._torrents: Dict[str, dict] = {}
+
+    def reset(self):
+        super().reset()
+        self._rid = 0
+        self._torrents = {}
+
+    def get_completed_hashes(self, hashes: List[str]) -> List[str]:
+        return [torrent_hash for torrent_hash in hashes
+                if (self._torrents.get(torrent_hash) or {}).get("progress", 0) >= 1]
+
+    def remove(self, hashes: List[str]):
+        for torrent_hash in hashes:
+            self._torrents.pop(torrent_hash, None)
+
+    def _full_sync(self, client: Any) -> List[dict]:
+        self._rid = 0
+        self._torrents = {}
+        return self._incremental_sync(client)
+
+    def _incremental_sync(self, client: Any) -> List[dict]:
+        maindata = client.sync_maindata(rid=self._rid)
+        if maindata.get("full_update"):
+            self._torrents = {}
+        changed = maindata.get("torrents") or {}
+        for torrent_hash, fields in changed.items():
+            # 增量数据中仅包含发生变化的字段，且不包含hash
+            torrent = self._torrents.setdefault(torrent_hash, {"hash": torrent_hash})
+            torrent.update(fields)
+        removed = maindata.get("torrents_removed") or []
+        for torrent_hash in removed:
+            self._torrents.pop(torrent_hash, None)
+        self._rid = maindata.get("rid", 0)
+        logger.debug(f"qBittorrent种子状态同步完成，rid {self._rid}，"
+                     f"变化 {len(changed)} 个，移除 {len(removed)} 个，当前共 {len(self._torrents)} 个")
+        return list(self._torrents.values())
+
+
+class TrTorrentStateTracker(TorrentStateTracker):
+    """
+    基于Transmission recently-active的增量同步
+    Transmission仅返回最近60秒内有变化的种子，距上次同步超过60秒时改为全量同步，避免遗漏期间的变化和删除
+    """
+
+    _incremental_window = 60
+
+    # 检查种子所需的字段
+    _fields = ["id", "hashString", "name", "labels", "status", "totalSize", "percentDone", "leftUntilDone",
+               "uploadRatio", "uploadedEver", "downloadedEver", "addedDate", "doneDate", "activityDate",
+               "downloadDir", "error", "errorString", "trackers", "trackerList"]
+
+    def __init__(self, client_getter: Callable[[], Any], full_sync_interval: int = 1800):
+        super().__init__(client_getter=client_getter, full_sync_interval=full_sync_interval)
+        self._torrents: Dict[int, Any] = {}
+
+    def reset(self):
+        super().reset()
+        self._torrents = {}
+
+    def get_completed_hashes(self, hashes: List[str]) -> List[str]:
+        completed = {torrent.hashString for torrent in self._torrents.values() if torrent.left_until_done == 0}
+        return [torrent_hash for torrent_hash in hashes if torrent_hash in completed]
+
+    def remove(self, hashes: List[str]):
+        hashes = set(hashes)
+        self._torrents = {torrent_id: torrent for torrent_id, torrent in self._torrents.items()
+                          if torrent.hashString not in hashes}
+
+    def _full_sync(self, client: Any) -> List[Any]:
+        torrents = client.get_torrents(arguments=self._fields)
+        self._torrents = {torrent.id: torrent for torrent in torrents}
+        return list(self._torrents.values())
+
+    def _incremental_sync(self, client: Any) -> List[Any]:
+        active, removed = client.get_recently_active_torrents(arguments=self._fields)
+        for torrent in active:
+            self._torrents[torrent.id] = torrent
+        for torrent_id in removed:
+            self._torrents.pop(torrent_id, None)
+        logger.debug(f"Transmission种子状态同步完成，变化 {len(active)} 个，移除 {len(removed)} 个，"
+                     f"当前共 {len(self._torrents)} 个")
+        return list(self._torrents.values())
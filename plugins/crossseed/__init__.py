@@ -1,7 +1,8 @@
 import hashlib
 import os
 import re
-import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from pathlib import Path
 from threading import Event
@@ -12,6 +13,7 @@ import requests
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 from bencode import bdecode, bencode
+from requests.adapters import HTTPAdapter
 
 from app.core.config import settings
 from app.core.event import eventmanager
@@ -22,6 +24,10 @@ from app.log import logger
 from app.modules.qbittorrent import Qbittorrent
 from app.modules.transmission import Transmission
 from app.plugins import _PluginBase
+from app.plugins.crossseed.query_cache import NegativeQueryCache
+from app.plugins.crossseed.seed_cache import SeedCache
+from app.plugins.crossseed.site_pacer import SitePacer
+from app.plugins.crossseed.torrent_index import TorrentFileIndex
 from app.schemas import NotificationType
 from app.schemas.types import EventType
 from app.utils.string import StringUtils
@@ -119,6 +125,20 @@ class TorInfo:
 
 class CrossSeedHelper(object):
     _version = "0.2.0"
+    # 站点返回429/5xx时的最大重试次数
+    _max_retries = 3
+    # 退避后的最大请求间隔（秒）
+    _max_query_gap = 300
+
+    def __init__(self, event: Optional[Event] = None):
+        """
+        :param event: 退出事件，等待请求间隔期间收到退出事件时立即返回
+        """
+        self._event = event
+        self._lock = threading.Lock()
+        # 每个站点独立的连接池及请求节奏
+        self._sessions: Dict[str, requests.Session] = {}
+        self._pacers: Dict[str, SitePacer] = {}
 
     @staticmethod
     def get_local_torrent_info(torrent_path: Path | str) -> Tuple[Optional[TorInfo], str]:
@@ -136,40 +156,81 @@ class CrossSeedHelper(object):
         except Exception as err:
             return None, str(err)
 
-    @staticmethod
+    def __get_session(self, site: CSSiteConfig) -> requests.Session:
+        with self._lock:
+            session = self._sessions.get(site.name)
+            if not session:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update({
+                    "Content-Type": "application/json",
+                    "Accept": "application/json",
+                    "User-Agent": "CrossSeedHelper",
+                })
+                self._sessions[site.name] = session
+            return session
+
+    def __get_pacer(self, site: CSSiteConfig) -> SitePacer:
+        with self._lock:
+            pacer = self._pacers.get(site.name)
+            if not pacer:
+                pacer = SitePacer(interval=site.query_gap,
+                                  max_interval=self._max_query_gap,
+                                  event=self._event)
+                self._pacers[site.name] = pacer
+            return pacer
+
     def get_target_torrent(
+            self,
             site: CSSiteConfig,
             pieces_hash_set: List[str]
     ) -> Tuple[Optional[List[TorInfo]], Optional[str]]:
         """
         返回pieces_hash对应的种子信息，包括站点id,pieces_hash,种子id
+        同一站点的请求串行并按间隔发起，站点返回429/5xx时退避重试
         """
-        headers = {
-            "Content-Type": "application/json",
-            "Accept": "application/json",
-            "User-Agent": "CrossSeedHelper",
-        }
+        session = self.__get_session(site)
+        pacer = self.__get_pacer(site)
         data = {"passkey": site.passkey, "pieces_hash": pieces_hash_set}
         remote_torrent_infos = []
-        try:
-            response = requests.post(
-                site.get_api_url(),
-                headers=headers,
-                json=data,
-                timeout=10,
-                proxies=settings.PROXY if site.proxy else None,
-            )
-            response.raise_for_status()
-            rsp_body = response.json()
+        for _ in range(self._max_retries + 1):
+            if not pacer.wait():
+                return None, f"站点{site.name}查询已停止"
+            try:
+                response = session.post(
+                    site.get_api_url(),
+                    json=data,
+                    timeout=10,
+                    proxies=settings.PROXY if site.proxy else None,
+                )
+                if response.status_code == 429 or response.status_code >= 500:
+                    gap = pacer.backoff(retry_after=response.headers.get("Retry-After"))
+                    logger.warn(f"站点{site.name}查询返回 {response.status_code}，{gap:.0f}秒后重试")
+                    continue
+                response.raise_for_status()
+                rsp_body = response.json()
+            except requests.exceptions.RequestException as e:
+                return None, f"站点{site.name}请求失败：{e}"
+            pacer.recover()
             if isinstance(rsp_body["data"], dict):
                 for pieces_hash, torrent_id in rsp_body["data"].items():
                     remote_torrent_infos.append(
                         TorInfo.remote(site.name, pieces_hash, torrent_id)
                     )
-            time.sleep(site.query_gap)
-        except requests.exceptions.RequestException as e:
-            return None, f"站点{site.name}请求失败：{e}"
-        return remote_torrent_infos, None
+            return remote_torrent_infos, None
+        return None, f"站点{site.name}请求失败：重试{self._max_retries}次后仍被限流或出错"
+
+    def close(self):
+        """
+        关闭所有站点连接
+        """
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+            self._pacers.clear()
 
 
 class CrossSeed(_PluginBase):
@@ -212,18 +273,26 @@ class CrossSeed(_PluginBase):
     _nolabels = None
     _nopaths = None
     _clearcache = False
+    # 站点查询无结果后再次查询的间隔天数，之后每次仍无结果间隔翻倍，为0时每次都查询
+    _recheck_days = 1
     # 退出事件
     _event = Event()
     _torrent_tags = ["已整理", "辅种"]
     # 待校全种子hash清单
     _recheck_torrents = {}
     _is_recheck_running = False
-    # 辅种缓存，出错的种子不再重复辅种，可清除
-    _error_caches = []
-    # 辅种缓存，辅种成功的种子，可清除
-    _success_caches = []
-    # 辅种缓存，出错的种子不再重复辅种，且无法清除。种子被删除404等情况
-    _permanent_error_caches = []
+    # 辅种缓存，记录辅种成功及出错的种子，出错的种子在有效期内不再重复辅种，可清除
+    _seed_cache: Optional[SeedCache] = None
+    # 临时错误缓存有效期（秒），种子被删除404等永久错误不过期
+    _error_cache_ttl = 7 * 24 * 3600
+    # 本地种子文件索引，种子文件未变化时不再重复解析
+    _torrent_index: Optional[TorrentFileIndex] = None
+    # 种子文件索引扫描间隔（分钟）
+    _index_scan_interval = 30
+    # 站点查询无结果缓存，近期查询无结果的种子在再次查询时间之前不再重复查询
+    _query_cache: Optional[NegativeQueryCache] = None
+    # 同时查询的站点数，同一站点的请求仍串行按间隔发起
+    _query_threads = 10
     _torrentpaths = []
     _site_cs_infos = []
     # 辅种计数
@@ -238,6 +307,13 @@ class CrossSeed(_PluginBase):
         self.sites = SitesHelper()
         self.siteoper = SiteOper()
         self.torrent = TorrentHelper()
+        if self._seed_cache is None:
+            self._seed_cache = SeedCache(db_path=self.get_data_path() / "seed_cache.db",
+                                         error_ttl=self._error_cache_ttl)
+        if self._torrent_index is None:
+            self._torrent_index = TorrentFileIndex(db_path=self.get_data_path() / "torrent_index.db")
+        if self._query_cache is None:
+            self._query_cache = NegativeQueryCache(db_path=self.get_data_path() / "query_cache.db")
         # 读取配置
         if config:
             self._enabled = config.get("enabled")
@@ -253,9 +329,22 @@ class CrossSeed(_PluginBase):
             self._nolabels = config.get("nolabels")
             self._nopaths = config.get("nopaths")
             self._clearcache = config.get("clearcache")
-            self._permanent_error_caches = [] if self._clearcache else config.get("permanent_error_caches") or []
-            self._error_caches = [] if self._clearcache else config.get("error_caches") or []
-            self._success_caches = [] if self._clearcache else config.get("success_caches") or []
+            try:
+                self._recheck_days = float(config.get("recheck_days")) \
+                    if config.get("recheck_days") not in [None, ""] else 1
+            except ValueError:
+                logger.warn(f"再次查询间隔天数配置有误：{config.get('recheck_days')}，使用默认值1天")
+                self._recheck_days = 1
+            self._query_cache.recheck_age = self._recheck_days * 86400
+            if self._clearcache:
+                self._seed_cache.clear()
+                self._query_cache.clear()
+            else:
+                # 迁移原有保存在配置中的缓存，迁移后配置中不再保存缓存
+                self._seed_cache.update(SeedCache.PERMANENT_ERROR, config.get("permanent_error_caches"))
+                self._seed_cache.update(SeedCache.ERROR, config.get("error_caches"))
+                self._seed_cache.update(SeedCache.SUCCESS, config.get("success_caches"))
+                self._seed_cache.flush()
 
             # 过滤掉已删除的站点
             inner_site_list = self.siteoper.list_order_by_pri()
@@ -328,7 +417,7 @@ class CrossSeed(_PluginBase):
 
         # 启动定时任务 & 立即运行一次
         if self.get_state() or self._onlyonce:
-            self.cross_helper = CrossSeedHelper()
+            self.cross_helper = CrossSeedHelper(event=self._event)
             self._scheduler = BackgroundScheduler(timezone=settings.TZ)
             self.qb = Qbittorrent()
             self.tr = Transmission()
@@ -380,6 +469,14 @@ class CrossSeed(_PluginBase):
         """
         if self.get_state():
             # 如果开启了定时任务，并且参数齐全
+            # 后台增量更新种子文件索引
+            index_job = {
+                "id": "CrossSeedTorrentIndex",
+                "name": "青蛙辅种助手种子文件索引",
+                "trigger": "interval",
+                "func": self.scan_torrent_index,
+                "kwargs": {"minutes": self._index_scan_interval}
+            }
             if self._cron:
                 return [{
                     "id": "CrossSeed",
@@ -387,7 +484,7 @@ class CrossSeed(_PluginBase):
                     "trigger": CronTrigger.from_crontab(self._cron),
                     "func": self.auto_seed,
                     "kwargs": {}
-                }]
+                }, index_job]
             else:
                 # 随机时间
                 triggers = TimerUtils.random_scheduler(num_executions=1,
@@ -407,6 +504,7 @@ class CrossSeed(_PluginBase):
                             "minute": trigger.minute
                         }
                     })
+                ret_jobs.append(index_job)
                 return ret_jobs
         elif self._enabled:
             logger.warn(f"青蛙辅种助手插件参数不全，定时任务未正常启动")
@@ -567,7 +665,7 @@ class CrossSeed(_PluginBase):
                                 'component': 'VCol',
                                 'props': {
                                     'cols': 12,
-                                    'md': 12
+                                    'md': 8
                                 },
                                 'content': [
                                     {
@@ -579,6 +677,23 @@ class CrossSeed(_PluginBase):
                                         }
                                     }
                                 ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'recheck_days',
+                                            'label': '无结果再次查询间隔（天）',
+                                            'placeholder': '站点查询无结果的种子间隔多少天再次查询，之后间隔翻倍，0为每次都查询'
+                                        }
+                                    }
+                                ]
                             }
                         ]
                     },
@@ -717,7 +832,8 @@ class CrossSeed(_PluginBase):
             "torrentpath": "",
             "sites": [],
             "nopaths": "",
-            "nolabels": ""
+            "nolabels": "",
+            "recheck_days": 1
         }
 
     def get_page(self) -> List[dict]:
@@ -736,9 +852,7 @@ class CrossSeed(_PluginBase):
             "notify": self._notify,
             "nolabels": self._nolabels,
             "nopaths": self._nopaths,
-            "success_caches": self._success_caches,
-            "error_caches": self._error_caches,
-            "permanent_error_caches": self._permanent_error_caches
+            "recheck_days": self._recheck_days
         })
 
     def __get_downloader(self, dtype: str):
@@ -780,10 +894,13 @@ class CrossSeed(_PluginBase):
             for torrent in torrents:
                 if self._event.is_set():
                     logger.info(f"辅种服务停止")
+                    self._seed_cache.flush()
+                    self._torrent_index.flush()
+                    self._query_cache.flush()
                     return
                     # 获取种子hash
                 hash_str = self.__get_hash(torrent, downloader)
-                if hash_str in self._error_caches or hash_str in self._permanent_error_caches:
+                if self._seed_cache.is_error(hash_str):
                     logger.info(f"种子 {hash_str} 辅种失败且已缓存，跳过 ...")
                     continue
                 save_path = self.__get_save_path(torrent, downloader)
@@ -807,9 +924,9 @@ class CrossSeed(_PluginBase):
                         logger.error(f"种子文件不存在：{torrent_path}")
                         continue
 
-                # 读取种子文件具体信息
+                # 读取种子文件具体信息，优先使用索引
                 if not torrent_info:
-                    torrent_info, err = self.cross_helper.get_local_torrent_info(torrent_path)
+                    torrent_info, err = self.__get_local_torrent_info(torrent_path)
                     if not torrent_info:
                         logger.error(f"未能读取到种子文件具体信息：{torrent_path} {err}")
                         continue
@@ -875,7 +992,9 @@ class CrossSeed(_PluginBase):
             else:
                 logger.info(f"没有需要辅种的种子")
         # 保存缓存
-        self.__update_config()
+        self._seed_cache.flush()
+        self._torrent_index.flush()
+        self._query_cache.flush()
         # 发送消息
         if self._notify:
             if self.success or self.fail:
@@ -891,6 +1010,66 @@ class CrossSeed(_PluginBase):
                 )
         logger.info("辅种任务执行完成")
 
+    def __get_local_torrent_info(self, torrent_path: Path) -> Tuple[Optional[TorInfo], str]:
+        """
+        获取本地种子文件信息，种子文件未变化时直接使用索引，否则解析种子文件并更新索引
+        """
+        item = self._torrent_index.get(torrent_path)
+        if item:
+            torrent_info = TorInfo.local(torrent_path=str(torrent_path),
+                                         info_hash=item.info_hash,
+                                         pieces_hash=item.pieces_hash)
+            torrent_info.torrent_announce = item.announce
+            return torrent_info, ""
+        torrent_info, err = CrossSeedHelper.get_local_torrent_info(torrent_path)
+        if torrent_info:
+            self._torrent_index.put(torrent_path,
+                                    info_hash=torrent_info.info_hash,
+                                    pieces_hash=torrent_info.pieces_hash,
+                                    announce=self.__get_announce(torrent_info))
+        return torrent_info, err
+
+    @staticmethod
+    def __get_announce(torrent_info: TorInfo) -> Optional[str]:
+        announce = torrent_info.torrent_announce
+        if isinstance(announce, bytes):
+            announce = announce.decode("utf-8", errors="ignore")
+        return announce
+
+    def __parse_torrent_file(self, torrent_path: str) -> Optional[Tuple[str, str, Optional[str]]]:
+        """
+        解析种子文件，供索引扫描使用
+        """
+        torrent_info, err = CrossSeedHelper.get_local_torrent_info(torrent_path)
+        if not torrent_info:
+            logger.debug(f"未能读取到种子文件具体信息：{torrent_path} {err}")
+            return None
+        return torrent_info.info_hash, torrent_info.pieces_hash, self.__get_announce(torrent_info)
+
+    def scan_torrent_index(self):
+        """
+        增量扫描下载器种子目录，更新种子文件索引
+        """
+        if self._torrent_index is None or not self._torrentpaths:
+            return
+        for torrent_path in self._torrentpaths:
+            torrent_path = torrent_path.strip()
+            if not torrent_path or not os.path.isdir(torrent_path):
+                continue
+            if self._event.is_set():
+                break
+            try:
+                stats = self._torrent_index.scan(directory=torrent_path,
+                                                 parser=self.__parse_torrent_file,
+                                                 event=self._event)
+            except Exception as e:
+                logger.error(f"扫描种子目录 {torrent_path} 出错：{str(e)}")
+                continue
+            if stats.get("parsed") or stats.get("removed"):
+                logger.info(f"种子文件索引更新完成：{torrent_path}，共 {stats.get('total')} 个种子文件，"
+                            f"新解析 {stats.get('parsed')} 个，失败 {stats.get('failed')} 个，"
+                            f"移除 {stats.get('removed')} 个")
+
     def check_recheck(self):
         """
         定时检查下载器中种子是否校验完成，校验完成且完整的自动开始辅种
@@ -954,73 +1133,120 @@ class CrossSeed(_PluginBase):
         logger.info(f"去重后，总共需要辅种查询的种子数：{len(pieces_hash_set)}")
         pieces_hashes = list(pieces_hash_set)
 
-        # 分站点逐个批次辅种
-        # 逐个站点查询可辅种数据
-        chunk_size = 100
+        # 各站点并发查询可辅种数据，查询完成的站点依次添加辅种
+        site_configs = []
         for site_config in self._site_cs_infos:
             # 检查站点是否已经停用
             db_site = self.siteoper.get(site_config.id)
             if db_site and not db_site.is_active:
                 logger.info(f"站点{site_config.name}已停用，跳过辅种")
                 continue
-            remote_tors: List[TorInfo] = []
-            total_size = len(pieces_hashes)
-            for i in range(0, len(pieces_hashes), chunk_size):
-                if self._event.is_set():
-                    logger.info(f"辅种服务停止")
-                    return
-                # 切片操作
-                chunk = pieces_hashes[i:i + chunk_size]
-                # 处理分组
-                chunk_tors, err_msg = self.cross_helper.get_target_torrent(site_config, chunk)
-                if not chunk_tors and err_msg:
-                    logger.info(
-                        f"查询站点{site_config.name}可辅种的信息出错 {err_msg},进度={i + 1}/{total_size}"
-                    )
-                else:
-                    logger.info(
-                        f"站点{site_config.name}本批次的可辅种/查询数={len(chunk_tors)}/{len(chunk)},进度={i + 1}/{total_size}"
-                    )
-                    remote_tors = remote_tors + chunk_tors
-
-            logger.info(f"站点{site_config.name}返回可以辅种的种子总数为{len(remote_tors)}")
-
-            # 去除已经下载过的种子
-            local_cnt = 0
-            not_local_tors = []
-            for tor_info in remote_tors:
-                if (
-                        tor_info
-                        and tor_info.site_name
-                        and tor_info.pieces_hash
-                        and tor_info.get_name_pieces_tag() in site_pieces_hash_set
-                ):
-                    local_cnt = local_cnt + 1
-                else:
-                    not_local_tors.append(tor_info)
-            logger.info(f"站点{site_config.name}正在做种或已经辅种过的种子数为{local_cnt}")
+            site_configs.append(site_config)
+        if not site_configs:
+            return
 
-            for tor_info in not_local_tors:
+        executor = ThreadPoolExecutor(max_workers=min(len(site_configs), self._query_threads),
+                                      thread_name_prefix="CrossSeedQuery")
+        try:
+            futures = {executor.submit(self.__query_site, site_config, pieces_hashes, site_pieces_hash_set): site_config
+                       for site_config in site_configs}
+            for future in as_completed(futures):
                 if self._event.is_set():
                     logger.info(f"辅种服务停止")
                     return
-                if not tor_info:
-                    continue
-                if not tor_info.torrent_id or not tor_info.pieces_hash:
-                    continue
-                if tor_info.get_name_id_tag() in self._success_caches:
-                    logger.info(f"{tor_info.get_name_id_tag()} 已处理过辅种，跳过 ...")
-                    continue
-                if tor_info.get_name_id_tag() in self._error_caches or tor_info.get_name_id_tag() in self._permanent_error_caches:
-                    logger.info(f"种子 {tor_info.get_name_id_tag()} 辅种失败且已缓存，跳过 ...")
+                site_config = futures[future]
+                try:
+                    remote_tors = future.result()
+                except Exception as e:
+                    logger.error(f"查询站点{site_config.name}可辅种的信息出错：{str(e)}")
                     continue
-                # 添加任务
-                self.__download_torrent(tor=tor_info, site_config=site_config,
-                                        downloader=downloader,
-                                        save_path=save_paths.get(tor_info.pieces_hash))
+                self.__seed_site_torrents(site_config=site_config,
+                                          remote_tors=remote_tors,
+                                          site_pieces_hash_set=site_pieces_hash_set,
+                                          save_paths=save_paths,
+                                          downloader=downloader)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
 
         logger.info(f"下载器 {downloader} 辅种完成")
 
+    def __query_site(self, site_config: CSSiteConfig, pieces_hashes: List[str],
+                     site_pieces_hash_set: set) -> List[TorInfo]:
+        """
+        分批查询单个站点可辅种的种子，在查询线程中执行
+        已在该站点做种及近期查询无结果的种子不再查询
+        """
+        chunk_size = 100
+        remote_tors: List[TorInfo] = []
+        query_hashes = [pieces_hash for pieces_hash in pieces_hashes
+                        if f"{site_config.name}:{pieces_hash}" not in site_pieces_hash_set]
+        query_hashes = self._query_cache.filter_due(site_config.name, query_hashes)
+        if len(query_hashes) < len(pieces_hashes):
+            logger.info(f"站点{site_config.name}跳过已做种或近期查询无结果的种子 "
+                        f"{len(pieces_hashes) - len(query_hashes)} 个，本次查询 {len(query_hashes)} 个")
+        pieces_hashes = query_hashes
+        total_size = len(pieces_hashes)
+        for i in range(0, len(pieces_hashes), chunk_size):
+            if self._event.is_set():
+                break
+            # 切片操作
+            chunk = pieces_hashes[i:i + chunk_size]
+            # 处理分组
+            chunk_tors, err_msg = self.cross_helper.get_target_torrent(site_config, chunk)
+            if not chunk_tors and err_msg:
+                logger.info(
+                    f"查询站点{site_config.name}可辅种的信息出错 {err_msg},进度={i + 1}/{total_size}"
+                )
+            else:
+                logger.info(
+                    f"站点{site_config.name}本批次的可辅种/查询数={len(chunk_tors)}/{len(chunk)},进度={i + 1}/{total_size}"
+                )
+                remote_tors = remote_tors + chunk_tors
+                self._query_cache.update(site_config.name, queried=chunk,
+                                         found=[tor.pieces_hash for tor in chunk_tors])
+        return remote_tors
+
+    def __seed_site_torrents(self, site_config: CSSiteConfig, remote_tors: List[TorInfo],
+                             site_pieces_hash_set: set, save_paths: dict, downloader: str):
+        """
+        添加单个站点可辅种的种子
+        """
+        logger.info(f"站点{site_config.name}返回可以辅种的种子总数为{len(remote_tors)}")
+
+        # 去除已经下载过的种子
+        local_cnt = 0
+        not_local_tors = []
+        for tor_info in remote_tors:
+            if (
+                    tor_info
+                    and tor_info.site_name
+                    and tor_info.pieces_hash
+                    and tor_info.get_name_pieces_tag() in site_pieces_hash_set
+            ):
+                local_cnt = local_cnt + 1
+            else:
+                not_local_tors.append(tor_info)
+        logger.info(f"站点{site_config.name}正在做种或已经辅种过的种子数为{local_cnt}")
+
+        for tor_info in not_local_tors:
+            if self._event.is_set():
+                logger.info(f"辅种服务停止")
+                return
+            if not tor_info:
+                continue
+            if not tor_info.torrent_id or not tor_info.pieces_hash:
+                continue
+            if self._seed_cache.is_success(tor_info.get_name_id_tag()):
+                logger.info(f"{tor_info.get_name_id_tag()} 已处理过辅种，跳过 ...")
+                continue
+            if self._seed_cache.is_error(tor_info.get_name_id_tag()):
+                logger.info(f"种子 {tor_info.get_name_id_tag()} 辅种失败且已缓存，跳过 ...")
+                continue
+            # 添加任务
+            self.__download_torrent(tor=tor_info, site_config=site_config,
+                                    downloader=downloader,
+                                    save_path=save_paths.get(tor_info.pieces_hash))
+
     def __download(self, downloader: str, content: Union[bytes, str],
                    save_path: str) -> Optional[str]:
         """
@@ -1087,10 +1313,10 @@ class CrossSeed(_PluginBase):
             self.cached += 1
             # 加入失败缓存
             if error_msg and ('无法打开链接' in error_msg or '触发站点流控' in error_msg):
-                self._error_caches.append(tor.get_name_id_tag())
+                self._seed_cache.add(SeedCache.ERROR, tor.get_name_id_tag())
             else:
                 # 种子不存在的情况
-                self._permanent_error_caches.append(tor.get_name_id_tag())
+                self._seed_cache.add(SeedCache.PERMANENT_ERROR, tor.get_name_id_tag())
             logger.error(f"下载种子文件失败：{tor.get_name_id_tag()}")
             return False
 
@@ -1100,7 +1326,7 @@ class CrossSeed(_PluginBase):
             tors, msg = self.__get_downloader(downloader).get_torrents(ids=[tmp_tor_info.info_hash])
             if tors:
                 self.exist += 1
-                self._success_caches.append(tor.get_name_id_tag())
+                self._seed_cache.add(SeedCache.SUCCESS, tor.get_name_id_tag())
                 logger.info(f"下载的种子{tor.get_name_id_tag()}已存在, 跳过")
                 return True
         else:
@@ -1116,7 +1342,7 @@ class CrossSeed(_PluginBase):
             self.fail += 1
             self.cached += 1
             # 加入失败缓存
-            self._error_caches.append(tor.get_name_id_tag())
+            self._seed_cache.add(SeedCache.ERROR, tor.get_name_id_tag())
             return False
         else:
             self.success += 1
@@ -1132,7 +1358,7 @@ class CrossSeed(_PluginBase):
                 # 开始校验种子
                 self.__get_downloader(downloader).recheck_torrents(ids=[download_id])
             # 成功也加入缓存，有一些改了路径校验不通过的，手动删除后，下一次又会辅上
-            self._success_caches.append(tor.get_name_id_tag())
+            self._seed_cache.add(SeedCache.SUCCESS, tor.get_name_id_tag())
             return True
 
     @staticmethod
@@ -1193,6 +1419,14 @@ class CrossSeed(_PluginBase):
                     self._scheduler.shutdown()
                     self._event.clear()
                 self._scheduler = None
+            if self._seed_cache is not None:
+                self._seed_cache.flush()
+            if self._torrent_index is not None:
+                self._torrent_index.flush()
+            if self._query_cache is not None:
+                self._query_cache.flush()
+            if self.cross_helper:
+                self.cross_helper.close()
         except Exception as e:
             print(str(e))
 
@@ -0,0 +1,162 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from app.log import logger
+
+
+class NegativeQueryCache:
+    """
+    站点查询无结果缓存，记录各站点查询不到的pieces_hash及最后查询时间，
+    再次查询的间隔随连续无结果的次数成倍增加，直到最大间隔，持久化保存在独立的SQLite文件中
+    """
+
+    def __init__(self, db_path: Union[str, Path], recheck_age: float = 86400, max_age: float = 30 * 86400):
+        """
+        :param db_path: 缓存文件路径
+        :param recheck_age: 首次无结果后再次查询的间隔（秒），为0时不使用缓存
+        :param max_age: 再次查询的最大间隔（秒）
+        """
+        self._db_path = str(db_path)
+        self._recheck_age = max(float(recheck_age or 0), 0)
+        self._max_age = max(float(max_age or 0), 0)
+        self._lock = threading.RLock()
+        # (站点, pieces_hash) -> (最后查询时间, 连续无结果次数)
+        self._caches: Dict[Tuple[str, str], Tuple[float, int]] = {}
+        # 尚未写入的变更，值为None时表示删除
+        self._pending: Dict[Tuple[str, str], Optional[Tuple[float, int]]] = {}
+        self.__init_db()
+        self.__load()
+
+    def __len__(self):
+        return len(self._caches)
+
+    @property
+    def enabled(self) -> bool:
+        return self._recheck_age > 0
+
+    @property
+    def recheck_age(self) -> float:
+        return self._recheck_age
+
+    @recheck_age.setter
+    def recheck_age(self, value: float):
+        self._recheck_age = max(float(value or 0), 0)
+
+    def __connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def __init_db(self):
+        with self._lock:
+            conn = self.__connect()
+            try:
+                with conn:
+                    conn.execute("""
+                        CREATE TABLE IF NOT EXISTS negative_cache (
+                            site TEXT NOT NULL,
+                            pieces_hash TEXT NOT NULL,
+                            checked_at REAL NOT NULL,
+                            misses INTEGER NOT NULL,
+                            PRIMARY KEY (site, pieces_hash)
+                        )""")
+            finally:
+                conn.close()
+
+    def __load(self):
+        with self._lock:
+            conn = self.__connect()
+            try:
+                for site, pieces_hash, checked_at, misses in conn.execute(
+                        "SELECT site, pieces_hash, checked_at, misses FROM negative_cache"):
+                    self._caches[(site, pieces_hash)] = (checked_at, misses)
+            finally:
+                conn.close()
+        logger.debug(f"站点查询无结果缓存加载完成，共 {len(self._caches)} 条")
+
+    def __next_check_time(self, pieces_hash: str, checked_at: float, misses: int) -> float:
+        """
+        下次查询时间，间隔按连续无结果次数成倍增加，并按pieces_hash错开到期时间，避免同一天集中到期
+        """
+        age = min(self._recheck_age * (2 ** max(misses - 1, 0)), max(self._max_age, self._recheck_age))
+        try:
+            jitter = int(pieces_hash[:4], 16) / 0xffff * 0.25
+        except ValueError:
+            jitter = 0
+        return checked_at + age * (1 + jitter)
+
+    def filter_due(self, site: str, pieces_hashes: Iterable[str]) -> List[str]:
+        """
+        过滤出站点需要查询的pieces_hash，即从未查询过或已到再次查询时间的
+        """
+        if not self.enabled:
+            return list(pieces_hashes)
+        now = time.time()
+        due = []
+        for pieces_hash in pieces_hashes:
+            cache = self._caches.get((site, pieces_hash))
+            if cache and self.__next_check_time(pieces_hash, *cache) > now:
+                continue
+            due.append(pieces_hash)
+        return due
+
+    def update(self, site: str, queried: Iterable[str], found: Iterable[str]):
+        """
+        记录一次查询结果，查询不到的增加连续无结果次数，查询到的移除缓存
+        """
+        if not self.enabled:
+            return
+        found = set(found)
+        now = time.time()
+        with self._lock:
+            for pieces_hash in queried:
+                key = (site, pieces_hash)
+                if pieces_hash in found:
+                    if self._caches.pop(key, None):
+                        self._pending[key] = None
+                    continue
+                cache = self._caches.get(key)
+                value = (now, (cache[1] if cache else 0) + 1)
+                self._caches[key] = value
+                self._pending[key] = value
+
+    def flush(self):
+        """
+        将变更写入缓存文件
+        """
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+            conn = self.__connect()
+            try:
+                with conn:
+                    conn.executemany("DELETE FROM negative_cache WHERE site = ? AND pieces_hash = ?",
+                                     [key for key, value in pending.items() if value is None])
+                    conn.executemany("INSERT OR REPLACE INTO negative_cache (site, pieces_hash, checked_at, misses) "
+                                     "VALUES (?, ?, ?, ?)",
+                                     [(*key, *value) for key, value in pending.items() if value])
+            except Exception as e:
+                # 写入失败时保留变更，下次继续写入
+                for key, value in pending.items():
+                    self._pending.setdefault(key, value)
+                logger.error(f"站点查询无结果缓存保存失败：{str(e)}")
+            finally:
+                conn.close()
+
+    def clear(self):
+        """
+        清除全部缓存
+        """
+        with self._lock:
+            self._caches.clear()
+            self._pending.clear()
+            conn = self.__connect()
+            try:
+                with conn:
+                    conn.execute("DELETE FROM negative_cache")
+            finally:
+                conn.close()
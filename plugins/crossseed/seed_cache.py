@@ -0,0 +1,156 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+from app.log import logger
+
+
+class SeedCache:
+    """
+    辅种缓存，记录辅种成功及失败的种子，内存中使用字典判断，持久化保存在独立的SQLite文件中，不占用插件配置
+    - success：辅种成功
+    - error：辅种失败，可能为站点流控等临时错误，超过有效期后会重新尝试
+    - permanent_error：辅种失败，种子被删除404等情况，不会过期
+    """
+
+    SUCCESS = "success"
+    ERROR = "error"
+    PERMANENT_ERROR = "permanent_error"
+
+    def __init__(self, db_path: Union[str, Path], error_ttl: Optional[float] = None):
+        """
+        :param db_path: 缓存文件路径
+        :param error_ttl: 临时错误缓存有效期（秒），为空时不过期
+        """
+        self._db_path = str(db_path)
+        self._error_ttl = error_ttl
+        self._lock = threading.RLock()
+        # key -> (类型, 过期时间)
+        self._caches: Dict[str, Tuple[str, Optional[float]]] = {}
+        # 尚未写入的变更，值为None时表示删除
+        self._pending: Dict[str, Optional[Tuple[str, Optional[float]]]] = {}
+        self.__init_db()
+        self.__load()
+
+    def __len__(self):
+        return len(self._caches)
+
+    def __connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def __init_db(self):
+        with self._lock:
+            conn = self.__connect()
+            try:
+                with conn:
+                    conn.execute("""
+                        CREATE TABLE IF NOT EXISTS seed_cache (
+                            key TEXT PRIMARY KEY,
+                            kind TEXT NOT NULL,
+                            expire_at REAL
+                        )""")
+            finally:
+                conn.close()
+
+    def __load(self):
+        now = time.time()
+        expired = []
+        with self._lock:
+            conn = self.__connect()
+            try:
+                for key, kind, expire_at in conn.execute("SELECT key, kind, expire_at FROM seed_cache"):
+                    if expire_at and expire_at <= now:
+                        expired.append(key)
+                        continue
+                    self._caches[key] = (kind, expire_at)
+                if expired:
+                    with conn:
+                        conn.executemany("DELETE FROM seed_cache WHERE key = ?", [(key,) for key in expired])
+            finally:
+                conn.close()
+        logger.debug(f"辅种缓存加载完成，共 {len(self._caches)} 条，清理过期缓存 {len(expired)} 条")
+
+    def __get(self, key: str) -> Optional[str]:
+        cache = self._caches.get(key)
+        if not cache:
+            return None
+        kind, expire_at = cache
+        if expire_at and expire_at <= time.time():
+            with self._lock:
+                self._caches.pop(key, None)
+                self._pending[key] = None
+            return None
+        return kind
+
+    def is_success(self, key: str) -> bool:
+        """
+        是否已辅种成功
+        """
+        return self.__get(key) == self.SUCCESS
+
+    def is_error(self, key: str) -> bool:
+        """
+        是否辅种失败且仍在缓存有效期内
+        """
+        return self.__get(key) in [self.ERROR, self.PERMANENT_ERROR]
+
+    def add(self, kind: str, key: str):
+        """
+        加入缓存，永久失败的记录不会被临时失败覆盖
+        """
+        if not key:
+            return
+        with self._lock:
+            if kind == self.ERROR and self.__get(key) == self.PERMANENT_ERROR:
+                return
+            expire_at = time.time() + self._error_ttl if kind == self.ERROR and self._error_ttl else None
+            self._caches[key] = (kind, expire_at)
+            self._pending[key] = (kind, expire_at)
+
+    def update(self, kind: str, keys: Iterable[str]):
+        """
+        批量加入缓存，用于迁移原有配置中的缓存
+        """
+        for key in keys or []:
+            self.add(kind=kind, key=key)
+
+    def flush(self):
+        """
+        将变更写入缓存文件
+        """
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+            conn = self.__connect()
+            try:
+                with conn:
+                    conn.executemany("DELETE FROM seed_cache WHERE key = ?",
+                                     [(key,) for key, value in pending.items() if value is None])
+                    conn.executemany("INSERT OR REPLACE INTO seed_cache (key, kind, expire_at) VALUES (?, ?, ?)",
+                                     [(key, value[0], value[1]) for key, value in pending.items() if value])
+            except Exception as e:
+                # 写入失败时保留变更，下次继续写入
+                for key, value in pending.items():
+                    self._pending.setdefault(key, value)
+                logger.error(f"辅种缓存保存失败：{str(e)}")
+            finally:
+                conn.close()
+
+    def clear(self):
+        """
+        清除全部缓存
+        """
+        with self._lock:
+            self._caches.clear()
+            self._pending.clear()
+            conn = self.__connect()
+            try:
+                with conn:
+                    conn.execute("DELETE FROM seed_cache")
+            finally:
+                conn.close()
@@ -0,0 +1,62 @@
+import threading
+import time
+from typing import Optional
+
+
+class SitePacer:
+    """
+    站点请求节奏控制，同一站点相邻两次请求至少间隔interval秒，
+    站点返回429/5xx时间隔成倍增加，请求恢复正常后逐步回落到初始间隔
+    """
+
+    def __init__(self, interval: float = 1, max_interval: float = 300, event: Optional[threading.Event] = None):
+        """
+        :param interval: 初始请求间隔（秒）
+        :param max_interval: 退避后的最大请求间隔（秒）
+        :param event: 退出事件，等待期间收到退出事件时立即返回
+        """
+        self._base_interval = max(float(interval or 0), 0)
+        self._max_interval = max(float(max_interval or 0), self._base_interval)
+        self._interval = self._base_interval
+        self._event = event
+        self._lock = threading.Lock()
+        self._next_time = 0.0
+
+    @property
+    def interval(self) -> float:
+        return self._interval
+
+    def wait(self) -> bool:
+        """
+        等待到允许发起下一次请求，收到退出事件时返回False
+        """
+        with self._lock:
+            now = time.time()
+            wait_time = self._next_time - now
+            self._next_time = max(now, self._next_time) + self._interval
+        if wait_time > 0:
+            if self._event:
+                return not self._event.wait(wait_time)
+            time.sleep(wait_time)
+        return not (self._event and self._event.is_set())
+
+    def backoff(self, retry_after: Optional[str] = None) -> float:
+        """
+        站点限流或出错时退避，返回下一次请求前需要等待的秒数
+        """
+        try:
+            retry_after = float(retry_after) if retry_after else 0
+        except ValueError:
+            retry_after = 0
+        with self._lock:
+            self._interval = min(max(self._interval * 2, self._base_interval, 1, retry_after), self._max_interval)
+            self._next_time = time.time() + self._interval
+            return self._interval
+
+    def recover(self):
+        """
+        请求成功后逐步恢复到初始间隔
+        """
+        with self._lock:
+            if self._interval > self._base_interval:
+                self._interval = max(self._interval / 2, self._base_interval)
@@ -0,0 +1,194 @@
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Callable, Dict, NamedTuple, Optional, Tuple, Union
+
+from app.log import logger
+
+
+class TorrentIndexItem(NamedTuple):
+    """
+    种子文件索引记录，mtime及size与文件当前状态一致时索引有效
+    """
+    mtime: int
+    size: int
+    info_hash: str
+    pieces_hash: str
+    announce: Optional[str]
+
+
+class TorrentFileIndex:
+    """
+    本地种子文件索引，以(路径, 修改时间, 文件大小)为键记录info_hash、pieces_hash及announce，
+    种子文件未变化时无需重新读取和解析，持久化保存在独立的SQLite文件中
+    """
+
+    # 扫描时每解析多少个种子文件写入一次索引文件
+    _flush_interval = 500
+
+    def __init__(self, db_path: Union[str, Path]):
+        self._db_path = str(db_path)
+        self._lock = threading.RLock()
+        # 同一时间只允许一个扫描任务
+        self._scan_lock = threading.Lock()
+        # path -> 索引记录
+        self._items: Dict[str, TorrentIndexItem] = {}
+        # 尚未写入的变更，值为None时表示删除
+        self._pending: Dict[str, Optional[TorrentIndexItem]] = {}
+        self.__init_db()
+        self.__load()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def __init_db(self):
+        with self._lock:
+            conn = self.__connect()
+            try:
+                with conn:
+                    conn.execute("""
+                        CREATE TABLE IF NOT EXISTS torrent_index (
+                            path TEXT PRIMARY KEY,
+                            mtime INTEGER NOT NULL,
+                            size INTEGER NOT NULL,
+                            info_hash TEXT NOT NULL,
+                            pieces_hash TEXT NOT NULL,
+                            announce TEXT
+                        )""")
+            finally:
+                conn.close()
+
+    def __load(self):
+        with self._lock:
+            conn = self.__connect()
+            try:
+                for path, mtime, size, info_hash, pieces_hash, announce in conn.execute(
+                        "SELECT path, mtime, size, info_hash, pieces_hash, announce FROM torrent_index"):
+                    self._items[path] = TorrentIndexItem(mtime, size, info_hash, pieces_hash, announce)
+            finally:
+                conn.close()
+        logger.debug(f"种子文件索引加载完成，共 {len(self._items)} 条")
+
+    @staticmethod
+    def __stat(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def get(self, path: Union[str, Path]) -> Optional[TorrentIndexItem]:
+        """
+        获取种子文件的索引记录，文件不存在或已变化时返回None
+        """
+        path = str(path)
+        stat = self.__stat(path)
+        if not stat:
+            return None
+        item = self._items.get(path)
+        if item and (item.mtime, item.size) == stat:
+            return item
+        return None
+
+    def put(self, path: Union[str, Path], info_hash: str, pieces_hash: str,
+            announce: Optional[str] = None) -> Optional[TorrentIndexItem]:
+        """
+        写入种子文件的索引记录，以文件当前的修改时间及大小为准
+        """
+        path = str(path)
+        stat = self.__stat(path)
+        if not stat or not info_hash or not pieces_hash:
+            return None
+        item = TorrentIndexItem(stat[0], stat[1], info_hash, pieces_hash, announce)
+        with self._lock:
+            self._items[path] = item
+            self._pending[path] = item
+        return item
+
+    def scan(self, directory: Union[str, Path],
+             parser: Callable[[str], Optional[Tuple[str, str, Optional[str]]]],
+             event: Optional[threading.Event] = None) -> Dict[str, int]:
+        """
+        增量扫描目录下的种子文件，只解析新增或变化的文件，并移除已不存在文件的索引
+        :param directory: 种子文件目录
+        :param parser: 解析种子文件，返回(info_hash, pieces_hash, announce)，失败返回None
+        :param event: 退出事件
+        :return: 扫描统计
+        """
+        directory = os.path.normpath(str(directory))
+        stats = {"total": 0, "parsed": 0, "failed": 0, "removed": 0}
+        if not self._scan_lock.acquire(blocking=False):
+            logger.info(f"种子文件索引正在扫描中，跳过 {directory}")
+            return stats
+        try:
+            exists = set()
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if event and event.is_set():
+                        return stats
+                    if not entry.name.endswith(".torrent"):
+                        continue
+                    try:
+                        if not entry.is_file():
+                            continue
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    stats["total"] += 1
+                    exists.add(entry.path)
+                    item = self._items.get(entry.path)
+                    if item and item.mtime == stat.st_mtime_ns and item.size == stat.st_size:
+                        continue
+                    result = parser(entry.path)
+                    if not result:
+                        stats["failed"] += 1
+                        continue
+                    self.put(entry.path, *result)
+                    stats["parsed"] += 1
+                    if stats["parsed"] % self._flush_interval == 0:
+                        self.flush()
+
+            # 清理已不存在的种子文件
+            with self._lock:
+                removed = [path for path in self._items
+                           if path not in exists and os.path.dirname(path) == directory]
+                for path in removed:
+                    self._items.pop(path, None)
+                    self._pending[path] = None
+            stats["removed"] = len(removed)
+            return stats
+        finally:
+            self.flush()
+            self._scan_lock.release()
+
+    def flush(self):
+        """
+        将变更写入索引文件
+        """
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+            conn = self.__connect()
+            try:
+                with conn:
+                    conn.executemany("DELETE FROM torrent_index WHERE path = ?",
+                                     [(path,) for path, item in pending.items() if item is None])
+                    conn.executemany("INSERT OR REPLACE INTO torrent_index "
+                                     "(path, mtime, size, info_hash, pieces_hash, announce) "
+                                     "VALUES (?, ?, ?, ?, ?, ?)",
+                                     [(path, *item) for path, item in pending.items() if item])
+            except Exception as e:
+                # 写入失败时保留变更，下次继续写入
+                for path, item in pending.items():
+                    self._pending.setdefault(path, item)
+                logger.error(f"种子文件索引保存失败：{str(e)}")
+            finally:
+                conn.close()
+
@@ -1,8 +1,10 @@
 import os
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from threading import Event
-from typing import Any, List, Dict, Tuple, Optional
+from typing import Any, List, Dict, Tuple, Optional, Set
 from urllib.parse import urljoin
 
 import pytz
@@ -21,6 +23,8 @@ from app.modules.qbittorrent import Qbittorrent
 from app.modules.transmission import Transmission
 from app.plugins import _PluginBase
 from app.plugins.iyuuautoseed.iyuu_helper import IyuuHelper
+from app.plugins.iyuuautoseed.seed_cache import SeedCache
+from app.plugins.iyuuautoseed.site_limiter import SiteLimiter, SiteLimiterGroup
 from app.schemas import NotificationType
 from app.schemas.types import EventType
 from app.utils.http import RequestUtils
@@ -83,12 +87,18 @@ class IYUUAutoSeed(_PluginBase):
     # 待校全种子hash清单
     _recheck_torrents = {}
     _is_recheck_running = False
-    # 辅种缓存，出错的种子不再重复辅种，可清除
-    _error_caches = []
-    # 辅种缓存，辅种成功的种子，可清除
-    _success_caches = []
-    # 辅种缓存，出错的种子不再重复辅种，且无法清除。种子被删除404等情况
-    _permanent_error_caches = []
+    # 辅种缓存，记录辅种成功及出错的种子，出错的种子在有效期内不再重复辅种，可清除
+    _seed_cache: Optional[SeedCache] = None
+    # 临时错误缓存有效期（秒），种子被删除404等永久错误不过期
+    _error_cache_ttl = 7 * 24 * 3600
+    # 种子文件下载并发数
+    _download_threads = 5
+    # 单个站点同时下载的种子数
+    _site_concurrency = 1
+    # 单个站点相邻两次下载的最小间隔（秒）
+    _site_interval = 1
+    # 每批添加到下载器的种子数
+    _add_batch_size = 20
     # 辅种计数
     total = 0
     realtotal = 0
@@ -101,6 +111,9 @@ class IYUUAutoSeed(_PluginBase):
         self.sites = SitesHelper()
         self.siteoper = SiteOper()
         self.torrent = TorrentHelper()
+        if self._seed_cache is None:
+            self._seed_cache = SeedCache(db_path=self.get_data_path() / "seed_cache.db",
+                                         error_ttl=self._error_cache_ttl)
         # 读取配置
         if config:
             self._enabled = config.get("enabled")
@@ -117,10 +130,18 @@ class IYUUAutoSeed(_PluginBase):
             self._categoryafterseed = config.get("categoryafterseed")
             self._addhosttotag = config.get("addhosttotag")
             self._size = float(config.get("size")) if config.get("size") else 0
+            self._download_threads = max(int(self.__parse_number(config.get("download_threads"), 5)), 1)
+            self._site_concurrency = max(int(self.__parse_number(config.get("site_concurrency"), 1)), 1)
+            self._site_interval = max(self.__parse_number(config.get("site_interval"), 1), 0)
             self._clearcache = config.get("clearcache")
-            self._permanent_error_caches = [] if self._clearcache else config.get("permanent_error_caches") or []
-            self._error_caches = [] if self._clearcache else config.get("error_caches") or []
-            self._success_caches = [] if self._clearcache else config.get("success_caches") or []
+            if self._clearcache:
+                self._seed_cache.clear()
+            else:
+                # 迁移原有保存在配置中的缓存，迁移后配置中不再保存缓存
+                self._seed_cache.update(SeedCache.PERMANENT_ERROR, config.get("permanent_error_caches"))
+                self._seed_cache.update(SeedCache.ERROR, config.get("error_caches"))
+                self._seed_cache.update(SeedCache.SUCCESS, config.get("success_caches"))
+                self._seed_cache.flush()
 
             # 过滤掉已删除的站点
             all_sites = [site.id for site in self.siteoper.list_order_by_pri()] + [site.get("id") for site in
@@ -344,6 +365,68 @@ class IYUUAutoSeed(_PluginBase):
                             }
                         ]
                     },
+                    {
+                        'component': 'VRow',
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'download_threads',
+                                            'label': '种子下载并发数',
+                                            'placeholder': '同时下载种子文件的数量',
+                                            'type': 'number',
+                                            "min": "1"
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'site_concurrency',
+                                            'label': '单站点并发数',
+                                            'placeholder': '同一站点同时下载的种子数',
+                                            'type': 'number',
+                                            "min": "1"
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'site_interval',
+                                            'label': '单站点下载间隔(秒)',
+                                            'placeholder': '同一站点相邻两次下载的最小间隔',
+                                            'type': 'number',
+                                            "min": "0"
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
                     {
                         'component': 'VRow',
                         'content': [
@@ -510,7 +593,10 @@ class IYUUAutoSeed(_PluginBase):
             "nolabels": "",
             "labelsafterseed": "",
             "categoryafterseed": "",
-            "size": ""
+            "size": "",
+            "download_threads": 5,
+            "site_concurrency": 1,
+            "site_interval": 1
         }
 
     def get_page(self) -> List[dict]:
@@ -533,11 +619,21 @@ class IYUUAutoSeed(_PluginBase):
             "categoryafterseed": self._categoryafterseed,
             "addhosttotag": self._addhosttotag,
             "size": self._size,
-            "success_caches": self._success_caches,
-            "error_caches": self._error_caches,
-            "permanent_error_caches": self._permanent_error_caches
+            "download_threads": self._download_threads,
+            "site_concurrency": self._site_concurrency,
+            "site_interval": self._site_interval
         })
 
+    @staticmethod
+    def __parse_number(value: Any, default: float) -> float:
+        """
+        解析配置中的数值，为空或格式错误时使用默认值
+        """
+        try:
+            return float(value) if value not in (None, "") else default
+        except (TypeError, ValueError):
+            return default
+
     def __get_downloader(self, dtype: str):
         """
         根据类型返回下载器实例
@@ -579,10 +675,11 @@ class IYUUAutoSeed(_PluginBase):
             for torrent in torrents:
                 if self._event.is_set():
                     logger.info(f"辅种服务停止")
+                    self._seed_cache.flush()
                     return
                 # 获取种子hash
                 hash_str = self.__get_hash(torrent, downloader)
-                if hash_str in self._error_caches or hash_str in self._permanent_error_caches:
+                if self._seed_cache.is_error(hash_str):
                     logger.info(f"种子 {hash_str} 辅种失败且已缓存，跳过 ...")
                     continue
                 save_path = self.__get_save_path(torrent, downloader)
@@ -636,7 +733,7 @@ class IYUUAutoSeed(_PluginBase):
                 logger.info(f"没有需要辅种的种子")
 
         # 保存缓存
-        self.__update_config()
+        self._seed_cache.flush()
         # 发送消息
         if self._notify:
             if self.success or self.fail:
@@ -702,6 +799,7 @@ class IYUUAutoSeed(_PluginBase):
         logger.info(f"下载器 {downloader} 开始查询辅种，数量：{len(hash_strs)} ...")
         # 下载器中的Hashs
         hashs = [item.get("hash") for item in hash_strs]
+        hash_set = set(hashs)
         # 每个Hash的保存目录
         save_paths = {}
         for item in hash_strs:
@@ -717,7 +815,9 @@ class IYUUAutoSeed(_PluginBase):
             return
         else:
             logger.info(f"IYUU返回可辅种数：{len(seed_list)}")
-        # 遍历
+        # 遍历，收集需要辅种的种子，同一种子只处理一次
+        seed_tasks = []
+        seed_hashes = set()
         for current_hash, seed_info in seed_list.items():
             if not seed_info:
                 continue
@@ -725,9 +825,6 @@ class IYUUAutoSeed(_PluginBase):
             if not isinstance(seed_torrents, list):
                 seed_torrents = [seed_torrents]
 
-            # 本次辅种成功的种子
-            success_torrents = []
-
             for seed in seed_torrents:
                 if not seed:
                     continue
@@ -735,27 +832,30 @@ class IYUUAutoSeed(_PluginBase):
                     continue
                 if not seed.get("sid") or not seed.get("info_hash"):
                     continue
-                if seed.get("info_hash") in hashs:
+                if seed.get("info_hash") in hash_set:
                     logger.info(f"{seed.get('info_hash')} 已在下载器中，跳过 ...")
                     continue
-                if seed.get("info_hash") in self._success_caches:
+                if self._seed_cache.is_success(seed.get("info_hash")):
                     logger.info(f"{seed.get('info_hash')} 已处理过辅种，跳过 ...")
                     continue
-                if seed.get("info_hash") in self._error_caches or seed.get("info_hash") in self._permanent_error_caches:
+                if self._seed_cache.is_error(seed.get("info_hash")):
                     logger.info(f"种子 {seed.get('info_hash')} 辅种失败且已缓存，跳过 ...")
                     continue
-                # 添加任务
-                success = self.__download_torrent(seed=seed,
-                                                  downloader=downloader,
-                                                  save_path=save_paths.get(current_hash))
-                if success:
-                    success_torrents.append(seed.get("info_hash"))
-
-            # 辅种成功的去重放入历史
-            if len(success_torrents) > 0:
-                self.__save_history(current_hash=current_hash,
-                                    downloader=downloader,
-                                    success_torrents=success_torrents)
+                if seed.get("info_hash") in seed_hashes:
+                    continue
+                seed_hashes.add(seed.get("info_hash"))
+                seed_tasks.append((current_hash, seed))
+
+        # 并发下载种子，下载完成后依次添加到下载器
+        success_torrents = self.__download_torrents(seed_tasks=seed_tasks,
+                                                    downloader=downloader,
+                                                    save_paths=save_paths)
+
+        # 辅种成功的去重放入历史
+        for current_hash, torrents in success_torrents.items():
+            self.__save_history(current_hash=current_hash,
+                                downloader=downloader,
+                                success_torrents=torrents)
 
         logger.info(f"下载器 {downloader} 辅种完成")
 
@@ -811,173 +911,301 @@ class IYUUAutoSeed(_PluginBase):
         except Exception as e:
             print(str(e))
 
-    def __download(self, downloader: str, content: bytes,
-                   save_path: str, site_name: str) -> Optional[str]:
-
+    def __get_torrent_tags(self, site_name: str) -> List[str]:
+        """
+        辅种任务的标签
+        """
         torrent_tags = self._labelsafterseed.split(',')
-
         # 辅种 tag 叠加站点名
         if self._addhosttotag:
             torrent_tags.append(site_name)
+        return torrent_tags
 
+    def __download(self, downloader: str, torrents: List[dict]) -> List[Optional[str]]:
         """
-        添加下载任务
+        批量添加下载任务，返回与torrents顺序一致的任务ID，添加失败的为None
+        下载器接口每次只能添加一个种子，QB同一批次共用一个临时Tag，全部添加后一次获取任务ID并移除临时Tag
+        :param torrents: [{"seed": 种子, "content": 种子内容, "save_path": 保存路径, "site_info": 站点信息}]
         """
+        download_ids: List[Optional[str]] = [None] * len(torrents)
         if downloader == "qbittorrent":
-            # 生成随机Tag
+            # 生成本批次的随机Tag
             tag = StringUtils.generate_random_str(10)
-
-            torrent_tags.append(tag)
-
-            state = self.qb.add_torrent(content=content,
-                                        download_dir=save_path,
-                                        is_paused=True,
-                                        tag=torrent_tags,
-                                        category=self._categoryafterseed,
-                                        is_skip_checking=self._skipverify)
-            if not state:
-                return None
-            else:
-                # 获取种子Hash
-                torrent_hash = self.qb.get_torrent_id_by_tag(tags=tag)
-                if not torrent_hash:
+            added = []
+            for i, torrent in enumerate(torrents):
+                state = self.qb.add_torrent(content=torrent.get("content"),
+                                            download_dir=torrent.get("save_path"),
+                                            is_paused=True,
+                                            tag=self.__get_torrent_tags(torrent.get("site_info").get("name")) + [tag],
+                                            category=self._categoryafterseed,
+                                            is_skip_checking=self._skipverify)
+                if state:
+                    added.append(i)
+            if not added:
+                return download_ids
+            # 获取本批次添加成功的种子Hash
+            added_torrents, _ = self.qb.get_torrents(tags=tag)
+            added_hashes = {self.__get_hash(torrent, downloader) for torrent in added_torrents or []}
+            if added_hashes:
+                self.qb.remove_torrents_tag(ids=list(added_hashes), tag=tag)
+            for i in added:
+                info_hash = torrents[i].get("seed").get("info_hash")
+                if info_hash in added_hashes:
+                    download_ids[i] = info_hash
+                else:
                     logger.error(f"{downloader} 下载任务添加成功，但获取任务信息失败！")
-                    return None
-            return torrent_hash
+            return download_ids
         elif downloader == "transmission":
-            # 添加任务
-            torrent = self.tr.add_torrent(content=content,
-                                          download_dir=save_path,
-                                          is_paused=True,
-                                          labels=torrent_tags)
-            if not torrent:
-                return None
-            else:
-                return torrent.hashString
+            for i, torrent in enumerate(torrents):
+                # 添加任务
+                added_torrent = self.tr.add_torrent(content=torrent.get("content"),
+                                                    download_dir=torrent.get("save_path"),
+                                                    is_paused=True,
+                                                    labels=self.__get_torrent_tags(
+                                                        torrent.get("site_info").get("name")))
+                if added_torrent:
+                    download_ids[i] = added_torrent.hashString
+            return download_ids
 
         logger.error(f"不支持的下载器：{downloader}")
-        return None
+        return download_ids
 
-    def __download_torrent(self, seed: dict, downloader: str, save_path: str):
+    def __download_torrents(self, seed_tasks: List[Tuple[str, dict]], downloader: str,
+                            save_paths: Dict[str, str]) -> Dict[str, List[str]]:
+        """
+        辅种流水线：站点种子文件按站点限制并发下载，下载完成的种子分批添加到下载器，返回每个源种子辅种成功的种子
+        """
+        success_torrents: Dict[str, List[str]] = {}
+        if not seed_tasks:
+            return success_torrents
+        downloader_obj = self.__get_downloader(downloader)
+
+        # 批量查询已在下载器中的种子，避免逐个查询下载器
+        exist_torrents, _ = downloader_obj.get_torrents(ids=[seed.get("info_hash") for _, seed in seed_tasks])
+        exist_hashes = {self.__get_hash(torrent, downloader) for torrent in exist_torrents or []}
+
+        site_limiters = SiteLimiterGroup(concurrency=self._site_concurrency, interval=self._site_interval,
+                                         event=self._event)
+        executor = ThreadPoolExecutor(max_workers=self._download_threads)
+        futures = {}
+        try:
+            for current_hash, seed in seed_tasks:
+                site = self.__get_seed_site(seed=seed, exist_hashes=exist_hashes)
+                if not site:
+                    continue
+                site_info, download_page = site
+                future = executor.submit(self.__fetch_torrent,
+                                         seed=seed,
+                                         site_info=site_info,
+                                         download_page=download_page,
+                                         limiter=site_limiters.get(site_info.get("domain") or site_info.get("url")))
+                futures[future] = (current_hash, seed, site_info)
+
+            if not futures:
+                return success_torrents
+            logger.info(f"下载器 {downloader} 开始下载辅种种子，数量：{len(futures)}，"
+                        f"并发数：{self._download_threads}，单站点并发数：{self._site_concurrency}")
+
+            start_time = time.time()
+            recheck_ids = []
+            # 已下载完成、等待添加到下载器的种子
+            pending_torrents = []
+            for finished, future in enumerate(as_completed(futures), start=1):
+                if self._event.is_set():
+                    logger.info(f"辅种服务停止")
+                    break
+                current_hash, seed, site_info = futures[future]
+                try:
+                    torrent_url, content, error_msg = future.result()
+                except Exception as e:
+                    torrent_url, content, error_msg = None, None, str(e)
+                if not content:
+                    self.__handle_fetch_failure(seed=seed, torrent_url=torrent_url, error_msg=error_msg)
+                else:
+                    pending_torrents.append({
+                        "current_hash": current_hash,
+                        "seed": seed,
+                        "content": content,
+                        "torrent_url": torrent_url,
+                        "site_info": site_info,
+                        "save_path": save_paths.get(current_hash)
+                    })
+                    # 攒够一批后添加到下载器
+                    if len(pending_torrents) >= self._add_batch_size:
+                        self.__add_torrents(downloader=downloader,
+                                            torrents=pending_torrents,
+                                            success_torrents=success_torrents,
+                                            recheck_ids=recheck_ids)
+                        pending_torrents = []
+                if finished % 20 == 0 or finished == len(futures):
+                    elapsed = time.time() - start_time
+                    logger.info(f"辅种进度：{finished}/{len(futures)}，成功：{self.success}，失败：{self.fail}，"
+                                f"耗时：{elapsed:.1f} 秒，速度：{finished / elapsed if elapsed else 0:.2f} 个/秒")
+
+            # 添加剩余已下载的种子
+            if pending_torrents:
+                self.__add_torrents(downloader=downloader,
+                                    torrents=pending_torrents,
+                                    success_torrents=success_torrents,
+                                    recheck_ids=recheck_ids)
+
+            # TR会自动校验，QB批量开始校验种子
+            if recheck_ids:
+                downloader_obj.recheck_torrents(ids=recheck_ids)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        return success_torrents
+
+    def __get_seed_site(self, seed: dict, exist_hashes: Set[str]) -> Optional[Tuple[dict, str]]:
         """
-        下载种子
+        获取种子所在站点信息及下载地址模板
         torrent: {
                     "sid": 3,
                     "torrent_id": 377467,
                     "info_hash": "a444850638e7a6f6220e2efdde94099c53358159"
                 }
         """
-
-        def __is_special_site(url):
-            """
-            判断是否为特殊站点（是否需要添加https）
-            """
-            if "hdsky.me" in url:
-                return False
-            return True
-
         self.total += 1
         # 获取种子站点及下载地址模板
         site_url, download_page = self.iyuuhelper.get_torrent_url(seed.get("sid"))
         if not site_url or not download_page:
             # 加入缓存
-            self._error_caches.append(seed.get("info_hash"))
+            self._seed_cache.add(SeedCache.ERROR, seed.get("info_hash"))
             self.fail += 1
             self.cached += 1
-            return False
+            return None
         # 查询站点
         site_domain = StringUtils.get_url_domain(site_url)
         # 站点信息
         site_info = self.sites.get_indexer(site_domain)
         if not site_info or not site_info.get('url'):
             logger.debug(f"没有维护种子对应的站点：{site_url}")
-            return False
+            return None
         if self._sites and site_info.get('id') not in self._sites:
             logger.info("当前站点不在选择的辅种站点范围，跳过 ...")
-            return False
+            return None
         self.realtotal += 1
         # 查询hash值是否已经在下载器中
-        downloader_obj = self.__get_downloader(downloader)
-        torrent_info, _ = downloader_obj.get_torrents(ids=[seed.get("info_hash")])
-        if torrent_info:
+        if seed.get("info_hash") in exist_hashes:
             logger.info(f"{seed.get('info_hash')} 已在下载器中，跳过 ...")
             self.exist += 1
-            return False
-        # 站点流控
-        check, checkmsg = self.sites.check(site_domain)
-        if check:
-            logger.warn(checkmsg)
-            self.fail += 1
-            return False
-        # 下载种子
-        torrent_url = self.__get_download_url(seed=seed,
-                                              site=site_info,
-                                              base_url=download_page)
+            return None
+        return site_info, download_page
+
+    def __fetch_torrent(self, seed: dict, site_info: dict, download_page: str,
+                        limiter: SiteLimiter) -> Tuple[Optional[str], Optional[bytes], Optional[str]]:
+        """
+        下载种子文件，在线程池中执行，返回种子链接、种子内容及错误信息，计数及缓存由调用方处理
+        """
+
+        def __is_special_site(url):
+            """
+            判断是否为特殊站点（是否需要添加https）
+            """
+            if "hdsky.me" in url:
+                return False
+            return True
+
+        with limiter:
+            if self._event.is_set():
+                return None, None, None
+            # 站点流控
+            check, checkmsg = self.sites.check(StringUtils.get_url_domain(site_info.get("url")))
+            if check:
+                return None, None, checkmsg
+            # 下载种子
+            torrent_url = self.__get_download_url(seed=seed,
+                                                  site=site_info,
+                                                  base_url=download_page)
+            if not torrent_url:
+                return None, None, None
+            # 强制使用Https
+            if __is_special_site(torrent_url):
+                if "?" in torrent_url:
+                    torrent_url += "&https=1"
+                else:
+                    torrent_url += "?https=1"
+            # 下载种子文件
+            _, content, _, _, error_msg = self.torrent.download_torrent(
+                url=torrent_url,
+                cookie=site_info.get("cookie"),
+                ua=site_info.get("ua") or settings.USER_AGENT,
+                proxy=site_info.get("proxy"))
+        return torrent_url, content, error_msg
+
+    def __handle_fetch_failure(self, seed: dict, torrent_url: Optional[str], error_msg: Optional[str]):
+        """
+        处理种子文件下载失败
+        """
+        if self._event.is_set():
+            return
+        self.fail += 1
         if not torrent_url:
+            if error_msg:
+                # 站点流控或下载出错，不加入缓存
+                logger.warn(error_msg)
+                return
             # 加入失败缓存
-            self._error_caches.append(seed.get("info_hash"))
-            self.fail += 1
+            self._seed_cache.add(SeedCache.ERROR, seed.get("info_hash"))
             self.cached += 1
-            return False
-        # 强制使用Https
-        if __is_special_site(torrent_url):
-            if "?" in torrent_url:
-                torrent_url += "&https=1"
-            else:
-                torrent_url += "?https=1"
-        # 下载种子文件
-        _, content, _, _, error_msg = self.torrent.download_torrent(
-            url=torrent_url,
-            cookie=site_info.get("cookie"),
-            ua=site_info.get("ua") or settings.USER_AGENT,
-            proxy=site_info.get("proxy"))
-        if not content:
-            # 下载失败
-            self.fail += 1
-            # 加入失败缓存
-            if error_msg and ('无法打开链接' in error_msg or '触发站点流控' in error_msg):
-                self._error_caches.append(seed.get("info_hash"))
-            else:
-                # 种子不存在的情况
-                self._permanent_error_caches.append(seed.get("info_hash"))
-            logger.error(f"下载种子文件失败：{torrent_url}")
-            return False
-        # 添加下载，辅种任务默认暂停
-        logger.info(f"添加下载任务：{torrent_url} ...")
-        download_id = self.__download(downloader=downloader,
-                                      content=content,
-                                      save_path=save_path,
-                                      site_name=site_info.get("name"))
+            return
+        # 加入失败缓存
+        if error_msg and ('无法打开链接' in error_msg or '触发站点流控' in error_msg):
+            self._seed_cache.add(SeedCache.ERROR, seed.get("info_hash"))
+        else:
+            # 种子不存在的情况
+            self._seed_cache.add(SeedCache.PERMANENT_ERROR, seed.get("info_hash"))
+        logger.error(f"下载种子文件失败：{torrent_url}")
+
+    def __add_torrents(self, downloader: str, torrents: List[dict], success_torrents: Dict[str, List[str]],
+                       recheck_ids: List[str]):
+        """
+        批量添加已下载的辅种种子到下载器，记录辅种成功的种子及需要校验的任务
+        """
+        logger.info(f"下载器 {downloader} 添加辅种任务：{len(torrents)} 个 ...")
+        download_ids = self.__download(downloader=downloader, torrents=torrents)
+        for torrent, download_id in zip(torrents, download_ids):
+            if not self.__handle_add_result(seed=torrent.get("seed"),
+                                            downloader=downloader,
+                                            download_id=download_id,
+                                            torrent_url=torrent.get("torrent_url"),
+                                            site_info=torrent.get("site_info")):
+                continue
+            success_torrents.setdefault(torrent.get("current_hash"), []).append(torrent.get("seed").get("info_hash"))
+            if not self._skipverify and downloader == "qbittorrent":
+                recheck_ids.append(download_id)
+
+    def __handle_add_result(self, seed: dict, downloader: str, download_id: Optional[str], torrent_url: str,
+                            site_info: dict) -> bool:
+        """
+        处理辅种下载任务的添加结果，辅种任务默认暂停
+        """
         if not download_id:
             # 下载失败
+            logger.error(f"添加下载任务失败：{torrent_url}")
             self.fail += 1
             # 加入失败缓存
-            self._error_caches.append(seed.get("info_hash"))
+            self._seed_cache.add(SeedCache.ERROR, seed.get("info_hash"))
             return False
+        self.success += 1
+        if self._skipverify:
+            # 跳过校验
+            logger.info(f"{download_id} 跳过校验，请自行检查...")
+            # 请注意这里是故意不自动开始的
+            # 跳过校验存在直接失败、种子目录相同文件不同等异常情况
+            # 必须要用户自行二次确认之后才能开始做种
+            # 否则会出现反复下载刷掉分享率、做假种的情况
         else:
-            self.success += 1
-            if self._skipverify:
-                # 跳过校验
-                logger.info(f"{download_id} 跳过校验，请自行检查...")
-                # 请注意这里是故意不自动开始的
-                # 跳过校验存在直接失败、种子目录相同文件不同等异常情况
-                # 必须要用户自行二次确认之后才能开始做种
-                # 否则会出现反复下载刷掉分享率、做假种的情况
-            else:
-                # 追加校验任务
-                logger.info(f"添加校验检查任务：{download_id} ...")
-                if not self._recheck_torrents.get(downloader):
-                    self._recheck_torrents[downloader] = []
-                self._recheck_torrents[downloader].append(download_id)
-                # TR会自动校验
-                if downloader == "qbittorrent":
-                    # 开始校验种子
-                    downloader_obj.recheck_torrents(ids=[download_id])
-            # 下载成功
-            logger.info(f"成功添加辅种下载，站点：{site_info.get('name')}，种子链接：{torrent_url}")
-            # 成功也加入缓存，有一些改了路径校验不通过的，手动删除后，下一次又会辅上
-            self._success_caches.append(seed.get("info_hash"))
-            return True
+            # 追加校验任务
+            logger.info(f"添加校验检查任务：{download_id} ...")
+            if not self._recheck_torrents.get(downloader):
+                self._recheck_torrents[downloader] = []
+            self._recheck_torrents[downloader].append(download_id)
+        # 下载成功
+        logger.info(f"成功添加辅种下载，站点：{site_info.get('name')}，种子链接：{torrent_url}")
+        # 成功也加入缓存，有一些改了路径校验不通过的，手动删除后，下一次又会辅上
+        self._seed_cache.add(SeedCache.SUCCESS, seed.get("info_hash"))
+        return True
 
     @staticmethod
     def __get_hash(torrent: Any, dl_type: str):
@@ -1280,6 +1508,8 @@ class IYUUAutoSeed(_PluginBase):
                     self._scheduler.shutdown()
                     self._event.clear()
                 self._scheduler = None
+            if self._seed_cache is not None:
+                self._seed_cache.flush()
         except Exception as e:
             print(str(e))
 
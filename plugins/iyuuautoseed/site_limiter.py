@@ -0,0 +1,60 @@
+import threading
+import time
+from typing import Dict, Optional
+
+
+class SiteLimiter:
+    """
+    站点请求限制，限制同一站点的并发数及相邻两次请求的最小间隔
+    """
+
+    def __init__(self, concurrency: int = 1, interval: float = 0, event: Optional[threading.Event] = None):
+        """
+        :param concurrency: 同一站点同时进行的请求数
+        :param interval: 同一站点相邻两次请求的最小间隔（秒）
+        :param event: 退出事件，等待期间收到退出事件时立即返回
+        """
+        self._semaphore = threading.Semaphore(max(int(concurrency or 1), 1))
+        self._interval = interval or 0
+        self._event = event
+        self._lock = threading.Lock()
+        self._next_time = 0.0
+
+    def __enter__(self):
+        self._semaphore.acquire()
+        if self._interval:
+            with self._lock:
+                now = time.time()
+                wait_time = self._next_time - now
+                self._next_time = max(now, self._next_time) + self._interval
+            if wait_time > 0:
+                if self._event:
+                    self._event.wait(wait_time)
+                else:
+                    time.sleep(wait_time)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._semaphore.release()
+        return False
+
+
+class SiteLimiterGroup:
+    """
+    按站点分组的请求限制
+    """
+
+    def __init__(self, concurrency: int = 1, interval: float = 0, event: Optional[threading.Event] = None):
+        self._concurrency = concurrency
+        self._interval = interval
+        self._event = event
+        self._lock = threading.Lock()
+        self._limiters: Dict[str, SiteLimiter] = {}
+
+    def get(self, site: str) -> SiteLimiter:
+        with self._lock:
+            limiter = self._limiters.get(site)
+            if not limiter:
+                limiter = SiteLimiter(concurrency=self._concurrency, interval=self._interval, event=self._event)
+                self._limiters[site] = limiter
+            return limiter
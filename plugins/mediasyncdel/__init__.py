@@ -4,21 +4,37 @@ import os
 import re
 import time
 from pathlib import Path
-from typing import List, Tuple, Dict, Any, Optional
+from typing import List, Tuple, Dict, Any, Optional, Callable
 
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
+from sqlalchemy.orm import Session
 
 from app import schemas
 from app.chain.transfer import TransferChain
 from app.core.config import settings
 from app.core.event import eventmanager, Event
+from app.db import db_query
+from app.db.models.downloadhistory import DownloadFiles
 from app.db.models.transferhistory import TransferHistory
 from app.log import logger
 from app.modules.emby import Emby
 from app.modules.jellyfin import Jellyfin
 from app.plugins import _PluginBase
+from app.plugins.mediasyncdel.log_follower import LogFollower
+from app.plugins.mediasyncdel.torrent_plan import TorrentDeletePlan
 from app.schemas.types import NotificationType, EventType, MediaType, MediaImageType
+from app.utils.http import RequestUtils
+
+# 媒体服务器删除媒体日志，分组依次为时间、类型、名称、路径
+_EMBY_DEL_PATTERN = re.compile(r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}.\d{3}) Info App: Removing item from database, '
+                               r'Type: (\w+), Name: (.*), Path: (.*), Id: (\d+)')
+_JELLYFIN_DEL_PATTERN = re.compile(r'\[(.*?)\].*?Removing item, Type: "(.*?)", Name: "(.*?)", Path: "(.*?)"')
+# 媒体路径中的年份、名称、季、集
+_MEDIA_PATH_PATTERN = re.compile(r"\((?P<year>\d+)\)"
+                                 r"|\/(?P<name>[\u4e00-\u9fa5]+)(?= \()"
+                                 r"|Season\s*(?P<season>\d+)"
+                                 r"|S\d+E(?P<episode>\d+)")
 
 
 class MediaSyncDel(_PluginBase):
@@ -54,6 +70,8 @@ class MediaSyncDel(_PluginBase):
     _transferchain = None
     _transferhis = None
     _downloadhis = None
+    # 批量查询下载文件记录时每次查询的条件数，避免超出SQLite参数个数限制
+    _query_batch_size = 500
 
     def init_plugin(self, config: dict = None):
         self._transferchain = TransferChain()
@@ -792,6 +810,7 @@ class MediaSyncDel(_PluginBase):
         del_torrent_hashs = []
         stop_torrent_hashs = []
         error_cnt = 0
+        torrents = []
         image = 'https://emby.media/notificationicon.png'
         for transferhis in transfer_history:
             title = transferhis.title
@@ -811,21 +830,14 @@ class MediaSyncDel(_PluginBase):
                 if transferhis.src and Path(transferhis.src).suffix in settings.RMT_MEDIAEXT:
                     self._transferchain.delete_files(Path(transferhis.src))
                     if transferhis.download_hash:
-                        try:
-                            # 2、判断种子是否被删除完
-                            delete_flag, success_flag, handle_torrent_hashs = self.handle_torrent(
-                                type=transferhis.type,
-                                src=transferhis.src,
-                                torrent_hash=transferhis.download_hash)
-                            if not success_flag:
-                                error_cnt += 1
-                            else:
-                                if delete_flag:
-                                    del_torrent_hashs += handle_torrent_hashs
-                                else:
-                                    stop_torrent_hashs += handle_torrent_hashs
-                        except Exception as e:
-                            logger.error("删除种子失败：%s" % str(e))
+                        # 2、记录待处理的种子，全部记录处理完后统一判断种子是否被删除完
+                        torrents.append((transferhis.type, transferhis.src, transferhis.download_hash))
+
+        if torrents:
+            try:
+                del_torrent_hashs, stop_torrent_hashs, error_cnt = self.handle_torrents(torrents)
+            except Exception as e:
+                logger.error("删除种子失败：%s" % str(e))
 
         logger.info(f"同步删除 {msg} 完成！")
 
@@ -959,23 +971,30 @@ class MediaSyncDel(_PluginBase):
         # 读取历史记录
         history = self.get_data('history') or []
         last_time = self.get_data("last_time") or None
+        # 各媒体服务器日志的读取位置
+        log_states = self.get_data("log_states") or {}
         del_medias = []
 
         # 媒体服务器类型，多个以,分隔
         if not settings.MEDIASERVER:
             return
         media_servers = settings.MEDIASERVER.split(',')
+        followers: Dict[str, LogFollower] = {}
         for media_server in media_servers:
             if media_server == 'emby':
-                del_medias.extend(self.parse_emby_log(last_time))
+                followers[media_server] = LogFollower(log_states.get(media_server))
+                del_medias.extend(self.parse_emby_log(last_time, followers[media_server]))
             elif media_server == 'jellyfin':
-                del_medias.extend(self.parse_jellyfin_log(last_time))
+                followers[media_server] = LogFollower(log_states.get(media_server))
+                del_medias.extend(self.parse_jellyfin_log(last_time, followers[media_server]))
             elif media_server == 'plex':
                 # TODO plex解析日志
                 return
+        log_states.update({media_server: follower.states for media_server, follower in followers.items()})
 
         if not del_medias:
-            logger.error("未解析到已删除媒体信息")
+            logger.info("未解析到新删除的媒体信息")
+            self.save_data("log_states", log_states)
             return
 
         # 遍历删除
@@ -1062,6 +1081,7 @@ class MediaSyncDel(_PluginBase):
             del_torrent_hashs = []
             stop_torrent_hashs = []
             error_cnt = 0
+            torrents = []
             for transferhis in transfer_history:
                 title = transferhis.title
                 if title not in media_name:
@@ -1079,21 +1099,14 @@ class MediaSyncDel(_PluginBase):
                     if transferhis.src and Path(transferhis.src).suffix in settings.RMT_MEDIAEXT:
                         self._transferchain.delete_files(Path(transferhis.src))
                         if transferhis.download_hash:
-                            try:
-                                # 2、判断种子是否被删除完
-                                delete_flag, success_flag, handle_torrent_hashs = self.handle_torrent(
-                                    type=transferhis.type,
-                                    src=transferhis.src,
-                                    torrent_hash=transferhis.download_hash)
-                                if not success_flag:
-                                    error_cnt += 1
-                                else:
-                                    if delete_flag:
-                                        del_torrent_hashs += handle_torrent_hashs
-                                    else:
-                                        stop_torrent_hashs += handle_torrent_hashs
-                            except Exception as e:
-                                logger.error("删除种子失败：%s" % str(e))
+                            # 2、记录待处理的种子，全部记录处理完后统一判断种子是否被删除完
+                            torrents.append((transferhis.type, transferhis.src, transferhis.download_hash))
+
+            if torrents:
+                try:
+                    del_torrent_hashs, stop_torrent_hashs, error_cnt = self.handle_torrents(torrents)
+                except Exception as e:
+                    logger.error("删除种子失败：%s" % str(e))
 
             logger.info(f"同步删除 {msg} 完成！")
 
@@ -1134,293 +1147,214 @@ class MediaSyncDel(_PluginBase):
         self.save_data("history", history)
 
         self.save_data("last_time", last_del_time)
+        self.save_data("log_states", log_states)
 
-    def handle_torrent(self, type: str, src: str, torrent_hash: str):
+    def handle_torrents(self, torrents: List[Tuple[str, str, str]]) -> Tuple[List[str], List[str], int]:
         """
-        判断种子是否局部删除
-        局部删除则暂停种子
-        全部删除则删除种子
+        批量处理种子，先删除文件记录，再按种子解析转种、辅种及合集，
+        部分文件删除的种子暂停，全部删除的种子删除，最后按下载器分组统一删除或暂停
+        :param torrents: [(媒体类型, 源文件路径, 种子hash)]
+        :return: 删除的种子hash、暂停的种子hash、处理失败数
         """
-        download_id = torrent_hash
-        download = settings.DEFAULT_DOWNLOADER
-        history_key = "%s-%s" % (download, torrent_hash)
-        plugin_id = "TorrentTransfer"
-        transfer_history = self.get_data(key=history_key,
-                                         plugin_id=plugin_id)
-        logger.info(f"查询到 {history_key} 转种历史 {transfer_history}")
-
-        handle_torrent_hashs = []
-        try:
+        # 种子hash -> 源文件路径
+        torrent_srcs: Dict[str, List[Tuple[str, str]]] = {}
+        for media_type, src, torrent_hash in torrents:
+            if not torrent_hash:
+                continue
             # 删除本次种子记录
             self._downloadhis.delete_file_by_fullpath(fullpath=src)
+            torrent_srcs.setdefault(torrent_hash, []).append((media_type, src))
+        if not torrent_srcs:
+            return [], [], 0
+
+        # 批量查询本批次种子及剧集源文件的下载文件记录
+        hash_files = self.__get_files_by_hashes(hashes=list(torrent_srcs))
+        tv_srcs = [src for srcs in torrent_srcs.values() for media_type, src in srcs if str(media_type) == "电视剧"]
+        src_files = self.__get_files_by_fullpaths(fullpaths=tv_srcs) if tv_srcs else {}
+        # 源文件对应的其他种子可能是合集，一并查询其下载文件记录
+        collection_hashes = list({download_file.download_hash
+                                  for download_files in src_files.values() for download_file in download_files
+                                  if download_file.download_hash and download_file.download_hash not in hash_files})
+        if collection_hashes:
+            hash_files.update(self.__get_files_by_hashes(hashes=collection_hashes))
+
+        # 转种及辅种历史按key读取，同一批次内相同key只读取一次
+        get_transfer_history = self.__get_data_cached(plugin_id="TorrentTransfer")
+        get_seed_history = self.__get_data_cached(plugin_id="IYUUAutoSeed")
+
+        plan = TorrentDeletePlan()
+        transfer_keys = []
+        error_cnt = 0
+        for torrent_hash, srcs in torrent_srcs.items():
+            try:
+                transfer_key = self.__add_torrent(plan=plan,
+                                                  torrent_hash=torrent_hash,
+                                                  srcs=srcs,
+                                                  hash_files=hash_files,
+                                                  src_files=src_files,
+                                                  get_transfer_history=get_transfer_history,
+                                                  get_seed_history=get_seed_history)
+                if transfer_key is None:
+                    error_cnt += len(srcs)
+                elif transfer_key:
+                    transfer_keys.append(transfer_key)
+            except Exception as e:
+                logger.error(f"删种失败： {str(e)}")
+                error_cnt += len(srcs)
+
+        del_torrent_hashs, stop_torrent_hashs, fail_cnt = plan.execute(remove=self.chain.remove_torrents,
+                                                                        stop=self.chain.stop_torrents)
+        # 删除转种及辅种历史
+        for transfer_key in transfer_keys:
+            self.del_data(key=transfer_key, plugin_id="TorrentTransfer")
+        for seed_key in plan.seed_keys:
+            self.del_data(key=seed_key, plugin_id="IYUUAutoSeed")
+        return del_torrent_hashs, stop_torrent_hashs, error_cnt + fail_cnt
+
+    def __add_torrent(self, plan: TorrentDeletePlan, torrent_hash: str, srcs: List[Tuple[str, str]],
+                      hash_files: Dict[str, list], src_files: Dict[str, list],
+                      get_transfer_history: Callable[[str], Any],
+                      get_seed_history: Callable[[str], Any]) -> Optional[str]:
+        """
+        将种子及其转种、辅种、合集种子加入删除计划
+        :return: 需要删除的转种历史key，无转种历史时为空字符串，未查询到文件记录时为None
+        """
+        # 种子对应的所有下载器文件记录
+        download_files = hash_files.get(torrent_hash)
+        if not download_files:
+            logger.error(
+                f"未查询到种子任务 {torrent_hash} 存在文件记录，未执行下载器文件同步或该种子已被删除")
+            return None
+
+        # 查询未删除数
+        no_del_cnt = self.__count_undeleted(download_files)
+        if no_del_cnt > 0:
+            logger.info(
+                f"查询种子任务 {torrent_hash} 存在 {no_del_cnt} 个未删除文件，执行暂停种子操作")
+            delete_flag = False
+        else:
+            logger.info(
+                f"查询种子任务 {torrent_hash} 文件已全部删除，执行删除种子操作")
+            delete_flag = True
 
-            # 根据种子hash查询所有下载器文件记录
-            download_files = self._downloadhis.get_files_by_hash(download_hash=torrent_hash)
-            if not download_files:
-                logger.error(
-                    f"未查询到种子任务 {torrent_hash} 存在文件记录，未执行下载器文件同步或该种子已被删除")
-                return False, False, 0
-
-            # 查询未删除数
-            no_del_cnt = 0
-            for download_file in download_files:
-                if download_file and download_file.state and int(download_file.state) == 1:
-                    no_del_cnt += 1
-
-            if no_del_cnt > 0:
-                logger.info(
-                    f"查询种子任务 {torrent_hash} 存在 {no_del_cnt} 个未删除文件，执行暂停种子操作")
-                delete_flag = False
-            else:
-                logger.info(
-                    f"查询种子任务 {torrent_hash} 文件已全部删除，执行删除种子操作")
-                delete_flag = True
-
-            # 如果有转种记录，则删除转种后的下载任务
-            if transfer_history and isinstance(transfer_history, dict):
-                download = transfer_history['to_download']
-                download_id = transfer_history['to_download_id']
-                delete_source = transfer_history['delete_source']
-
-                # 删除种子
-                if delete_flag:
-                    # 删除转种记录
-                    self.del_data(key=history_key, plugin_id=plugin_id)
-
-                    # 转种后未删除源种时，同步删除源种
-                    if not delete_source:
-                        logger.info(f"{history_key} 转种时未删除源下载任务，开始删除源下载任务…")
-
-                        # 删除源种子
-                        logger.info(f"删除源下载器下载任务：{settings.DEFAULT_DOWNLOADER} - {torrent_hash}")
-                        self.chain.remove_torrents(torrent_hash)
-                        handle_torrent_hashs.append(torrent_hash)
-
-                    # 删除转种后任务
-                    logger.info(f"删除转种后下载任务：{download} - {download_id}")
-                    # 删除转种后下载任务
-                    self.chain.remove_torrents(hashs=torrent_hash,
-                                               downloader=download)
-                    handle_torrent_hashs.append(download_id)
-                else:
-                    # 暂停种子
-                    # 转种后未删除源种时，同步暂停源种
-                    if not delete_source:
-                        logger.info(f"{history_key} 转种时未删除源下载任务，开始暂停源下载任务…")
-
-                        # 暂停源种子
-                        logger.info(f"暂停源下载器下载任务：{settings.DEFAULT_DOWNLOADER} - {torrent_hash}")
-                        self.chain.stop_torrents(torrent_hash)
-                        handle_torrent_hashs.append(torrent_hash)
-
-                    logger.info(f"暂停转种后下载任务：{download} - {download_id}")
-                    # 删除转种后下载任务
-                    self.chain.stop_torrents(hashs=download_id, downloader=download)
-                    handle_torrent_hashs.append(download_id)
-            else:
-                # 未转种de情况
-                if delete_flag:
-                    # 删除源种子
-                    logger.info(f"删除源下载器下载任务：{download} - {download_id}")
-                    self.chain.remove_torrents(download_id)
-                else:
-                    # 暂停源种子
-                    logger.info(f"暂停源下载器下载任务：{download} - {download_id}")
-                    self.chain.stop_torrents(download_id)
-                handle_torrent_hashs.append(download_id)
-
-            # 处理辅种
-            handle_torrent_hashs = self.__del_seed(download_id=download_id,
-                                                   delete_flag=delete_flag,
-                                                   handle_torrent_hashs=handle_torrent_hashs)
-            # 处理合集
-            if str(type) == "电视剧":
-                handle_torrent_hashs = self.__del_collection(src=src,
-                                                             delete_flag=delete_flag,
-                                                             torrent_hash=torrent_hash,
-                                                             download_files=download_files,
-                                                             handle_torrent_hashs=handle_torrent_hashs)
-            return delete_flag, True, handle_torrent_hashs
-        except Exception as e:
-            logger.error(f"删种失败： {str(e)}")
-            return False, False, 0
-
-    def __del_collection(self, src: str, delete_flag: bool, torrent_hash: str, download_files: list,
-                         handle_torrent_hashs: list):
+        download = settings.DEFAULT_DOWNLOADER
+        download_id = torrent_hash
+        history_key = "%s-%s" % (download, torrent_hash)
+        transfer_history = get_transfer_history(history_key)
+        transfer_key = ""
+        # 如果有转种记录，则处理转种后的下载任务
+        if transfer_history and isinstance(transfer_history, dict):
+            logger.info(f"查询到 {history_key} 转种历史 {transfer_history}")
+            # 转种后未删除源种时，同步处理源种
+            if not transfer_history.get('delete_source'):
+                logger.info(f"{history_key} 转种时未删除源下载任务，同步处理源下载任务")
+                plan.add(download, torrent_hash, delete_flag)
+            download = transfer_history['to_download']
+            download_id = transfer_history['to_download_id']
+            if delete_flag:
+                transfer_key = history_key
+        plan.add(download, download_id, delete_flag)
+
+        # 处理辅种
+        plan.add_seeds(download_id, delete_flag, get_seed_history)
+
+        # 处理合集
+        for media_type, src in srcs:
+            if str(media_type) == "电视剧":
+                self.__add_collection(plan=plan,
+                                      src=src,
+                                      delete_flag=delete_flag,
+                                      torrent_hash=torrent_hash,
+                                      download_files=download_files,
+                                      hash_files=hash_files,
+                                      src_files=src_files,
+                                      get_seed_history=get_seed_history)
+        return transfer_key
+
+    def __add_collection(self, plan: TorrentDeletePlan, src: str, delete_flag: bool, torrent_hash: str,
+                         download_files: list, hash_files: Dict[str, list], src_files: Dict[str, list],
+                         get_seed_history: Callable[[str], Any]):
         """
-        处理合集
+        将合集种子及其辅种加入删除计划
         """
         try:
-            src_download_files = self._downloadhis.get_files_by_fullpath(fullpath=src)
-            if src_download_files:
-                for download_file in src_download_files:
-                    # src查询记录 判断download_hash是否不一致
-                    if download_file and download_file.download_hash and str(download_file.download_hash) != str(
-                            torrent_hash):
-                        # 查询新download_hash对应files数量
-                        hash_download_files = self._downloadhis.get_files_by_hash(
-                            download_hash=download_file.download_hash)
-                        # 新download_hash对应files数量 > 删种download_hash对应files数量 = 合集种子
-                        if hash_download_files \
-                                and len(hash_download_files) > len(download_files) \
-                                and hash_download_files[0].id > download_files[-1].id:
-                            # 查询未删除数
-                            no_del_cnt = 0
-                            for hash_download_file in hash_download_files:
-                                if hash_download_file and hash_download_file.state and int(
-                                        hash_download_file.state) == 1:
-                                    no_del_cnt += 1
-                            if no_del_cnt > 0:
-                                logger.info(f"合集种子 {download_file.download_hash} 文件未完全删除，执行暂停种子操作")
-                                delete_flag = False
-
-                            # 删除合集种子
-                            if delete_flag:
-                                self.chain.remove_torrents(hashs=download_file.download_hash,
-                                                           downloader=download_file.downloader)
-                                logger.info(f"删除合集种子 {download_file.downloader} {download_file.download_hash}")
-                            else:
-                                # 暂停合集种子
-                                self.chain.stop_torrents(hashs=download_file.download_hash,
-                                                         downloader=download_file.downloader)
-                                logger.info(f"暂停合集种子 {download_file.downloader} {download_file.download_hash}")
-                            # 已处理种子+1
-                            handle_torrent_hashs.append(download_file.download_hash)
-
-                            # 处理合集辅种
-                            handle_torrent_hashs = self.__del_seed(download_id=download_file.download_hash,
-                                                                   delete_flag=delete_flag,
-                                                                   handle_torrent_hashs=handle_torrent_hashs)
+            for download_file in src_files.get(src) or []:
+                # src查询记录 判断download_hash是否不一致
+                if not download_file or not download_file.download_hash \
+                        or str(download_file.download_hash) == str(torrent_hash):
+                    continue
+                # 新download_hash对应files
+                hash_download_files = hash_files.get(download_file.download_hash)
+                # 新download_hash对应files数量 > 删种download_hash对应files数量 = 合集种子
+                if hash_download_files \
+                        and len(hash_download_files) > len(download_files) \
+                        and hash_download_files[0].id > download_files[-1].id:
+                    collection_delete = delete_flag
+                    if self.__count_undeleted(hash_download_files) > 0:
+                        logger.info(f"合集种子 {download_file.download_hash} 文件未完全删除，执行暂停种子操作")
+                        collection_delete = False
+                    logger.info(f"{'删除' if collection_delete else '暂停'}合集种子 "
+                                f"{download_file.downloader} {download_file.download_hash}")
+                    plan.add(download_file.downloader, download_file.download_hash, collection_delete)
+                    # 处理合集辅种
+                    plan.add_seeds(download_file.download_hash, collection_delete, get_seed_history)
         except Exception as e:
-            logger.error(f"处理 {torrent_hash} 合集失败")
-            print(str(e))
-
-        return handle_torrent_hashs
+            logger.error(f"处理 {torrent_hash} 合集失败：{str(e)}")
 
-    def __del_seed(self, download_id, delete_flag, handle_torrent_hashs):
+    @db_query
+    def __get_files_by_hashes(self, hashes: List[str], db: Session = None) -> Dict[str, list]:
         """
-        删除辅种
+        批量查询种子的下载文件记录，种子hash -> 下载文件记录（按ID升序）
         """
-        # 查询是否有辅种记录
-        history_key = download_id
-        plugin_id = "IYUUAutoSeed"
-        seed_history = self.get_data(key=history_key,
-                                     plugin_id=plugin_id) or []
-        logger.info(f"查询到 {history_key} 辅种历史 {seed_history}")
-
-        # 有辅种记录则处理辅种
-        if seed_history and isinstance(seed_history, list):
-            for history in seed_history:
-                downloader = history.get("downloader")
-                torrents = history.get("torrents")
-                if not downloader or not torrents:
-                    return
-                if not isinstance(torrents, list):
-                    torrents = [torrents]
-
-                # 删除辅种历史
-                for torrent in torrents:
-                    handle_torrent_hashs.append(torrent)
-                    # 删除辅种
-                    if delete_flag:
-                        logger.info(f"删除辅种：{downloader} - {torrent}")
-                        self.chain.remove_torrents(hashs=torrent,
-                                                   downloader=downloader)
-                    # 暂停辅种
-                    else:
-                        self.chain.stop_torrents(hashs=torrent, downloader=downloader)
-                        logger.info(f"辅种：{downloader} - {torrent} 暂停")
+        hash_files = {download_hash: [] for download_hash in hashes}
+        for i in range(0, len(hashes), self._query_batch_size):
+            for download_file in db.query(DownloadFiles).filter(
+                    DownloadFiles.download_hash.in_(hashes[i:i + self._query_batch_size])
+            ).order_by(DownloadFiles.id).all():
+                hash_files[download_file.download_hash].append(download_file)
+        return hash_files
+
+    @db_query
+    def __get_files_by_fullpaths(self, fullpaths: List[str], db: Session = None) -> Dict[str, list]:
+        """
+        批量查询源文件的下载文件记录，源文件路径 -> 下载文件记录（按ID倒序）
+        """
+        fullpaths = list(dict.fromkeys(fullpaths))
+        path_files = {fullpath: [] for fullpath in fullpaths}
+        for i in range(0, len(fullpaths), self._query_batch_size):
+            for download_file in db.query(DownloadFiles).filter(
+                    DownloadFiles.fullpath.in_(fullpaths[i:i + self._query_batch_size])
+            ).order_by(DownloadFiles.id.desc()).all():
+                path_files[download_file.fullpath].append(download_file)
+        return path_files
+
+    def __get_data_cached(self, plugin_id: str) -> Callable[[str], Any]:
+        """
+        按key读取其他插件的数据，同一批次内相同key只读取一次
+        """
+        datas = {}
 
-                    # 处理辅种的辅种
-                    handle_torrent_hashs = self.__del_seed(download_id=torrent,
-                                                           delete_flag=delete_flag,
-                                                           handle_torrent_hashs=handle_torrent_hashs)
+        def __get(key: str) -> Any:
+            if key not in datas:
+                datas[key] = self.get_data(key=key, plugin_id=plugin_id)
+            return datas[key]
 
-            # 删除辅种历史
-            if delete_flag:
-                self.del_data(key=history_key,
-                              plugin_id=plugin_id)
-        return handle_torrent_hashs
+        return __get
 
     @staticmethod
-    def parse_emby_log(last_time):
+    def __count_undeleted(download_files: list) -> int:
         """
-        获取emby日志列表、解析emby日志
+        统计未删除的下载文件数
         """
+        return len([download_file for download_file in download_files
+                    if download_file and download_file.state and int(download_file.state) == 1])
 
-        def __parse_log(file_name: str, del_list: list):
-            """
-            解析emby日志
-            """
-            log_url = f"[HOST]System/Logs/{file_name}?api_key=[APIKEY]"
-            log_res = Emby().get_data(log_url)
-            if not log_res or log_res.status_code != 200:
-                logger.error("获取emby日志失败，请检查服务器配置")
-                return del_list
-
-            # 正则解析删除的媒体信息
-            pattern = r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}.\d{3}) Info App: Removing item from database, Type: (\w+), Name: (.*), Path: (.*), Id: (\d+)'
-            matches = re.findall(pattern, log_res.text)
-
-            # 循环获取媒体信息
-            for match in matches:
-                mtime = match[0]
-                # 排除已处理的媒体信息
-                if last_time and mtime < last_time:
-                    continue
-
-                mtype = match[1]
-                name = match[2]
-                path = match[3]
-
-                year = None
-                year_pattern = r'\(\d+\)'
-                year_match = re.search(year_pattern, path)
-                if year_match:
-                    year = year_match.group()[1:-1]
-
-                season = None
-                episode = None
-                if mtype == 'Episode' or mtype == 'Season':
-                    name_pattern = r"\/([\u4e00-\u9fa5]+)(?= \()"
-                    season_pattern = r"Season\s*(\d+)"
-                    episode_pattern = r"S\d+E(\d+)"
-                    name_match = re.search(name_pattern, path)
-                    season_match = re.search(season_pattern, path)
-                    episode_match = re.search(episode_pattern, path)
-
-                    if name_match:
-                        name = name_match.group(1)
-
-                    if season_match:
-                        season = season_match.group(1)
-                        if int(season) < 10:
-                            season = f'S0{season}'
-                        else:
-                            season = f'S{season}'
-                    else:
-                        season = None
-
-                    if episode_match:
-                        episode = episode_match.group(1)
-                        episode = f'E{episode}'
-                    else:
-                        episode = None
-
-                media = {
-                    "time": mtime,
-                    "type": mtype,
-                    "name": name,
-                    "year": year,
-                    "path": path,
-                    "season": season,
-                    "episode": episode,
-                }
-                logger.debug(f"解析到删除媒体：{json.dumps(media)}")
-                del_list.append(media)
-
-            return del_list
-
+    def parse_emby_log(self, last_time, follower: LogFollower = None) -> List[dict]:
+        """
+        获取emby日志列表、解析emby日志
+        :param last_time: 上次处理的删除时间
+        :param follower: 日志跟踪，传入时只解析上次读取之后新增的日志
+        """
         log_files = []
         try:
             # 获取所有emby日志
@@ -1431,100 +1365,41 @@ class MediaSyncDel(_PluginBase):
                 log_files_dict = json.loads(log_list_res.text)
                 for item in log_files_dict.get("Items"):
                     if str(item.get('Name')).startswith("embyserver"):
-                        log_files.append(str(item.get('Name')))
+                        log_files.append(item)
         except Exception as e:
             print(str(e))
 
         if not log_files:
-            log_files.append("embyserver.txt")
+            log_files.append({"Name": "embyserver.txt"})
 
         del_medias = []
         log_files.reverse()
         for log_file in log_files:
-            del_medias = __parse_log(file_name=log_file,
-                                     del_list=del_medias)
+            file_name = str(log_file.get("Name"))
+            log_text = self.__read_log(
+                file_name=file_name,
+                log_url=f"[HOST]System/Logs/{file_name}?api_key=[APIKEY]",
+                host=settings.EMBY_HOST,
+                apikey=settings.EMBY_API_KEY,
+                get_data=Emby().get_data,
+                follower=follower,
+                created=log_file.get("DateCreated"),
+                size=log_file.get("Size"))
+            if log_text is None:
+                logger.error("获取emby日志失败，请检查服务器配置")
+                continue
+            del_medias.extend(self.__parse_del_medias(log_text=log_text,
+                                                      pattern=_EMBY_DEL_PATTERN,
+                                                      last_time=last_time))
 
         return del_medias
 
-    @staticmethod
-    def parse_jellyfin_log(last_time: datetime):
+    def parse_jellyfin_log(self, last_time: datetime, follower: LogFollower = None) -> List[dict]:
         """
         获取jellyfin日志列表、解析jellyfin日志
+        :param last_time: 上次处理的删除时间
+        :param follower: 日志跟踪，传入时只解析上次读取之后新增的日志
         """
-
-        def __parse_log(file_name: str, del_list: list):
-            """
-            解析jellyfin日志
-            """
-            log_url = f"[HOST]System/Logs/Log?name={file_name}&api_key=[APIKEY]"
-            log_res = Jellyfin().get_data(log_url)
-            if not log_res or log_res.status_code != 200:
-                logger.error("获取jellyfin日志失败，请检查服务器配置")
-                return del_list
-
-            # 正则解析删除的媒体信息
-            pattern = r'\[(.*?)\].*?Removing item, Type: "(.*?)", Name: "(.*?)", Path: "(.*?)"'
-            matches = re.findall(pattern, log_res.text)
-
-            # 循环获取媒体信息
-            for match in matches:
-                mtime = match[0]
-                # 排除已处理的媒体信息
-                if last_time and mtime < last_time:
-                    continue
-
-                mtype = match[1]
-                name = match[2]
-                path = match[3]
-
-                year = None
-                year_pattern = r'\(\d+\)'
-                year_match = re.search(year_pattern, path)
-                if year_match:
-                    year = year_match.group()[1:-1]
-
-                season = None
-                episode = None
-                if mtype == 'Episode' or mtype == 'Season':
-                    name_pattern = r"\/([\u4e00-\u9fa5]+)(?= \()"
-                    season_pattern = r"Season\s*(\d+)"
-                    episode_pattern = r"S\d+E(\d+)"
-                    name_match = re.search(name_pattern, path)
-                    season_match = re.search(season_pattern, path)
-                    episode_match = re.search(episode_pattern, path)
-
-                    if name_match:
-                        name = name_match.group(1)
-
-                    if season_match:
-                        season = season_match.group(1)
-                        if int(season) < 10:
-                            season = f'S0{season}'
-                        else:
-                            season = f'S{season}'
-                    else:
-                        season = None
-
-                    if episode_match:
-                        episode = episode_match.group(1)
-                        episode = f'E{episode}'
-                    else:
-                        episode = None
-
-                media = {
-                    "time": mtime,
-                    "type": mtype,
-                    "name": name,
-                    "year": year,
-                    "path": path,
-                    "season": season,
-                    "episode": episode,
-                }
-                logger.debug(f"解析到删除媒体：{json.dumps(media)}")
-                del_list.append(media)
-
-            return del_list
-
         log_files = []
         try:
             # 获取所有jellyfin日志
@@ -1535,21 +1410,124 @@ class MediaSyncDel(_PluginBase):
                 log_files_dict = json.loads(log_list_res.text)
                 for item in log_files_dict:
                     if str(item.get('Name')).startswith("log_"):
-                        log_files.append(str(item.get('Name')))
+                        log_files.append(item)
         except Exception as e:
             print(str(e))
 
         if not log_files:
-            log_files.append("log_%s.log" % datetime.date.today().strftime("%Y%m%d"))
+            log_files.append({"Name": "log_%s.log" % datetime.date.today().strftime("%Y%m%d")})
 
         del_medias = []
         log_files.reverse()
         for log_file in log_files:
-            del_medias = __parse_log(file_name=log_file,
-                                     del_list=del_medias)
+            file_name = str(log_file.get("Name"))
+            log_text = self.__read_log(
+                file_name=file_name,
+                log_url=f"[HOST]System/Logs/Log?name={file_name}&api_key=[APIKEY]",
+                host=settings.JELLYFIN_HOST,
+                apikey=settings.JELLYFIN_API_KEY,
+                get_data=Jellyfin().get_data,
+                follower=follower,
+                created=log_file.get("DateCreated"),
+                size=log_file.get("Size"))
+            if log_text is None:
+                logger.error("获取jellyfin日志失败，请检查服务器配置")
+                continue
+            del_medias.extend(self.__parse_del_medias(log_text=log_text,
+                                                      pattern=_JELLYFIN_DEL_PATTERN,
+                                                      last_time=last_time))
 
         return del_medias
 
+    @staticmethod
+    def __read_log(file_name: str, log_url: str, host: str, apikey: str, get_data: Callable,
+                   follower: LogFollower = None, created: str = None, size: int = None) -> Optional[str]:
+        """
+        读取日志内容，能直接访问媒体服务器时按Range只请求新增的部分
+        :return: 日志内容，请求失败时返回None
+        """
+
+        def __fetch(offset: int):
+            if host and apikey and offset:
+                if not host.startswith("http"):
+                    server = f"http://{host}"
+                else:
+                    server = host
+                if not server.endswith("/"):
+                    server += "/"
+                return RequestUtils(headers={"Range": f"bytes={offset}-"}).get_res(
+                    url=log_url.replace("[HOST]", server).replace("[APIKEY]", apikey))
+            return get_data(log_url)
+
+        if not follower:
+            follower = LogFollower()
+        try:
+            size = int(size) if size is not None else None
+        except (TypeError, ValueError):
+            size = None
+        return follower.read(name=file_name, fetch=__fetch, created=created, size=size)
+
+    @staticmethod
+    def __parse_del_medias(log_text: str, pattern: re.Pattern, last_time) -> List[dict]:
+        """
+        解析日志中删除的媒体信息
+        :param log_text: 日志内容
+        :param pattern: 删除日志正则，分组依次为时间、类型、名称、路径
+        :param last_time: 上次处理的删除时间，之前的记录不再处理
+        """
+        del_list = []
+        if not log_text:
+            return del_list
+        for match in pattern.finditer(log_text):
+            mtime = match.group(1)
+            # 排除已处理的媒体信息
+            if last_time and mtime < last_time:
+                continue
+
+            mtype = match.group(2)
+            name = match.group(3)
+            path = match.group(4)
+
+            # 一次扫描路径，取各项第一次出现的值
+            path_infos = {}
+            for path_match in _MEDIA_PATH_PATTERN.finditer(path):
+                path_infos.setdefault(path_match.lastgroup, path_match.group(path_match.lastgroup))
+                if len(path_infos) == 4:
+                    break
+
+            year = path_infos.get("year")
+
+            season = None
+            episode = None
+            if mtype == 'Episode' or mtype == 'Season':
+                if path_infos.get("name"):
+                    name = path_infos.get("name")
+
+                season = path_infos.get("season")
+                if season:
+                    if int(season) < 10:
+                        season = f'S0{season}'
+                    else:
+                        season = f'S{season}'
+
+                episode = path_infos.get("episode")
+                if episode:
+                    episode = f'E{episode}'
+
+            media = {
+                "time": mtime,
+                "type": mtype,
+                "name": name,
+                "year": year,
+                "path": path,
+                "season": season,
+                "episode": episode,
+            }
+            logger.debug(f"解析到删除媒体：{json.dumps(media)}")
+            del_list.append(media)
+
+        return del_list
+
     def get_state(self):
         return self._enabled
 
@@ -1581,7 +1559,7 @@ class MediaSyncDel(_PluginBase):
         download_hash = self._downloadhis.get_hash_by_fullpath(src)
         if download_hash:
             download_history = self._downloadhis.get_by_hash(download_hash)
-            self.handle_torrent(type=download_history.type, src=src, torrent_hash=download_hash)
+            self.handle_torrents([(download_history.type, src, download_hash)])
         else:
             logger.warn(f"未查询到文件 {src} 对应的下载记录")
 
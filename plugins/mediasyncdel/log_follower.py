@@ -0,0 +1,76 @@
+from typing import Callable, Dict, Optional
+
+from requests import Response
+
+
+class LogFollower:
+    """
+    媒体服务器日志跟踪，记录每个日志文件的创建时间及已读取的字节位置，
+    每次只请求和解析新增的日志，日志文件被轮转或截断后从头读取
+    """
+
+    def __init__(self, states: Optional[Dict[str, dict]] = None):
+        # 文件名 -> {"created": 创建时间, "offset": 已读取的字节数}
+        self._states: Dict[str, dict] = dict(states or {})
+        # 本次读取后的状态
+        self._updates: Dict[str, dict] = {}
+
+    @property
+    def states(self) -> Dict[str, dict]:
+        """
+        本次读取后的状态，只保留本次读取过的日志文件
+        """
+        return dict(self._updates)
+
+    def __get_state(self, name: str, created: Optional[str]) -> Optional[dict]:
+        state = self._states.get(name)
+        if state and (not created or state.get("created") == created):
+            return state
+        if created:
+            # 日志轮转时文件会被重命名，按创建时间查找
+            for state in self._states.values():
+                if state.get("created") == created:
+                    return state
+        return None
+
+    def read(self, name: str, fetch: Callable[[int], Optional[Response]],
+             created: Optional[str] = None, size: Optional[int] = None) -> Optional[str]:
+        """
+        读取日志文件新增的完整行
+        :param name: 日志文件名
+        :param fetch: 从指定字节位置开始请求日志文件，位置为0时请求整个文件
+        :param created: 日志文件创建时间，用于识别日志轮转
+        :param size: 日志文件当前大小，未知时为None
+        :return: 新增的日志内容，请求失败时返回None
+        """
+        state = self.__get_state(name, created)
+        offset = (state.get("offset") or 0) if state else 0
+        if size is not None:
+            if offset > size:
+                # 文件比已读取的位置还小，说明已被轮转或截断
+                offset = 0
+            elif offset == size:
+                # 没有新增日志，不需要请求
+                self._updates[name] = {"created": created, "offset": offset}
+                return ""
+
+        res = fetch(offset)
+        if offset and res is not None and res.status_code == 416:
+            # 请求位置超出文件大小，重新请求整个文件判断
+            res = fetch(0)
+        if res is None or res.status_code not in (200, 206):
+            if state:
+                self._updates[name] = state
+            return None
+
+        content = res.content or b""
+        if res.status_code == 200 and offset:
+            # 服务器不支持Range请求时返回的是整个文件
+            if len(content) >= offset:
+                content = content[offset:]
+            else:
+                offset = 0
+        # 只处理完整的行，未写完的行下次再读取
+        end = content.rfind(b"\n") + 1
+        self._updates[name] = {"created": created, "offset": offset + end}
+        return content[:end].decode("utf-8", errors="replace")
@@ -0,0 +1,102 @@
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.log import logger
+
+
+class TorrentDeletePlan:
+    """
+    种子删除计划，先在内存中解析出受影响的全部种子（源种、转种、辅种及合集），
+    同一种子同时需要删除和暂停时以删除为准，最后按下载器分组，每个下载器只调用一次删除和暂停
+    """
+
+    def __init__(self):
+        # (下载器, 种子hash) -> 是否删除，False为暂停
+        self._torrents: Dict[Tuple[Optional[str], str], bool] = {}
+        # 需要删除的辅种历史
+        self._seed_keys: List[str] = []
+
+    def __len__(self):
+        return len(self._torrents)
+
+    @property
+    def seed_keys(self) -> List[str]:
+        """
+        已删除种子的辅种历史key
+        """
+        return list(dict.fromkeys(self._seed_keys))
+
+    def add(self, downloader: Optional[str], torrent_hash: str, delete: bool) -> bool:
+        """
+        添加种子，已添加的暂停种子可升级为删除
+        :return: 是否为新添加或升级为删除的种子
+        """
+        if not torrent_hash:
+            return False
+        key = (downloader, torrent_hash)
+        current = self._torrents.get(key)
+        if current is None or (delete and not current):
+            self._torrents[key] = bool(delete)
+            return True
+        return False
+
+    def add_seeds(self, torrent_hash: str, delete: bool, get_history: Callable[[str], Any]):
+        """
+        添加种子的辅种以及辅种的辅种
+        :param torrent_hash: 种子hash
+        :param delete: 是否删除，False为暂停
+        :param get_history: 按种子hash获取辅种历史的方法，返回[{"downloader": 下载器, "torrents": [辅种hash]}]
+        """
+        queue = deque([torrent_hash])
+        visited = set()
+        while queue:
+            current = queue.popleft()
+            if current in visited:
+                continue
+            visited.add(current)
+            histories = get_history(current)
+            if not histories or not isinstance(histories, list):
+                continue
+            logger.info(f"查询到 {current} 辅种历史 {histories}")
+            for history in histories:
+                if not isinstance(history, dict):
+                    continue
+                downloader = history.get("downloader")
+                torrents = history.get("torrents")
+                if not downloader or not torrents:
+                    continue
+                if not isinstance(torrents, list):
+                    torrents = [torrents]
+                for torrent in torrents:
+                    self.add(downloader, torrent, delete)
+                    queue.append(torrent)
+            if delete:
+                self._seed_keys.append(current)
+
+    def execute(self, remove: Callable, stop: Callable) -> Tuple[List[str], List[str], int]:
+        """
+        按下载器分组删除或暂停种子
+        :param remove: 删除种子方法，参数为hashs及downloader
+        :param stop: 暂停种子方法，参数为hashs及downloader
+        :return: 删除的种子hash、暂停的种子hash、处理失败的种子数
+        """
+        groups: Dict[Tuple[bool, Optional[str]], List[str]] = {}
+        for (downloader, torrent_hash), delete in self._torrents.items():
+            groups.setdefault((delete, downloader), []).append(torrent_hash)
+
+        del_hashs, stop_hashs, error_cnt = [], [], 0
+        # 先删除再暂停
+        for (delete, downloader), hashs in sorted(groups.items(), key=lambda item: not item[0][0]):
+            try:
+                if delete:
+                    logger.info(f"删除下载器 {downloader} 中的 {len(hashs)} 个种子：{hashs}")
+                    remove(hashs=hashs, downloader=downloader)
+                    del_hashs.extend(hashs)
+                else:
+                    logger.info(f"暂停下载器 {downloader} 中的 {len(hashs)} 个种子：{hashs}")
+                    stop(hashs=hashs, downloader=downloader)
+                    stop_hashs.extend(hashs)
+            except Exception as e:
+                logger.error(f"{'删除' if delete else '暂停'}下载器 {downloader} 种子失败：{str(e)}")
+                error_cnt += len(hashs)
+        return del_hashs, stop_hashs, error_cnt
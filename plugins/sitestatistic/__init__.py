@@ -22,7 +22,8 @@ from app.helper.module import ModuleHelper
 from app.helper.sites import SitesHelper
 from app.log import logger
 from app.plugins import _PluginBase
-from app.plugins.sitestatistic.siteuserinfo import ISiteUserInfo
+from app.plugins.sitestatistic.siteuserinfo import ISiteUserInfo, SiteSchemaIndex
+from app.plugins.sitestatistic.statistic_store import SiteStatisticStore
 from app.schemas.types import EventType, NotificationType
 from app.utils.http import RequestUtils
 from app.utils.object import ObjectUtils
@@ -61,6 +62,12 @@ class SiteStatistic(_PluginBase):
     _last_update_time: Optional[datetime] = None
     _sites_data: dict = {}
     _site_schema: List[ISiteUserInfo] = None
+    _store: Optional[SiteStatisticStore] = None
+    _schema_index: Optional[SiteSchemaIndex] = None
+    # 站点域名 -> 已识别的站点模型
+    _domain_schemas: Dict[str, Any] = {}
+    # 站点名称 -> 上次获取的做种信息
+    _seeding_caches: Dict[str, dict] = {}
 
     # 配置属性
     _enabled: bool = False
@@ -73,6 +80,7 @@ class SiteStatistic(_PluginBase):
     _statistic_type: str = None
     _statistic_sites: list = []
     _dashboard_type: str = "today"
+    _seeding_incremental: bool = True
 
     def init_plugin(self, config: dict = None):
         self.sites = SitesHelper()
@@ -80,6 +88,11 @@ class SiteStatistic(_PluginBase):
         # 停止现有任务
         self.stop_service()
 
+        # 站点数据存储
+        if not self._store:
+            self._store = SiteStatisticStore(db_path=self.get_data_path() / "site_statistic.db")
+            self.__migrate_data()
+
         # 配置
         if config:
             self._enabled = config.get("enabled")
@@ -92,6 +105,7 @@ class SiteStatistic(_PluginBase):
             self._statistic_type = config.get("statistic_type") or "all"
             self._statistic_sites = config.get("statistic_sites") or []
             self._dashboard_type = config.get("dashboard_type") or "today"
+            self._seeding_incremental = config.get("seeding_incremental", True)
 
             # 过滤掉已删除的站点
             all_sites = [site.id for site in self.siteoper.list_order_by_pri()] + [site.get("id") for site in
@@ -105,6 +119,8 @@ class SiteStatistic(_PluginBase):
                                                   filter_func=lambda _, obj: hasattr(obj, 'schema'))
 
             self._site_schema.sort(key=lambda x: x.order)
+            self._schema_index = SiteSchemaIndex(self._site_schema)
+            self._domain_schemas = {}
             # 站点上一次更新时间
             self._last_update_time = None
             # 站点数据
@@ -410,6 +426,23 @@ class SiteStatistic(_PluginBase):
                                     }
                                 ]
                             },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VSwitch',
+                                        'props': {
+                                            'model': 'seeding_incremental',
+                                            'label': '增量获取做种',
+                                            'hint': '做种数及做种体积未变化时不再重复获取做种页面'
+                                        }
+                                    }
+                                ]
+                            },
                         ]
                     }
                 ]
@@ -424,33 +457,45 @@ class SiteStatistic(_PluginBase):
             "remove_failed": False,
             "statistic_type": "all",
             "statistic_sites": [],
-            "dashboard_type": 'today'
+            "dashboard_type": 'today',
+            "seeding_incremental": True
         }
 
-    def __get_data(self) -> Tuple[str, dict, dict]:
+    def __migrate_data(self):
         """
-        获取今天的日期、今天的站点数据、昨天的站点数据
+        将按天保存的插件数据导入站点数据存储，仅在存储为空时执行一次
         """
-        # 最近一天的签到数据
-        stattistic_data: Dict[str, Dict[str, Any]] = {}
-        # 昨天数据
-        yesterday_sites_data: Dict[str, Dict[str, Any]] = {}
-        # 获取最近所有数据
+        if not self._store.is_empty():
+            return
         data_list: List[PluginData] = self.get_data(key=None)
         if not data_list:
+            return
+        days = {}
+        for data in data_list:
+            # 取key符合日期格式的数据
+            if not re.match(r"\d{4}-\d{2}-\d{2}", data.key) or not ObjectUtils.is_obj(data.value):
+                continue
+            value = json.loads(data.value) if isinstance(data.value, str) else data.value
+            if isinstance(value, dict):
+                days[data.key] = value
+        if days:
+            self._store.save_days(days)
+            logger.info(f"已导入 {len(days)} 天的站点数据")
+
+    def __get_data(self) -> Tuple[str, dict, dict]:
+        """
+        获取今天的日期、今天的站点数据、昨天的站点数据
+        """
+        # 最近两天的日期
+        dates = self._store.get_dates(limit=2)
+        if not dates:
             return "", {}, {}
-        # 取key符合日期格式的数据
-        data_list = [data for data in data_list if re.match(r"\d{4}-\d{2}-\d{2}", data.key)]
-        # 按日期倒序排序
-        data_list.sort(key=lambda x: x.key, reverse=True)
         # 今天的日期
-        today = data_list[0].key
-        # 数据按时间降序排序
-        datas = [json.loads(data.value) for data in data_list if ObjectUtils.is_obj(data.value)]
-        if len(data_list) > 0:
-            stattistic_data = datas[0]
-        if len(data_list) > 1:
-            yesterday_sites_data = datas[1]
+        today = dates[0]
+        # 最近一天的数据
+        stattistic_data = self._store.get_day(today)
+        # 昨天数据
+        yesterday_sites_data = self._store.get_day(dates[1]) if len(dates) > 1 else {}
 
         # 数据按时间降序排序
         stattistic_data = dict(sorted(stattistic_data.items(),
@@ -957,6 +1002,54 @@ class SiteStatistic(_PluginBase):
             dashboard='all'
         )
 
+        # 近一年总上传下载量趋势，最多60个点
+        trends = self._store.get_totals(start_date=(datetime.now() - timedelta(days=365)).strftime('%Y-%m-%d'),
+                                        end_date=today,
+                                        max_points=60)
+        trend_elements = [
+            {
+                'component': 'VCol',
+                'props': {
+                    'cols': 12
+                },
+                'content': [
+                    {
+                        'component': 'VApexChart',
+                        'props': {
+                            'height': 300,
+                            'options': {
+                                'chart': {
+                                    'type': 'line',
+                                    'toolbar': {
+                                        'show': False
+                                    }
+                                },
+                                'title': {
+                                    'text': '总上传下载量趋势（GB）'
+                                },
+                                'xaxis': {
+                                    'categories': [trend[0] for trend in trends]
+                                },
+                                'noData': {
+                                    'text': '暂无数据'
+                                }
+                            },
+                            'series': [
+                                {
+                                    'name': '总上传量',
+                                    'data': [round(trend[1] / 1024 / 1024 / 1024, 1) for trend in trends]
+                                },
+                                {
+                                    'name': '总下载量',
+                                    'data': [round(trend[2] / 1024 / 1024 / 1024, 1) for trend in trends]
+                                }
+                            ]
+                        }
+                    }
+                ]
+            }
+        ] if len(trends) > 1 else []
+
         # 站点数据明细
         site_trs = [
             {
@@ -1018,7 +1111,7 @@ class SiteStatistic(_PluginBase):
         return [
             {
                 'component': 'VRow',
-                'content': site_totals + [
+                'content': site_totals + trend_elements + [
                     # 各站点数据明细
                     {
                         'component': 'VCol',
@@ -1125,14 +1218,17 @@ class SiteStatistic(_PluginBase):
         except Exception as e:
             logger.error("退出插件失败：%s" % str(e))
 
-    def __build_class(self, html_text: str) -> Any:
-        for site_schema in self._site_schema:
-            try:
-                if site_schema.match(html_text):
-                    return site_schema
-            except Exception as e:
-                logger.error(f"站点匹配失败 {str(e)}")
-        return None
+    def __build_class(self, html_text: str, domain: str = None) -> Any:
+        """
+        识别站点模型，已识别过的站点直接使用上次的结果
+        """
+        site_schema = self._domain_schemas.get(domain) if domain else None
+        if site_schema:
+            return site_schema
+        site_schema = self._schema_index.match(html_text)
+        if site_schema and domain:
+            self._domain_schemas[domain] = site_schema
+        return site_schema
 
     def build(self, site_info: CommentedMap) -> Optional[ISiteUserInfo]:
         """
@@ -1227,7 +1323,7 @@ class SiteStatistic(_PluginBase):
                     return None
             # 解析站点类型
             if html_text:
-                site_schema = self.__build_class(html_text)
+                site_schema = self.__build_class(html_text, StringUtils.get_url_domain(url))
                 if not site_schema:
                     logger.error(f"站点 {site_name} 无法识别站点类型，可能是由于插件代码不全，请尝试强制重装插件以确保代码完整")
                     return None
@@ -1278,19 +1374,31 @@ class SiteStatistic(_PluginBase):
         if not site_url:
             return None
         unread_msg_notify = True
+        site_domain = StringUtils.get_url_domain(site_url)
         try:
             site_user_info: ISiteUserInfo = self.build(site_info=site_info)
             if site_user_info:
                 logger.debug(f"站点 {site_name} 开始以 {site_user_info.site_schema()} 模型解析")
+                if self._seeding_incremental:
+                    site_user_info.use_seeding_cache(self._seeding_caches.get(site_name))
                 # 开始解析
                 site_user_info.parse()
                 logger.debug(f"站点 {site_name} 解析完成")
 
                 # 获取不到数据时，仅返回错误信息，不做历史数据更新
                 if site_user_info.err_msg:
+                    # 站点可能已更换模型，下次重新识别
+                    self._domain_schemas.pop(site_domain, None)
                     self._sites_data.update({site_name: {"err_msg": site_user_info.err_msg}})
                     return None
 
+                # 记录做种信息，下次增量获取
+                seeding_cache = site_user_info.get_seeding_cache()
+                if seeding_cache:
+                    self._seeding_caches[site_name] = seeding_cache
+                else:
+                    self._seeding_caches.pop(site_name, None)
+
                 if self._sitemsg:
                     # 发送通知，存在未读消息
                     self.__notify_unread_msg(site_name, site_user_info, unread_msg_notify)
@@ -1324,6 +1432,7 @@ class SiteStatistic(_PluginBase):
 
         except Exception as e:
             import traceback
+            self._domain_schemas.pop(site_domain, None)
             logger.error(f"站点 {site_name} 获取流量数据失败：{str(e)}")
             logger.error(traceback.format_exc())
         return None
@@ -1391,7 +1500,7 @@ class SiteStatistic(_PluginBase):
             today_date = datetime.now().strftime('%Y-%m-%d')
             if self._statistic_type == "add" or not self._remove_failed:
                 if last_update_time := self.get_data("last_update_time"):
-                    yesterday_sites_data = self.get_data(last_update_time) or {}
+                    yesterday_sites_data = self._store.get_day(last_update_time)
 
             if not self._remove_failed and yesterday_sites_data:
                 site_names = [site.get("name") for site in refresh_sites]
@@ -1443,7 +1552,7 @@ class SiteStatistic(_PluginBase):
                                       title="站点数据统计", text="\n".join(sorted_messages))
 
             # 保存数据
-            self.save_data(today_date, self._sites_data)
+            self._store.save(today_date, self._sites_data)
 
             # 更新时间
             self.save_data("last_update_time", today_date)
@@ -1472,7 +1581,8 @@ class SiteStatistic(_PluginBase):
             "remove_failed": self._remove_failed,
             "statistic_type": self._statistic_type,
             "statistic_sites": self._statistic_sites,
-            "dashboard_type": self._dashboard_type
+            "dashboard_type": self._dashboard_type,
+            "seeding_incremental": self._seeding_incremental
         })
 
     @eventmanager.register(EventType.SiteDeleted)
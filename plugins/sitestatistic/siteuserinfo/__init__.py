@@ -1,11 +1,15 @@
 # -*- coding: utf-8 -*-
 import json
 import re
+import threading
 from abc import ABCMeta, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple, Type
 from urllib.parse import urljoin, urlsplit
 
+from lxml import etree
 from requests import Session
 
 from app.core.config import settings
@@ -16,6 +20,76 @@ from app.utils.site import SiteUtils
 
 SITE_BASE_ORDER = 1000
 
+# 页面中的干扰部分
+_PX_PATTERN = re.compile(r"\d+px")
+_ANCHOR_PATTERN = re.compile(r"#\d+")
+
+
+class HtmlDocumentCache:
+    """
+    页面解析缓存，同一页面文本只预处理及解析一次，按最近使用淘汰
+    """
+
+    def __init__(self, maxsize: int = 4):
+        self._maxsize = maxsize
+        self._lock = threading.Lock()
+        self._documents: OrderedDict = OrderedDict()
+        self._prepared: OrderedDict = OrderedDict()
+
+    @staticmethod
+    def __get(cache: OrderedDict, key: str):
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+
+    def __put(self, cache: OrderedDict, key: str, value: Any):
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > self._maxsize:
+            cache.popitem(last=False)
+
+    def peek(self, html_text: str) -> Optional[Any]:
+        """
+        获取已解析的页面，不存在时返回None
+        """
+        with self._lock:
+            document = self._documents.get(html_text)
+        return document[0] if document else None
+
+    def get(self, html_text: str) -> Optional[Any]:
+        """
+        获取解析后的页面DOM，解析失败时返回None
+        """
+        if not html_text:
+            return None
+        with self._lock:
+            # 以元组保存，解析结果为None时同样可以命中缓存
+            document = self.__get(self._documents, html_text)
+        if document is None:
+            document = (etree.HTML(html_text),)
+            with self._lock:
+                self.__put(self._documents, html_text, document)
+        return document[0]
+
+    def prepare(self, html_text: str) -> str:
+        """
+        处理掉HTML中的干扰部分
+        """
+        if not html_text:
+            return html_text
+        with self._lock:
+            prepared = self.__get(self._prepared, html_text)
+        if prepared is None:
+            prepared = _ANCHOR_PATTERN.sub("", _PX_PATTERN.sub("", html_text))
+            with self._lock:
+                self.__put(self._prepared, html_text, prepared)
+        return prepared
+
+
+# 站点匹配时共享的首页解析缓存
+_MATCH_DOCUMENTS = HtmlDocumentCache(maxsize=16)
+
 
 # 站点框架
 class SiteSchema(Enum):
@@ -43,6 +117,10 @@ class ISiteUserInfo(metaclass=ABCMeta):
     order = SITE_BASE_ORDER
     # 请求模式 cookie/apikey
     request_mode = "cookie"
+    # 站点特征字符串，首页包含其中任一字符串时才调用match判断，为空时总是调用match
+    fingerprints: List[str] = []
+    # 同一站点同时获取做种页面的最大并发数
+    _seeding_page_threads = 3
 
     def __init__(self, site_name: str,
                  url: str,
@@ -129,6 +207,11 @@ class ISiteUserInfo(metaclass=ABCMeta):
 
         self._emulate = emulate
         self._proxy = proxy
+        # 页面解析缓存，每次刷新同一页面只解析一次
+        self._documents = HtmlDocumentCache()
+        # 上次及本次获取的做种信息，用于增量获取
+        self._last_seeding: Optional[dict] = None
+        self._seeding_cache: Optional[dict] = None
 
     def site_schema(self) -> SiteSchema:
         """
@@ -146,6 +229,26 @@ class ISiteUserInfo(metaclass=ABCMeta):
         """
         pass
 
+    @staticmethod
+    def _match_html(html_text: str) -> Optional[Any]:
+        """
+        站点匹配时解析首页，各解析模型共享同一份解析结果
+        """
+        return _MATCH_DOCUMENTS.get(html_text)
+
+    def _get_html(self, html_text: str) -> Optional[Any]:
+        """
+        获取页面DOM，同一页面只解析一次，首页优先使用站点匹配时的解析结果
+        """
+        if not html_text:
+            return None
+        html = self._documents.peek(html_text)
+        if html is None:
+            html = _MATCH_DOCUMENTS.peek(html_text)
+        if html is None:
+            html = self._documents.get(html_text)
+        return html
+
     def parse(self):
         """
         解析站点信息
@@ -187,10 +290,47 @@ class ISiteUserInfo(metaclass=ABCMeta):
                     headers=self._user_traffic_headers
                 )
             )
-        # 解析用户做种信息
-        self._parse_seeding_pages()
+        # 解析用户做种信息，做种数及做种体积与上次一致时直接使用上次的做种信息
+        seeding_summary = (self.seeding, self.seeding_size)
+        if not self.__reuse_seeding_cache(seeding_summary):
+            self._parse_seeding_pages()
+        if all(seeding_summary):
+            self._seeding_cache = {
+                "summary": list(seeding_summary),
+                "seeding": self.seeding,
+                "seeding_size": self.seeding_size,
+                "seeding_info": self.seeding_info
+            }
         self.seeding_info = json.dumps(self.seeding_info)
 
+    def use_seeding_cache(self, seeding_cache: Optional[dict]):
+        """
+        设置上次获取的做种信息，开启增量获取
+        :param seeding_cache: 上次解析后get_seeding_cache的返回值
+        """
+        self._last_seeding = seeding_cache
+
+    def get_seeding_cache(self) -> Optional[dict]:
+        """
+        获取本次的做种信息，站点页面上没有做种数及做种体积汇总时返回None
+        """
+        return self._seeding_cache
+
+    def __reuse_seeding_cache(self, seeding_summary: Tuple[int, int]) -> bool:
+        """
+        做种数及做种体积汇总与上次一致时，使用上次的做种信息，不再获取做种页面
+        """
+        last_seeding = self._last_seeding
+        if not last_seeding or not all(seeding_summary):
+            return False
+        if tuple(last_seeding.get("summary") or ()) != seeding_summary:
+            return False
+        self.seeding = last_seeding.get("seeding") or 0
+        self.seeding_size = last_seeding.get("seeding_size") or 0
+        self.seeding_info = list(last_seeding.get("seeding_info") or [])
+        logger.debug(f"{self.site_name} 做种数及做种体积未变化，使用上次获取的做种信息")
+        return True
+
     def _pase_unread_msgs(self):
         """
         解析所有未读消息标题和内容
@@ -238,34 +378,81 @@ class ISiteUserInfo(metaclass=ABCMeta):
 
     def _parse_seeding_pages(self):
         """
-        解析做种页面
+        解析做种页面，能从页面中得到总页数时并发获取其余页面
         """
         if self._torrent_seeding_page:
             # 第一页
-            next_page = self._parse_user_torrent_seeding_info(
-                self._get_page_content(
-                    url=urljoin(self._base_url, self._torrent_seeding_page),
-                    params=self._torrent_seeding_params,
-                    headers=self._torrent_seeding_headers
-                )
+            html_text = self._get_page_content(
+                url=urljoin(self._base_url, self._torrent_seeding_page),
+                params=self._torrent_seeding_params,
+                headers=self._torrent_seeding_headers
             )
+            next_page = self._parse_user_torrent_seeding_info(html_text)
 
             # 其他页处理
+            fetched_urls = set()
             while next_page is not None and next_page is not False:
-                next_page = self._parse_user_torrent_seeding_info(
-                    self._get_page_content(
-                        url=urljoin(urljoin(self._base_url, self._torrent_seeding_page), next_page),
-                        params=self._torrent_seeding_params,
-                        headers=self._torrent_seeding_headers
-                    ),
-                    multi_page=True)
-
-    @staticmethod
-    def _prepare_html_text(html_text):
-        """
-        处理掉HTML中的干扰部分
-        """
-        return re.sub(r"#\d+", "", re.sub(r"\d+px", "", html_text))
+                page_url = urljoin(urljoin(self._base_url, self._torrent_seeding_page), next_page)
+                if page_url in fetched_urls:
+                    break
+                next_pages = self._parse_seeding_next_pages(html_text, next_page)
+                if next_pages and len(next_pages) > 1:
+                    # 后续分页范围从本批最后一页的分页链接中解析
+                    html_text, next_page = self.__parse_seeding_pages_concurrently(
+                        [urljoin(urljoin(self._base_url, self._torrent_seeding_page), page)
+                         for page in next_pages],
+                        fetched_urls)
+                    continue
+                fetched_urls.add(page_url)
+                html_text = self._get_page_content(
+                    url=page_url,
+                    params=self._torrent_seeding_params,
+                    headers=self._torrent_seeding_headers
+                )
+                next_page = self._parse_user_torrent_seeding_info(html_text, multi_page=True)
+
+    def __parse_seeding_pages_concurrently(self, page_urls: List[str],
+                                           fetched_urls: set) -> Tuple[Optional[str], Optional[str]]:
+        """
+        并发获取做种页面，按页码顺序解析，遇到没有做种数据的页面时不再解析后续页面
+        :param page_urls: 做种页面地址
+        :param fetched_urls: 已获取的页面地址
+        :return: 最后解析的页面内容及其下页地址
+        """
+        last_html_text, next_page = None, None
+        executor = ThreadPoolExecutor(max_workers=min(max(int(self._seeding_page_threads or 1), 1), len(page_urls)))
+        try:
+            contents = executor.map(lambda url: self._get_page_content(
+                url=url,
+                params=self._torrent_seeding_params,
+                headers=self._torrent_seeding_headers
+            ), page_urls)
+            for page_url, html_text in zip(page_urls, contents):
+                fetched_urls.add(page_url)
+                last_html_text = html_text
+                seeding_count = len(self.seeding_info)
+                next_page = self._parse_user_torrent_seeding_info(html_text, multi_page=True)
+                if len(self.seeding_info) == seeding_count:
+                    logger.debug(f"{self.site_name} 做种页面 {page_url} 没有做种数据，停止获取后续页面")
+                    return last_html_text, None
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        return last_html_text, next_page
+
+    def _parse_seeding_next_pages(self, html_text: str, next_page: str) -> Optional[List[str]]:
+        """
+        从当前做种页面中解析出其余全部页面的地址，用于并发获取，不支持时返回None逐页获取
+        :param html_text: 当前做种页面
+        :param next_page: 下页地址
+        :return: 从下页到最后一页的地址
+        """
+        return None
+
+    def _prepare_html_text(self, html_text):
+        """
+        处理掉HTML中的干扰部分，同一页面只处理一次
+        """
+        return self._documents.prepare(html_text)
 
     @abstractmethod
     def _parse_message_unread_links(self, html_text: str, msg_links: list) -> Optional[str]:
@@ -426,3 +613,47 @@ class ISiteUserInfo(metaclass=ABCMeta):
             if isinstance(getattr(self, attr), SiteSchema)
             else getattr(self, attr) for attr in attributes
         }
+
+
+class SiteSchemaIndex:
+    """
+    站点模型特征索引，将所有模型的特征字符串编译为一个正则，
+    扫描一遍首页即可得到可能匹配的模型，再按顺序调用match确认
+    """
+
+    def __init__(self, site_schemas: List[Type[ISiteUserInfo]]):
+        self._site_schemas = sorted(site_schemas, key=lambda x: x.order)
+        # 特征字符串 -> 模型
+        self._markers: Dict[str, List[Type[ISiteUserInfo]]] = {}
+        for site_schema in self._site_schemas:
+            for marker in site_schema.fingerprints or []:
+                self._markers.setdefault(marker, []).append(site_schema)
+        if self._markers:
+            # 使用前瞻匹配，特征字符串相互重叠时也能全部找到
+            markers = sorted(self._markers, key=len, reverse=True)
+            self._pattern = re.compile("(?=(%s))" % "|".join(map(re.escape, markers)))
+        else:
+            self._pattern = None
+
+    def candidates(self, html_text: str) -> List[Type[ISiteUserInfo]]:
+        """
+        扫描首页，按判断顺序返回可能匹配的模型
+        """
+        matched = set()
+        if self._pattern and html_text:
+            for marker in set(self._pattern.findall(html_text)):
+                matched.update(self._markers.get(marker, []))
+        return [site_schema for site_schema in self._site_schemas
+                if not site_schema.fingerprints or site_schema in matched]
+
+    def match(self, html_text: str) -> Optional[Type[ISiteUserInfo]]:
+        """
+        识别首页对应的站点模型
+        """
+        for site_schema in self.candidates(html_text):
+            try:
+                if site_schema.match(html_text):
+                    return site_schema
+            except Exception as e:
+                logger.error(f"站点匹配失败 {str(e)}")
+        return None
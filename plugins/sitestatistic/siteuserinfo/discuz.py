@@ -2,8 +2,6 @@
 import re
 from typing import Optional
 
-from lxml import etree
-
 from app.plugins.sitestatistic.siteuserinfo import ISiteUserInfo, SITE_BASE_ORDER, SiteSchema
 from app.utils.string import StringUtils
 
@@ -11,10 +9,11 @@ from app.utils.string import StringUtils
 class DiscuzUserInfo(ISiteUserInfo):
     schema = SiteSchema.DiscuzX
     order = SITE_BASE_ORDER + 10
+    fingerprints = ["Discuz!"]
 
     @classmethod
     def match(cls, html_text: str) -> bool:
-        html = etree.HTML(html_text)
+        html = cls._match_html(html_text)
         if not html:
             return False
 
@@ -23,7 +22,7 @@ class DiscuzUserInfo(ISiteUserInfo):
 
     def _parse_user_base_info(self, html_text: str):
         html_text = self._prepare_html_text(html_text)
-        html = etree.HTML(html_text)
+        html = self._get_html(html_text)
 
         user_info = html.xpath('//a[contains(@href, "&uid=")]')
         if user_info:
@@ -44,7 +43,7 @@ class DiscuzUserInfo(ISiteUserInfo):
         :param html_text:
         :return:
         """
-        html = etree.HTML(html_text)
+        html = self._get_html(html_text)
         if not html:
             return None
 
@@ -87,7 +86,7 @@ class DiscuzUserInfo(ISiteUserInfo):
         :param multi_page: 是否多页数据
         :return: 下页地址
         """
-        html = etree.HTML(html_text)
+        html = self._get_html(html_text)
         if not html:
             return None
 
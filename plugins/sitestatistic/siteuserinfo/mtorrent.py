@@ -3,8 +3,6 @@ import json
 from typing import Optional, Tuple
 from urllib.parse import urljoin
 
-from lxml import etree
-
 from app.log import logger
 from app.plugins.sitestatistic.siteuserinfo import ISiteUserInfo, SITE_BASE_ORDER, SiteSchema
 from app.utils.string import StringUtils
@@ -13,6 +11,7 @@ from app.utils.string import StringUtils
 class MTorrentSiteUserInfo(ISiteUserInfo):
     schema = SiteSchema.MTorrent
     order = SITE_BASE_ORDER + 60
+    fingerprints = ["M-Team"]
     request_mode = "apikey"
 
     # 用户级别字典
@@ -39,7 +38,7 @@ class MTorrentSiteUserInfo(ISiteUserInfo):
 
     @classmethod
     def match(cls, html_text: str) -> bool:
-        html = etree.HTML(html_text)
+        html = cls._match_html(html_text)
         if not html:
             return False
         if html.xpath("//title/text()") and "M-Team" in html.xpath("//title/text()")[0]:
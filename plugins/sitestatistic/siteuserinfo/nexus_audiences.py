@@ -8,6 +8,7 @@ from app.plugins.sitestatistic.siteuserinfo.nexus_php import NexusPhpSiteUserInf
 class NexusAudiencesSiteUserInfo(NexusPhpSiteUserInfo):
     schema = SiteSchema.NexusAudiences
     order = SITE_BASE_ORDER + 5
+    fingerprints = ["audiences.me"]
 
     @classmethod
     def match(cls, html_text: str) -> bool:
@@ -1,8 +1,6 @@
 # -*- coding: utf-8 -*-
 import re
 
-from lxml import etree
-
 from app.plugins.sitestatistic.siteuserinfo import SITE_BASE_ORDER, SiteSchema
 from app.plugins.sitestatistic.siteuserinfo.nexus_php import NexusPhpSiteUserInfo
 from app.utils.string import StringUtils
@@ -11,6 +9,7 @@ from app.utils.string import StringUtils
 class NexusHhanclubSiteUserInfo(NexusPhpSiteUserInfo):
     schema = SiteSchema.NexusHhanclub
     order = SITE_BASE_ORDER + 20
+    fingerprints = ["hhanclub.top"]
 
     @classmethod
     def match(cls, html_text: str) -> bool:
@@ -20,7 +19,7 @@ class NexusHhanclubSiteUserInfo(NexusPhpSiteUserInfo):
         super()._parse_user_traffic_info(html_text)
 
         html_text = self._prepare_html_text(html_text)
-        html = etree.HTML(html_text)
+        html = self._get_html(html_text)
 
         # 上传、下载、分享率
         upload_match = re.search(r"[_<>/a-zA-Z-=\"'\s#;]+([\d,.\s]+[KMGTPI]*B)",
@@ -46,7 +45,7 @@ class NexusHhanclubSiteUserInfo(NexusPhpSiteUserInfo):
         """
         super()._parse_user_detail_info(html_text)
 
-        html = etree.HTML(html_text)
+        html = self._get_html(html_text)
         if not html:
             return
         # 加入时间
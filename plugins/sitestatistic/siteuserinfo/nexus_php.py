@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 import re
-from typing import Optional
+from typing import List, Optional
+from urllib.parse import urlsplit
 
 from lxml import etree
 
@@ -9,6 +10,65 @@ from app.plugins.sitestatistic.siteuserinfo import ISiteUserInfo, SITE_BASE_ORDE
 from app.utils.string import StringUtils
 
 
+# 预编译的XPath表达式
+_XPATH_MESSAGE_LINK = etree.XPath('//a[@href="messages.php"]/..')
+_XPATH_MESSAGE_LINK_CONTAINS = etree.XPath('//a[contains(@href, "messages.php")]/..')
+_XPATH_USERNAME_STRONG = etree.XPath('//a[contains(@href, "userdetails")]//strong//text()')
+_XPATH_BONUS_LINK = etree.XPath('//a[contains(@href,"mybonus")]/text()')
+_XPATH_UCOIN_GOLD = etree.XPath('//span[@class = "ucoin-symbol ucoin-gold"]//text()')
+_XPATH_UCOIN_SILVER = etree.XPath('//span[@class = "ucoin-symbol ucoin-silver"]//text()')
+_XPATH_UCOIN_COPPER = etree.XPath('//span[@class = "ucoin-symbol ucoin-copper"]//text()')
+_XPATH_SEEDING_EXTEND_LINK = etree.XPath('//a[contains(@href,"torrents.php") '
+                                         'and contains(@href,"seeding")]/@href')
+_XPATH_TORRENTS_TABLE = etree.XPath('//table[@class="torrents"]')
+_XPATH_SEEDING_NEXT_PAGE = etree.XPath('//a[contains(.//text(), "下一页") or contains(.//text(), "下一頁") or contains(.//text(), ">")]/@href')
+_XPATH_JOIN_AT = etree.XPath('//tr/td[text()="加入日期" or text()="注册日期" or *[text()="加入日期"]]/following-sibling::td[1]//text()'
+                             '|//div/b[text()="加入日期"]/../text()')
+_XPATH_DETAIL_SEEDING_SIZES = etree.XPath('//tr/td[text()="当前上传"]/following-sibling::td[1]//'
+                                          'table[tr[1][td[4 and text()="尺寸"]]]//tr[position()>1]/td[4]')
+_XPATH_DETAIL_SEEDING_SEEDERS = etree.XPath('//tr/td[text()="当前上传"]/following-sibling::td[1]//'
+                                            'table[tr[1][td[5 and text()="做种者"]]]//tr[position()>1]/td[5]//text()')
+_XPATH_DETAIL_SEEDING_STAT = etree.XPath('//tr/td[text()="做种统计"]/following-sibling::td[1]//text()')
+_XPATH_SEEDING_LIST_LINK = etree.XPath('//a[contains(@href,"getusertorrentlist.php") '
+                                       'and contains(@href,"seeding")]/@href')
+_XPATH_SEEDING_AJAX_LINK = etree.XPath('//a[contains(@href, "javascript: getusertorrentlistajax") '
+                                       'and contains(@href,"seeding")]/@href')
+_XPATH_CSRF = etree.XPath('//meta[@name="x-csrf"]/@content')
+_XPATH_USER_LEVEL_IMG = etree.XPath('//tr/td[text()="等級" or text()="等级" or *[text()="等级"]]/'
+                                    'following-sibling::td[1]/img[1]/@title')
+_XPATH_USER_LEVEL_TEXT = etree.XPath('//tr/td[text()="等級" or text()="等级"]/'
+                                     'following-sibling::td[1 and not(img)]'
+                                     '|//tr/td[text()="等級" or text()="等级"]/'
+                                     'following-sibling::td[1 and img[not(@title)]]')
+_XPATH_USER_LEVEL_TD = etree.XPath('//tr/td[text()="等級" or text()="等级"]/'
+                                   'following-sibling::td[1]')
+_XPATH_USER_LEVEL_PTT = etree.XPath('//tr/td[text()="用户等级"]/following-sibling::td[1]/b/@title')
+_XPATH_USER_LEVEL_LINK = etree.XPath('//a[contains(@href, "userdetails")]/text()')
+_XPATH_MESSAGE_UNREAD_LINKS = etree.XPath('//tr[not(./td/img[@alt="Read"])]/td/a[contains(@href, "viewmessage")]/@href')
+_XPATH_MESSAGE_NEXT_PAGE = etree.XPath('//a[contains(.//text(), "下一页") or contains(.//text(), "下一頁")]/@href')
+_XPATH_MESSAGE_HEAD = etree.XPath('//h1/text()'
+                                  '|//div[@class="layui-card-header"]/span[1]/text()')
+_XPATH_MESSAGE_DATE = etree.XPath('//h1/following-sibling::table[.//tr/td[@class="colhead"]]//tr[2]/td[2]'
+                                  '|//div[@class="layui-card-header"]/span[2]/span[2]')
+_XPATH_MESSAGE_CONTENT = etree.XPath('//h1/following-sibling::table[.//tr/td[@class="colhead"]]//tr[3]/td'
+                                     '|//div[contains(@class,"layui-card-body")]')
+_XPATH_BONUS_TD = etree.XPath('//tr/td[text()="魔力值" or text()="猫粮"]/following-sibling::td[1]/text()')
+_SIZE_COL_XPATH = '//tr[position()=1]/' \
+                  'td[(img[@class="size"] and img[@alt="size"])' \
+                  ' or (text() = "大小")' \
+                  ' or (a/img[@class="size" and @alt="size"])]'
+_XPATH_SIZE_COL = etree.XPath(_SIZE_COL_XPATH)
+_XPATH_SIZE_COL_PRECEDING = etree.XPath(f'{_SIZE_COL_XPATH}/preceding-sibling::td')
+_SEEDERS_COL_XPATH = '//tr[position()=1]/' \
+                     'td[(img[@class="seeders"] and img[@alt="seeders"])' \
+                     ' or (text() = "在做种")' \
+                     ' or (a/img[@class="seeders" and @alt="seeders"])]'
+_XPATH_SEEDERS_COL = etree.XPath(_SEEDERS_COL_XPATH)
+_XPATH_SEEDERS_COL_PRECEDING = etree.XPath(f'{_SEEDERS_COL_XPATH}/preceding-sibling::td')
+_XPATH_PAGE_LINKS = etree.XPath('//a[contains(@href, "page=")]/@href')
+_PAGE_PATTERN = re.compile(r"[?&]page=(\d+)")
+
+
 class NexusPhpSiteUserInfo(ISiteUserInfo):
     schema = SiteSchema.NexusPhp
     order = SITE_BASE_ORDER * 2
@@ -43,12 +103,12 @@ class NexusPhpSiteUserInfo(ISiteUserInfo):
         :param html_text:
         :return:
         """
-        html = etree.HTML(html_text)
+        html = self._get_html(html_text)
         if not html:
             return
 
-        message_labels = html.xpath('//a[@href="messages.php"]/..')
-        message_labels.extend(html.xpath('//a[contains(@href, "messages.php")]/..'))
+        message_labels = _XPATH_MESSAGE_LINK(html)
+        message_labels.extend(_XPATH_MESSAGE_LINK_CONTAINS(html))
         if message_labels:
             message_text = message_labels[0].xpath("string(.)")
 
@@ -70,7 +130,7 @@ class NexusPhpSiteUserInfo(ISiteUserInfo):
 
         self._parse_message_unread(html_text)
 
-        html = etree.HTML(html_text)
+        html = self._get_html(html_text)
         if not html:
             return
 
@@ -82,7 +142,7 @@ class NexusPhpSiteUserInfo(ISiteUserInfo):
         if ret:
             self.username = str(ret[0])
 
-        ret = html.xpath('//a[contains(@href, "userdetails")]//strong//text()')
+        ret = _XPATH_USERNAME_STRONG(html)
         if ret:
             self.username = str(ret[0])
             return
@@ -107,11 +167,11 @@ class NexusPhpSiteUserInfo(ISiteUserInfo):
         leeching_match = re.search(r"(Torrents leeching|下载中)[\u4E00-\u9FA5\D\s]+(\d+)[\s\S]+<", html_text)
         self.leeching = StringUtils.str_int(leeching_match.group(2)) if leeching_match and leeching_match.group(
             2).strip() else 0
-        html = etree.HTML(html_text)
+        html = self._get_html(html_text)
         has_ucoin, self.bonus = self._parse_ucoin(html)
         if has_ucoin:
             return
-        tmps = html.xpath('//a[contains(@href,"mybonus")]/text()') if html else None
+        tmps = _XPATH_BONUS_LINK(html) if html else None
         if tmps:
             bonus_text = str(tmps[0]).strip()
             bonus_match = re.search(r"([\d,.]+)", bonus_text)
@@ -141,13 +201,13 @@ class NexusPhpSiteUserInfo(ISiteUserInfo):
         if html:
             gold, silver, copper = None, None, None
 
-            golds = html.xpath('//span[@class = "ucoin-symbol ucoin-gold"]//text()')
+            golds = _XPATH_UCOIN_GOLD(html)
             if golds:
                 gold = StringUtils.str_float(str(golds[-1]))
-            silvers = html.xpath('//span[@class = "ucoin-symbol ucoin-silver"]//text()')
+            silvers = _XPATH_UCOIN_SILVER(html)
             if silvers:
                 silver = StringUtils.str_float(str(silvers[-1]))
-            coppers = html.xpath('//span[@class = "ucoin-symbol ucoin-copper"]//text()')
+            coppers = _XPATH_UCOIN_COPPER(html)
             if coppers:
                 copper = StringUtils.str_float(str(coppers[-1]))
             if gold or silver or copper:
@@ -164,13 +224,12 @@ class NexusPhpSiteUserInfo(ISiteUserInfo):
         :param multi_page: 是否多页数据
         :return: 下页地址
         """
-        html = etree.HTML(str(html_text).replace(r'\/', '/'))
+        html = self._get_html(str(html_text).replace(r'\/', '/'))
         if not html:
             return None
 
         # 首页存在扩展链接，使用扩展链接
-        seeding_url_text = html.xpath('//a[contains(@href,"torrents.php") '
-                                      'and contains(@href,"seeding")]/@href')
+        seeding_url_text = _XPATH_SEEDING_EXTEND_LINK(html)
         if multi_page is False and seeding_url_text and seeding_url_text[0].strip():
             self._torrent_seeding_page = seeding_url_text[0].strip()
             return self._torrent_seeding_page
@@ -178,25 +237,17 @@ class NexusPhpSiteUserInfo(ISiteUserInfo):
         size_col = 3
         seeders_col = 4
         # 搜索size列
-        size_col_xpath = '//tr[position()=1]/' \
-                         'td[(img[@class="size"] and img[@alt="size"])' \
-                         ' or (text() = "大小")' \
-                         ' or (a/img[@class="size" and @alt="size"])]'
-        if html.xpath(size_col_xpath):
-            size_col = len(html.xpath(f'{size_col_xpath}/preceding-sibling::td')) + 1
+        if _XPATH_SIZE_COL(html):
+            size_col = len(_XPATH_SIZE_COL_PRECEDING(html)) + 1
         # 搜索seeders列
-        seeders_col_xpath = '//tr[position()=1]/' \
-                            'td[(img[@class="seeders"] and img[@alt="seeders"])' \
-                            ' or (text() = "在做种")' \
-                            ' or (a/img[@class="seeders" and @alt="seeders"])]'
-        if html.xpath(seeders_col_xpath):
-            seeders_col = len(html.xpath(f'{seeders_col_xpath}/preceding-sibling::td')) + 1
+        if _XPATH_SEEDERS_COL(html):
+            seeders_col = len(_XPATH_SEEDERS_COL_PRECEDING(html)) + 1
 
         page_seeding = 0
         page_seeding_size = 0
         page_seeding_info = []
         # 如果 table class="torrents"，则增加table[@class="torrents"]
-        table_class = '//table[@class="torrents"]' if html.xpath('//table[@class="torrents"]') else ''
+        table_class = '//table[@class="torrents"]' if _XPATH_TORRENTS_TABLE(html) else ''
         seeding_sizes = html.xpath(f'{table_class}//tr[position()>1]/td[{size_col}]')
         seeding_seeders = html.xpath(f'{table_class}//tr[position()>1]/td[{seeders_col}]/b/a/text()')
         if not seeding_seeders:
@@ -217,7 +268,7 @@ class NexusPhpSiteUserInfo(ISiteUserInfo):
 
         # 是否存在下页数据
         next_page = None
-        next_page_text = html.xpath('//a[contains(.//text(), "下一页") or contains(.//text(), "下一頁") or contains(.//text(), ">")]/@href')
+        next_page_text = _XPATH_SEEDING_NEXT_PAGE(html)
         if next_page_text:
             next_page = next_page_text[-1].strip()
             # fix up page url
@@ -226,13 +277,35 @@ class NexusPhpSiteUserInfo(ISiteUserInfo):
 
         return next_page
 
+    def _parse_seeding_next_pages(self, html_text: str, next_page: str) -> Optional[List[str]]:
+        """
+        从分页链接中取得最后一页的页码，生成从下页到最后一页的地址
+        """
+        page_match = _PAGE_PATTERN.search(next_page)
+        if not page_match:
+            return None
+        html = self._get_html(str(html_text).replace(r'\/', '/'))
+        if not html:
+            return None
+        next_page_no = int(page_match.group(1))
+        last_page_no = next_page_no
+        next_page_path = urlsplit(next_page).path
+        for href in _XPATH_PAGE_LINKS(html):
+            href_match = _PAGE_PATTERN.search(href)
+            # 只统计同一列表的分页链接
+            if not href_match or urlsplit(href).path != next_page_path:
+                continue
+            last_page_no = max(last_page_no, int(href_match.group(1)))
+        prefix, suffix = next_page[:page_match.start(1)], next_page[page_match.end(1):]
+        return [f"{prefix}{page_no}{suffix}" for page_no in range(next_page_no, last_page_no + 1)]
+
     def _parse_user_detail_info(self, html_text: str):
         """
         解析用户额外信息，加入时间，等级
         :param html_text:
         :return:
         """
-        html = etree.HTML(html_text)
+        html = self._get_html(html_text)
         if not html:
             return
 
@@ -241,18 +314,14 @@ class NexusPhpSiteUserInfo(ISiteUserInfo):
         self._fixup_traffic_info(html)
 
         # 加入日期
-        join_at_text = html.xpath(
-            '//tr/td[text()="加入日期" or text()="注册日期" or *[text()="加入日期"]]/following-sibling::td[1]//text()'
-            '|//div/b[text()="加入日期"]/../text()')
+        join_at_text = _XPATH_JOIN_AT(html)
         if join_at_text:
             self.join_at = StringUtils.unify_datetime_str(join_at_text[0].split(' (')[0].strip())
 
         # 做种体积 & 做种数
         # seeding 页面获取不到的话，此处再获取一次
-        seeding_sizes = html.xpath('//tr/td[text()="当前上传"]/following-sibling::td[1]//'
-                                   'table[tr[1][td[4 and text()="尺寸"]]]//tr[position()>1]/td[4]')
-        seeding_seeders = html.xpath('//tr/td[text()="当前上传"]/following-sibling::td[1]//'
-                                     'table[tr[1][td[5 and text()="做种者"]]]//tr[position()>1]/td[5]//text()')
+        seeding_sizes = _XPATH_DETAIL_SEEDING_SIZES(html)
+        seeding_seeders = _XPATH_DETAIL_SEEDING_SEEDERS(html)
         tmp_seeding = len(seeding_sizes)
         tmp_seeding_size = 0
         tmp_seeding_info = []
@@ -270,7 +339,7 @@ class NexusPhpSiteUserInfo(ISiteUserInfo):
         if not self.seeding_info:
             self.seeding_info = tmp_seeding_info
 
-        seeding_sizes = html.xpath('//tr/td[text()="做种统计"]/following-sibling::td[1]//text()')
+        seeding_sizes = _XPATH_DETAIL_SEEDING_STAT(html)
         if seeding_sizes:
             seeding_match = re.search(r"总做种数:\s+(\d+)", seeding_sizes[0], re.IGNORECASE)
             seeding_size_match = re.search(r"总做种体积:\s+([\d,.\s]+[KMGTPI]*B)", seeding_sizes[0], re.IGNORECASE)
@@ -292,14 +361,12 @@ class NexusPhpSiteUserInfo(ISiteUserInfo):
         :return:
         """
         # 单独的种子页面
-        seeding_url_text = html.xpath('//a[contains(@href,"getusertorrentlist.php") '
-                                      'and contains(@href,"seeding")]/@href')
+        seeding_url_text = _XPATH_SEEDING_LIST_LINK(html)
         if seeding_url_text:
             self._torrent_seeding_page = seeding_url_text[0].strip()
         # 从JS调用种获取用户ID
-        seeding_url_text = html.xpath('//a[contains(@href, "javascript: getusertorrentlistajax") '
-                                      'and contains(@href,"seeding")]/@href')
-        csrf_text = html.xpath('//meta[@name="x-csrf"]/@content')
+        seeding_url_text = _XPATH_SEEDING_AJAX_LINK(html)
+        csrf_text = _XPATH_CSRF(html)
         if not self._torrent_seeding_page and seeding_url_text:
             user_js = re.search(r"javascript: getusertorrentlistajax\(\s*'(\d+)", seeding_url_text[0])
             if user_js and user_js.group(1).strip():
@@ -320,33 +387,28 @@ class NexusPhpSiteUserInfo(ISiteUserInfo):
 
     def _get_user_level(self, html):
         # 等级 获取同一行等级数据，图片格式等级，取title信息，否则取文本信息
-        user_levels_text = html.xpath('//tr/td[text()="等級" or text()="等级" or *[text()="等级"]]/'
-                                      'following-sibling::td[1]/img[1]/@title')
+        user_levels_text = _XPATH_USER_LEVEL_IMG(html)
         if user_levels_text:
             self.user_level = user_levels_text[0].strip()
             return
 
-        user_levels_text = html.xpath('//tr/td[text()="等級" or text()="等级"]/'
-                                      'following-sibling::td[1 and not(img)]'
-                                      '|//tr/td[text()="等級" or text()="等级"]/'
-                                      'following-sibling::td[1 and img[not(@title)]]')
+        user_levels_text = _XPATH_USER_LEVEL_TEXT(html)
         if user_levels_text:
             self.user_level = user_levels_text[0].xpath("string(.)").strip()
             return
 
-        user_levels_text = html.xpath('//tr/td[text()="等級" or text()="等级"]/'
-                                      'following-sibling::td[1]')
+        user_levels_text = _XPATH_USER_LEVEL_TD(html)
         if user_levels_text:
             self.user_level = user_levels_text[0].xpath("string(.)").strip()
             return
 
         # 适配PTT用户等级
-        user_levels_text = html.xpath('//tr/td[text()="用户等级"]/following-sibling::td[1]/b/@title')
+        user_levels_text = _XPATH_USER_LEVEL_PTT(html)
         if user_levels_text:
             self.user_level = user_levels_text[0].strip()
             return
 
-        user_levels_text = html.xpath('//a[contains(@href, "userdetails")]/text()')
+        user_levels_text = _XPATH_USER_LEVEL_LINK(html)
         if not self.user_level and user_levels_text:
             for user_level_text in user_levels_text:
                 user_level_match = re.search(r"\[(.*)]", user_level_text)
@@ -355,42 +417,39 @@ class NexusPhpSiteUserInfo(ISiteUserInfo):
                     break
 
     def _parse_message_unread_links(self, html_text: str, msg_links: list) -> Optional[str]:
-        html = etree.HTML(html_text)
+        html = self._get_html(html_text)
         if not html:
             return None
 
-        message_links = html.xpath('//tr[not(./td/img[@alt="Read"])]/td/a[contains(@href, "viewmessage")]/@href')
+        message_links = _XPATH_MESSAGE_UNREAD_LINKS(html)
         msg_links.extend(message_links)
         # 是否存在下页数据
         next_page = None
-        next_page_text = html.xpath('//a[contains(.//text(), "下一页") or contains(.//text(), "下一頁")]/@href')
+        next_page_text = _XPATH_MESSAGE_NEXT_PAGE(html)
         if next_page_text:
             next_page = next_page_text[-1].strip()
 
         return next_page
 
     def _parse_message_content(self, html_text):
-        html = etree.HTML(html_text)
+        html = self._get_html(html_text)
         if not html:
             return None, None, None
         # 标题
         message_head_text = None
-        message_head = html.xpath('//h1/text()'
-                                  '|//div[@class="layui-card-header"]/span[1]/text()')
+        message_head = _XPATH_MESSAGE_HEAD(html)
         if message_head:
             message_head_text = message_head[-1].strip()
 
         # 消息时间
         message_date_text = None
-        message_date = html.xpath('//h1/following-sibling::table[.//tr/td[@class="colhead"]]//tr[2]/td[2]'
-                                  '|//div[@class="layui-card-header"]/span[2]/span[2]')
+        message_date = _XPATH_MESSAGE_DATE(html)
         if message_date:
             message_date_text = message_date[0].xpath("string(.)").strip()
 
         # 消息内容
         message_content_text = None
-        message_content = html.xpath('//h1/following-sibling::table[.//tr/td[@class="colhead"]]//tr[3]/td'
-                                     '|//div[contains(@class,"layui-card-body")]')
+        message_content = _XPATH_MESSAGE_CONTENT(html)
         if message_content:
             message_content_text = message_content[0].xpath("string(.)").strip()
 
@@ -399,6 +458,6 @@ class NexusPhpSiteUserInfo(ISiteUserInfo):
     def _fixup_traffic_info(self, html):
         # fixup bonus
         if not self.bonus:
-            bonus_text = html.xpath('//tr/td[text()="魔力值" or text()="猫粮"]/following-sibling::td[1]/text()')
+            bonus_text = _XPATH_BONUS_TD(html)
             if bonus_text:
                 self.bonus = StringUtils.str_float(bonus_text[0].strip())
@@ -8,6 +8,7 @@ from app.plugins.sitestatistic.siteuserinfo.nexus_php import NexusPhpSiteUserInf
 class NexusProjectSiteUserInfo(NexusPhpSiteUserInfo):
     schema = SiteSchema.NexusProject
     order = SITE_BASE_ORDER + 25
+    fingerprints = ["Nexus Project"]
 
     @classmethod
     def match(cls, html_text: str) -> bool:
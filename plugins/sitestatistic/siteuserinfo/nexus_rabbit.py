@@ -2,8 +2,6 @@
 import json
 from typing import Optional
 
-from lxml import etree
-
 from app.log import logger
 from app.plugins.sitestatistic.siteuserinfo import SITE_BASE_ORDER, SiteSchema
 from app.plugins.sitestatistic.siteuserinfo.nexus_php import NexusPhpSiteUserInfo
@@ -12,10 +10,11 @@ from app.plugins.sitestatistic.siteuserinfo.nexus_php import NexusPhpSiteUserInf
 class NexusRabbitSiteUserInfo(NexusPhpSiteUserInfo):
     schema = SiteSchema.NexusRabbit
     order = SITE_BASE_ORDER + 5
+    fingerprints = ["Rabbit"]
 
     @classmethod
     def match(cls, html_text: str) -> bool:
-        html = etree.HTML(html_text)
+        html = cls._match_html(html_text)
         if not html:
             return False
 
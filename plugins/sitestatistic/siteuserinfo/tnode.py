@@ -10,6 +10,7 @@ from app.utils.string import StringUtils
 class TNodeSiteUserInfo(ISiteUserInfo):
     schema = SiteSchema.TNode
     order = SITE_BASE_ORDER + 60
+    fingerprints = ["Powered By TNode"]
 
     @classmethod
     def match(cls, html_text: str) -> bool:
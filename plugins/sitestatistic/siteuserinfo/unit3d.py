@@ -2,8 +2,6 @@
 import re
 from typing import Optional
 
-from lxml import etree
-
 from app.plugins.sitestatistic.siteuserinfo import ISiteUserInfo, SITE_BASE_ORDER, SiteSchema
 from app.utils.string import StringUtils
 
@@ -11,6 +9,7 @@ from app.utils.string import StringUtils
 class Unit3dSiteUserInfo(ISiteUserInfo):
     schema = SiteSchema.Unit3d
     order = SITE_BASE_ORDER + 15
+    fingerprints = ["unit3d.js"]
 
     @classmethod
     def match(cls, html_text: str) -> bool:
@@ -18,7 +17,7 @@ class Unit3dSiteUserInfo(ISiteUserInfo):
 
     def _parse_user_base_info(self, html_text: str):
         html_text = self._prepare_html_text(html_text)
-        html = etree.HTML(html_text)
+        html = self._get_html(html_text)
 
         tmps = html.xpath('//a[contains(@href, "/users/") and contains(@href, "settings")]/@href')
         if tmps:
@@ -45,7 +44,7 @@ class Unit3dSiteUserInfo(ISiteUserInfo):
         :param html_text:
         :return:
         """
-        html = etree.HTML(html_text)
+        html = self._get_html(html_text)
         if not html:
             return None
 
@@ -69,7 +68,7 @@ class Unit3dSiteUserInfo(ISiteUserInfo):
         :param multi_page: 是否多页数据
         :return: 下页地址
         """
-        html = etree.HTML(html_text)
+        html = self._get_html(html_text)
         if not html:
             return None
 
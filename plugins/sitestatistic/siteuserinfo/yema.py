@@ -11,6 +11,7 @@ from app.utils.string import StringUtils
 class TYemaSiteUserInfo(ISiteUserInfo):
     schema = SiteSchema.Yema
     order = SITE_BASE_ORDER + 60
+    fingerprints = ["<title>YemaPT</title>"]
 
     @classmethod
     def match(cls, html_text: str) -> bool:
@@ -0,0 +1,169 @@
+import math
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from app.log import logger
+
+
+class SiteStatisticStore:
+    """
+    站点数据时序存储，每个站点每天一行，按日期及站点建立索引，
+    查询任意日期范围时只读取所需的行，长时间范围可按点数降采样，持久化保存在独立的SQLite文件中
+    """
+
+    # 字段名 -> 字段类型，与刷新站点数据时保存的字段一致
+    COLUMNS = {
+        "username": "TEXT",
+        "user_level": "TEXT",
+        "join_at": "TEXT",
+        "upload": "INTEGER",
+        "download": "INTEGER",
+        "ratio": "REAL",
+        "seeding": "INTEGER",
+        "seeding_size": "INTEGER",
+        "leeching": "INTEGER",
+        "bonus": "REAL",
+        "message_unread": "INTEGER",
+        "url": "TEXT",
+        "err_msg": "TEXT",
+        "updated_at": "TEXT"
+    }
+
+    def __init__(self, db_path: Union[str, Path]):
+        self._db_path = str(db_path)
+        self._lock = threading.RLock()
+        self.__init_db()
+
+    def __connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def __init_db(self):
+        columns = ",\n".join(f"{name} {column_type}" for name, column_type in self.COLUMNS.items())
+        with self._lock:
+            conn = self.__connect()
+            try:
+                with conn:
+                    conn.execute(f"""
+                        CREATE TABLE IF NOT EXISTS site_statistic (
+                            date TEXT NOT NULL,
+                            site TEXT NOT NULL,
+                            {columns},
+                            PRIMARY KEY (date, site)
+                        )""")
+                    conn.execute("""
+                        CREATE INDEX IF NOT EXISTS site_statistic_site
+                        ON site_statistic (site, date)""")
+            finally:
+                conn.close()
+
+    def __query(self, sql: str, params: Union[list, tuple] = ()) -> List[tuple]:
+        with self._lock:
+            conn = self.__connect()
+            try:
+                return conn.execute(sql, params).fetchall()
+            finally:
+                conn.close()
+
+    def __to_dict(self, row: tuple) -> Dict[str, Any]:
+        """
+        将一行数据转换为站点数据字典，忽略空字段
+        """
+        return {name: value for name, value in zip(self.COLUMNS, row) if value is not None}
+
+    def is_empty(self) -> bool:
+        return not self.__query("SELECT 1 FROM site_statistic LIMIT 1")
+
+    def save(self, date: str, sites_data: Dict[str, Dict[str, Any]]):
+        """
+        保存一天的全部站点数据，覆盖当天已有的数据
+        """
+        self.save_days({date: sites_data})
+
+    def save_days(self, days: Dict[str, Dict[str, Dict[str, Any]]]):
+        """
+        批量保存多天的站点数据，日期 -> 站点 -> 站点数据
+        """
+        names = list(self.COLUMNS)
+        rows = [(date, site, *[data.get(name) for name in names])
+                for date, sites_data in days.items()
+                for site, data in (sites_data or {}).items() if isinstance(data, dict)]
+        with self._lock:
+            conn = self.__connect()
+            try:
+                with conn:
+                    conn.executemany("DELETE FROM site_statistic WHERE date = ?", [(date,) for date in days])
+                    conn.executemany(f"INSERT INTO site_statistic (date, site, {', '.join(names)}) "
+                                     f"VALUES ({', '.join(['?'] * (len(names) + 2))})", rows)
+            except Exception as e:
+                logger.error(f"站点数据保存失败：{str(e)}")
+            finally:
+                conn.close()
+
+    def get_dates(self, limit: int = 2) -> List[str]:
+        """
+        获取最近有数据的日期，按日期倒序
+        """
+        return [date for date, in self.__query(
+            "SELECT DISTINCT date FROM site_statistic ORDER BY date DESC LIMIT ?", (limit,))]
+
+    def get_day(self, date: str) -> Dict[str, Dict[str, Any]]:
+        """
+        获取一天的全部站点数据，站点 -> 站点数据
+        """
+        if not date:
+            return {}
+        return {site: self.__to_dict(row) for site, *row in self.__query(
+            f"SELECT site, {', '.join(self.COLUMNS)} FROM site_statistic WHERE date = ?", (date,))}
+
+    def get_range(self, start_date: str, end_date: str, site: Optional[str] = None,
+                  max_points: int = 0) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        获取日期范围内的站点数据，日期 -> 站点 -> 站点数据
+        :param start_date: 开始日期（含）
+        :param end_date: 结束日期（含）
+        :param site: 站点名称，为空时获取全部站点
+        :param max_points: 最多返回的日期数，超出时降采样，为0时不限制
+        """
+        sql = f"SELECT date, site, {', '.join(self.COLUMNS)} FROM site_statistic WHERE date BETWEEN ? AND ?"
+        params = [start_date, end_date]
+        if site:
+            sql += " AND site = ?"
+            params.append(site)
+        result: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for date, site_name, *row in self.__query(sql + " ORDER BY date", params):
+            result.setdefault(date, {})[site_name] = self.__to_dict(row)
+        if max_points:
+            dates = self.downsample(list(result), max_points)
+            result = {date: result[date] for date in dates}
+        return result
+
+    def get_totals(self, start_date: str, end_date: str,
+                   max_points: int = 0) -> List[Tuple[str, int, int, int, int]]:
+        """
+        获取日期范围内每天全部站点的汇总数据，按日期升序
+        :return: [(日期, 上传量, 下载量, 做种数, 做种体积)]
+        """
+        rows = self.__query("SELECT date, SUM(upload), SUM(download), SUM(seeding), SUM(seeding_size) "
+                            "FROM site_statistic WHERE date BETWEEN ? AND ? AND err_msg IS NULL "
+                            "GROUP BY date ORDER BY date", (start_date, end_date))
+        rows = [(date, upload or 0, download or 0, seeding or 0, seeding_size or 0)
+                for date, upload, download, seeding, seeding_size in rows]
+        if max_points:
+            dates = set(self.downsample([row[0] for row in rows], max_points))
+            rows = [row for row in rows if row[0] in dates]
+        return rows
+
+    @staticmethod
+    def downsample(dates: List[str], max_points: int) -> List[str]:
+        """
+        按固定步长降采样，站点数据为累计值，每段取最后一天，并始终保留最后一天
+        """
+        if not max_points or len(dates) <= max_points:
+            return dates
+        step = math.ceil(len(dates) / max_points)
+        # 从最后一天往前按步长取点，保证最新的数据在结果中
+        return dates[::-1][::step][::-1]
@@ -1,4 +1,6 @@
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from pathlib import Path
 from threading import Event
@@ -15,6 +17,7 @@ from app.log import logger
 from app.modules.qbittorrent import Qbittorrent
 from app.modules.transmission import Transmission
 from app.plugins import _PluginBase
+from app.plugins.torrenttransfer.transfer_journal import TransferJournal
 from app.schemas import NotificationType
 from app.utils.string import StringUtils
 
@@ -63,16 +66,22 @@ class TorrentTransfer(_PluginBase):
     _autostart = False
     _transferemptylabel = False
     _add_torrent_tags = None
+    # 转移并发数
+    _transfer_threads = 3
+    # 每添加多少个任务批量校验及删除源任务
+    _batch_size = 50
     # 退出事件
     _event = Event()
-    # 待检查种子清单
-    _recheck_torrents = {}
+    # 转移日志，记录每个种子的转移阶段，待检查的校验任务也从日志中读取
+    _journal: Optional[TransferJournal] = None
     _is_recheck_running = False
     # 任务标签
     _torrent_tags = []
 
     def init_plugin(self, config: dict = None):
         self.torrent = TorrentHelper()
+        if not self._journal:
+            self._journal = TransferJournal(db_path=self.get_data_path() / "transfer_journal.db")
         # 读取配置
         if config:
             self._enabled = config.get("enabled")
@@ -98,6 +107,11 @@ class TorrentTransfer(_PluginBase):
                 config["add_torrent_tags"] = self._add_torrent_tags
                 self.update_config(config=config)
             self._torrent_tags = self._add_torrent_tags.strip().split(",") if self._add_torrent_tags else []
+            try:
+                self._transfer_threads = max(int(config.get("transfer_threads") or 3), 1)
+            except ValueError:
+                logger.warn(f"转移并发数配置有误：{config.get('transfer_threads')}，使用默认值3")
+                self._transfer_threads = 3
 
         # 停止现有任务
         self.stop_service()
@@ -415,6 +429,22 @@ class TorrentTransfer(_PluginBase):
                                         }
                                     }
                                 ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'transfer_threads',
+                                            'label': '转移并发数',
+                                            'placeholder': '同时添加到目的下载器的任务数，默认3'
+                                        }
+                                    }
+                                ]
                             }
                         ]
                     },
@@ -529,7 +559,8 @@ class TorrentTransfer(_PluginBase):
             "nopaths": "",
             "autostart": True,
             "transferemptylabel": False,
-            "add_torrent_tags": "已整理,转移做种"
+            "add_torrent_tags": "已整理,转移做种",
+            "transfer_threads": 3
         }
 
     def get_page(self) -> List[dict]:
@@ -612,6 +643,15 @@ class TorrentTransfer(_PluginBase):
 
         # 获取下载器中已完成的种子
         downloader_obj = self.__get_downloader(downloader)
+        # 一次性获取目的下载器中的全部种子hash，不再逐个查询
+        todownloader_obj = self.__get_downloader(todownloader)
+        exist_hashes = self.__get_torrent_hashes(todownloader_obj, todownloader)
+        if exist_hashes is None:
+            logger.error(f"获取下载器 {todownloader} 种子列表失败，无法检查种子是否已存在，本次不转移")
+            return
+        # 继续处理上次中断的转移任务
+        journal_hashes = self.__resume_transfer(exist_hashes, downloader_obj, todownloader_obj)
+
         torrents = downloader_obj.get_completed_torrents()
         if torrents:
             logger.info(f"下载器 {downloader} 已完成种子数：{len(torrents)}")
@@ -693,6 +733,8 @@ class TorrentTransfer(_PluginBase):
         # 开始转移任务
         if trans_torrents:
             logger.info(f"需要转移的种子数：{len(trans_torrents)}")
+            # 开始时间
+            start_time = time.time()
             # 记数
             total = len(trans_torrents)
             # 总成功数
@@ -704,130 +746,79 @@ class TorrentTransfer(_PluginBase):
             # 删除重复数
             del_dup = 0
 
+            pending_torrents = []
+            duplicate_hashes = []
             for torrent_item in trans_torrents:
-                # 检查种子文件是否存在
-                torrent_file = Path(self._fromtorrentpath) / f"{torrent_item.get('hash')}.torrent"
-                if not torrent_file.exists():
-                    logger.error(f"种子文件不存在：{torrent_file}")
-                    # 失败计数
-                    fail += 1
+                if torrent_item.get('hash') in journal_hashes:
+                    # 已由转移日志继续处理
                     continue
-
-                # 查询hash值是否已经在目的下载器中
-                todownloader_obj = self.__get_downloader(todownloader)
-                torrent_info, _ = todownloader_obj.get_torrents(ids=[torrent_item.get('hash')])
-                if torrent_info:
+                if torrent_item.get('hash') in exist_hashes:
                     # 删除重复的源种子，不能删除文件！
                     if self._deleteduplicate:
                         logger.info(f"删除重复的源下载器任务（不含文件）：{torrent_item.get('hash')} ...")
-                        downloader_obj.delete_torrents(delete_file=False, ids=[torrent_item.get('hash')])
-                        del_dup += 1
+                        duplicate_hashes.append(torrent_item.get('hash'))
                     else:
                         logger.info(f"{torrent_item.get('hash')} 已在目的下载器中，跳过 ...")
                         # 跳过计数
                         skip += 1
                     continue
+                pending_torrents.append(torrent_item)
+            if duplicate_hashes:
+                downloader_obj.delete_torrents(delete_file=False, ids=duplicate_hashes)
+                del_dup += len(duplicate_hashes)
 
-                # 转换保存路径
-                download_dir = self.__convert_save_path(torrent_item.get('save_path'),
-                                                        self._frompath,
-                                                        self._topath)
-                if not download_dir:
-                    logger.error(f"转换保存路径失败：{torrent_item.get('save_path')}")
-                    # 失败计数
-                    fail += 1
-                    continue
+            # 记录转移队列
+            self._journal.add([torrent_item.get('hash') for torrent_item in pending_torrents],
+                              from_downloader=downloader, to_downloader=todownloader)
 
-                # 如果源下载器是QB检查是否有Tracker，没有的话额外获取
-                if downloader == "qbittorrent":
-                    # 读取种子内容、解析种子文件
-                    content = torrent_file.read_bytes()
-                    if not content:
-                        logger.warn(f"读取种子文件失败：{torrent_file}")
-                        fail += 1
+            # 多线程读取种子文件并添加到目的下载器，添加成功的任务分批校验、删除源任务
+            added_torrents = []
+            executor = ThreadPoolExecutor(max_workers=self._transfer_threads,
+                                          thread_name_prefix="TorrentTransfer")
+            try:
+                futures = {executor.submit(self.__transfer_torrent, torrent_item): torrent_item
+                           for torrent_item in pending_torrents}
+                stopped = False
+                for finished, future in enumerate(as_completed(futures), start=1):
+                    if self._event.is_set() and not stopped:
+                        # 取消未开始的任务，已开始的任务仍需记录结果
+                        logger.info(f"转移服务停止，等待进行中的任务完成 ...")
+                        stopped = True
+                        for pending_future in futures:
+                            pending_future.cancel()
+                    if future.cancelled():
                         continue
-                    # 读取trackers
+                    torrent_item = futures[future]
                     try:
-                        torrent_main = bdecode(content)
-                        main_announce = torrent_main.get('announce')
+                        download_id = future.result()
                     except Exception as err:
-                        logger.warn(f"解析种子文件 {torrent_file} 失败：{str(err)}")
+                        logger.error(f"转移种子 {torrent_item.get('hash')} 出错：{str(err)}")
+                        download_id = None
+                    if not download_id:
+                        # 失败计数
                         fail += 1
-                        continue
-
-                    if not main_announce:
-                        logger.info(f"{torrent_item.get('hash')} 未发现tracker信息，尝试补充tracker信息...")
-                        # 读取fastresume文件
-                        fastresume_file = Path(self._fromtorrentpath) / f"{torrent_item.get('hash')}.fastresume"
-                        if not fastresume_file.exists():
-                            logger.warn(f"fastresume文件不存在：{fastresume_file}")
-                            fail += 1
-                            continue
-                        # 尝试补充trackers
-                        try:
-                            # 解析fastresume文件
-                            fastresume = fastresume_file.read_bytes()
-                            torrent_fastresume = bdecode(fastresume)
-                            # 读取trackers
-                            fastresume_trackers = torrent_fastresume.get('trackers')
-                            if isinstance(fastresume_trackers, list) \
-                                    and len(fastresume_trackers) > 0 \
-                                    and fastresume_trackers[0]:
-                                # 重新赋值
-                                torrent_main['announce'] = fastresume_trackers[0][0]
-                                # 保留其他tracker，避免单一tracker无法连接
-                                if len(fastresume_trackers) > 1 or len(fastresume_trackers[0]) > 1:
-                                    torrent_main['announce-list'] = fastresume_trackers
-                                # 替换种子文件路径
-                                torrent_file = settings.TEMP_PATH / f"{torrent_item.get('hash')}.torrent"
-                                # 编码并保存到临时文件
-                                torrent_file.write_bytes(bencode(torrent_main))
-                        except Exception as err:
-                            logger.error(f"解析fastresume文件 {fastresume_file} 出错：{str(err)}")
-                            fail += 1
-                            continue
-
-                # 发送到另一个下载器中下载：默认暂停、传输下载路径、关闭自动管理模式
-                logger.info(f"添加转移做种任务到下载器 {todownloader}：{torrent_file}")
-                download_id = self.__download(downloader=todownloader,
-                                              content=torrent_file.read_bytes(),
-                                              save_path=download_dir)
-                if not download_id:
-                    # 下载失败
-                    fail += 1
-                    logger.error(f"添加下载任务失败：{torrent_file}")
-                    continue
-                else:
-                    # 下载成功
-                    logger.info(f"成功添加转移做种任务，种子文件：{torrent_file}")
-
-                    # TR会自动校验，QB需要手动校验
-                    if todownloader == "qbittorrent":
-                        logger.info(f"qbittorrent 开始校验 {download_id} ...")
-                        todownloader_obj.recheck_torrents(ids=[download_id])
+                        self._journal.remove([torrent_item.get('hash')])
+                    else:
+                        # 成功计数
+                        success += 1
+                        self._journal.update([torrent_item.get('hash')], TransferJournal.ADDED)
+                        added_torrents.append((torrent_item.get('hash'), download_id))
+                        if len(added_torrents) >= self._batch_size:
+                            self.__finish_transfer(added_torrents, downloader_obj, todownloader_obj)
+                            added_torrents = []
+                    if finished % 50 == 0:
+                        logger.info(f"转移进度：{finished}/{len(futures)}，成功：{success}，失败：{fail}")
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
+                if added_torrents:
+                    self.__finish_transfer(added_torrents, downloader_obj, todownloader_obj)
 
-                    # 追加校验任务
-                    logger.info(f"添加校验检查任务：{download_id} ...")
-                    if not self._recheck_torrents.get(todownloader):
-                        self._recheck_torrents[todownloader] = []
-                    self._recheck_torrents[todownloader].append(download_id)
+            # 吞吐量统计
+            elapsed = time.time() - start_time
+            speed = (success + fail) / elapsed if elapsed > 0 else 0
+            logger.info(f"转移做种完成，总数：{total}，成功：{success}，失败：{fail}，跳过：{skip}，"
+                        f"删除重复：{del_dup}，耗时：{elapsed:.1f} 秒，平均 {speed:.2f} 个/秒")
 
-                    # 删除源种子，不能删除文件！
-                    if self._deletesource:
-                        logger.info(f"删除源下载器任务（不含文件）：{torrent_item.get('hash')} ...")
-                        downloader_obj.delete_torrents(delete_file=False, ids=[torrent_item.get('hash')])
-
-                    # 成功计数
-                    success += 1
-                    # 插入转种记录
-                    history_key = "%s-%s" % (self._fromdownloader, torrent_item.get('hash'))
-                    self.save_data(key=history_key,
-                                   value={
-                                       "to_download": self._todownloader,
-                                       "to_download_id": download_id,
-                                       "delete_source": self._deletesource,
-                                       "delete_duplicate": self._deleteduplicate,
-                                   })
             # 触发校验任务
             if success > 0 and self._autostart:
                 self.check_recheck()
@@ -837,17 +828,182 @@ class TorrentTransfer(_PluginBase):
                 self.post_message(
                     mtype=NotificationType.SiteMessage,
                     title="【转移做种任务执行完成】",
-                    text=f"总数：{total}，成功：{success}，失败：{fail}，跳过：{skip}，删除重复：{del_dup}"
+                    text=f"总数：{total}，成功：{success}，失败：{fail}，跳过：{skip}，删除重复：{del_dup}\n"
+                         f"耗时：{elapsed:.1f} 秒，平均 {speed:.2f} 个/秒"
                 )
         else:
             logger.info(f"没有需要转移的种子")
         logger.info("转移做种任务执行完成")
 
+    def __get_torrent_hashes(self, downloader_obj: Any, downloader: str) -> Optional[set]:
+        """
+        获取下载器中全部种子的hash，获取失败时返回None
+        """
+        torrents, error = downloader_obj.get_torrents()
+        if error:
+            return None
+        return {self.__get_hash(torrent, downloader) for torrent in torrents or []}
+
+    def __transfer_torrent(self, torrent_item: dict) -> Optional[str]:
+        """
+        读取种子文件，补充tracker后添加到目的下载器，返回目的下载器中的任务ID，在转移线程中执行
+        """
+        # 检查种子文件是否存在
+        torrent_file = Path(self._fromtorrentpath) / f"{torrent_item.get('hash')}.torrent"
+        if not torrent_file.exists():
+            logger.error(f"种子文件不存在：{torrent_file}")
+            return None
+
+        # 转换保存路径
+        download_dir = self.__convert_save_path(torrent_item.get('save_path'),
+                                                self._frompath,
+                                                self._topath)
+        if not download_dir:
+            logger.error(f"转换保存路径失败：{torrent_item.get('save_path')}")
+            return None
+
+        # 读取种子内容
+        content = torrent_file.read_bytes()
+        if not content:
+            logger.warn(f"读取种子文件失败：{torrent_file}")
+            return None
+
+        # 如果源下载器是QB检查是否有Tracker，没有的话额外获取
+        if self._fromdownloader == "qbittorrent":
+            # 读取trackers
+            try:
+                torrent_main = bdecode(content)
+                main_announce = torrent_main.get('announce')
+            except Exception as err:
+                logger.warn(f"解析种子文件 {torrent_file} 失败：{str(err)}")
+                return None
+
+            if not main_announce:
+                logger.info(f"{torrent_item.get('hash')} 未发现tracker信息，尝试补充tracker信息...")
+                # 读取fastresume文件
+                fastresume_file = Path(self._fromtorrentpath) / f"{torrent_item.get('hash')}.fastresume"
+                if not fastresume_file.exists():
+                    logger.warn(f"fastresume文件不存在：{fastresume_file}")
+                    return None
+                # 尝试补充trackers
+                try:
+                    # 解析fastresume文件
+                    fastresume = fastresume_file.read_bytes()
+                    torrent_fastresume = bdecode(fastresume)
+                    # 读取trackers
+                    fastresume_trackers = torrent_fastresume.get('trackers')
+                    if isinstance(fastresume_trackers, list) \
+                            and len(fastresume_trackers) > 0 \
+                            and fastresume_trackers[0]:
+                        # 重新赋值
+                        torrent_main['announce'] = fastresume_trackers[0][0]
+                        # 保留其他tracker，避免单一tracker无法连接
+                        if len(fastresume_trackers) > 1 or len(fastresume_trackers[0]) > 1:
+                            torrent_main['announce-list'] = fastresume_trackers
+                        # 使用补充tracker后的种子内容
+                        content = bencode(torrent_main)
+                except Exception as err:
+                    logger.error(f"解析fastresume文件 {fastresume_file} 出错：{str(err)}")
+                    return None
+
+        # 发送到另一个下载器中下载：默认暂停、传输下载路径、关闭自动管理模式
+        logger.info(f"添加转移做种任务到下载器 {self._todownloader}：{torrent_file}")
+        download_id = self.__download(downloader=self._todownloader,
+                                      content=content,
+                                      save_path=download_dir)
+        if not download_id:
+            logger.error(f"添加下载任务失败：{torrent_file}")
+            return None
+        logger.info(f"成功添加转移做种任务，种子文件：{torrent_file}")
+        return download_id
+
+    def __resume_transfer(self, exist_hashes: set, downloader_obj: Any, todownloader_obj: Any) -> set:
+        """
+        根据转移日志继续处理上次中断的任务，返回仍在处理中的种子hash，这些种子不再按重复种子处理
+        """
+        stages = self._journal.get_stages(from_downloader=self._fromdownloader,
+                                          to_downloader=self._todownloader)
+        if not stages:
+            return set()
+        # 按当前设置已处理完成的任务不再保留
+        final_hashes = [hash_str for hash_str, stage in stages.items()
+                        if stage == TransferJournal.SOURCE_DELETED
+                        or (stage == TransferJournal.STARTED and not self._deletesource)
+                        or (stage == TransferJournal.RECHECKING and not self._autostart)]
+        if final_hashes:
+            self._journal.remove(final_hashes)
+            stages = {hash_str: stage for hash_str, stage in stages.items() if hash_str not in final_hashes}
+        # 已加入队列但未添加成功的任务重新转移，中断前已添加到目的下载器但未来得及记录的按已添加处理
+        queued_hashes = [hash_str for hash_str, stage in stages.items() if stage == TransferJournal.QUEUED]
+        not_added_hashes = [hash_str for hash_str in queued_hashes if hash_str not in exist_hashes]
+        self._journal.remove(not_added_hashes)
+        added_hashes = [hash_str for hash_str, stage in stages.items()
+                        if stage == TransferJournal.ADDED
+                        or (stage == TransferJournal.QUEUED and hash_str in exist_hashes)]
+        if added_hashes:
+            logger.info(f"继续处理上次中断的转移任务：{len(added_hashes)} 个 ...")
+            # 目的下载器中的任务ID即种子hash
+            self.__finish_transfer([(hash_str, hash_str) for hash_str in added_hashes],
+                                   downloader_obj, todownloader_obj)
+        # 已开始做种但未删除源任务的
+        if self._deletesource:
+            self.__delete_source([hash_str for hash_str, stage in stages.items()
+                                  if stage == TransferJournal.STARTED], downloader_obj)
+        # 等待校验完成后做种的任务仍在处理中
+        if self._autostart:
+            added_hashes += [hash_str for hash_str, stage in stages.items() if stage == TransferJournal.RECHECKING]
+        return set(added_hashes)
+
+    def __delete_source(self, hashes: List[str], downloader_obj: Any):
+        """
+        删除源下载器任务，不能删除文件！
+        """
+        if not hashes:
+            return
+        logger.info(f"删除源下载器任务（不含文件）：{len(hashes)} 个 ...")
+        if downloader_obj.delete_torrents(delete_file=False, ids=hashes):
+            # 源任务删除后转移完成，不再保留转移日志
+            self._journal.remove(hashes)
+
+    def __finish_transfer(self, added_torrents: List[Tuple[str, str]], downloader_obj: Any, todownloader_obj: Any):
+        """
+        批量处理添加成功的任务：校验、追加校验检查任务、删除源任务及记录转种历史
+        """
+        hashes = [hash_str for hash_str, _ in added_torrents]
+        download_ids = [download_id for _, download_id in added_torrents]
+        # TR会自动校验，QB需要手动校验
+        if self._todownloader == "qbittorrent":
+            logger.info(f"qbittorrent 开始校验 {len(download_ids)} 个任务 ...")
+            todownloader_obj.recheck_torrents(ids=download_ids)
+
+        if self._autostart:
+            # 追加校验任务
+            logger.info(f"添加校验检查任务：{len(download_ids)} 个 ...")
+            self._journal.update(hashes, TransferJournal.RECHECKING)
+        elif self._deletesource:
+            # 未开启自动做种时添加后即删除源任务，删除失败时下次运行继续删除
+            self._journal.update(hashes, TransferJournal.STARTED)
+            self.__delete_source(hashes, downloader_obj)
+        else:
+            # 不需要校验后做种也不需要删除源任务，转移完成
+            self._journal.remove(hashes)
+
+        # 插入转种记录
+        for hash_str, download_id in added_torrents:
+            history_key = "%s-%s" % (self._fromdownloader, hash_str)
+            self.save_data(key=history_key,
+                           value={
+                               "to_download": self._todownloader,
+                               "to_download_id": download_id,
+                               "delete_source": self._deletesource,
+                               "delete_duplicate": self._deleteduplicate,
+                           })
+
     def check_recheck(self):
         """
         定时检查下载器中种子是否校验完成，校验完成且完整的自动开始辅种
         """
-        if not self._recheck_torrents:
+        if not self._journal:
             return
         if not self._todownloader:
             return
@@ -857,8 +1013,8 @@ class TorrentTransfer(_PluginBase):
         # 校验下载器
         downloader = self._todownloader
 
-        # 需要检查的种子
-        recheck_torrents = self._recheck_torrents.get(downloader, [])
+        # 需要检查的种子，目的下载器中的任务ID即种子hash
+        recheck_torrents = self._journal.get_hashes(to_downloader=downloader, stage=TransferJournal.RECHECKING)
         if not recheck_torrents:
             return
 
@@ -867,36 +1023,45 @@ class TorrentTransfer(_PluginBase):
         # 运行状态
         self._is_recheck_running = True
 
-        # 获取任务
-        downloader_obj = self.__get_downloader(downloader)
-        torrents, _ = downloader_obj.get_torrents(ids=recheck_torrents)
-        if torrents:
-            # 可做种的种子
-            can_seeding_torrents = []
-            for torrent in torrents:
-                # 获取种子hash
-                hash_str = self.__get_hash(torrent, downloader)
-                # 判断是否可做种
-                if self.__can_seeding(torrent, downloader):
-                    can_seeding_torrents.append(hash_str)
-
-            if can_seeding_torrents:
-                logger.info(f"共 {len(can_seeding_torrents)} 个任务校验完成，开始做种")
-                # 开始做种
-                downloader_obj.start_torrents(ids=can_seeding_torrents)
-                # 去除已经处理过的种子
-                self._recheck_torrents[downloader] = list(
-                    set(recheck_torrents).difference(set(can_seeding_torrents)))
-            else:
-                logger.info(f"没有新的任务校验完成，将在下次个周期继续检查 ...")
+        try:
+            # 获取任务
+            downloader_obj = self.__get_downloader(downloader)
+            torrents, error = downloader_obj.get_torrents(ids=recheck_torrents)
+            if error:
+                logger.info(f"下载器 {downloader} 查询校验任务失败，将在下次继续查询 ...")
+            elif torrents:
+                # 可做种的种子
+                can_seeding_torrents = []
+                exist_torrents = set()
+                for torrent in torrents:
+                    # 获取种子hash
+                    hash_str = self.__get_hash(torrent, downloader)
+                    exist_torrents.add(hash_str)
+                    # 判断是否可做种
+                    if self.__can_seeding(torrent, downloader):
+                        can_seeding_torrents.append(hash_str)
 
-        elif torrents is None:
-            logger.info(f"下载器 {downloader} 查询校验任务失败，将在下次继续查询 ...")
-        else:
-            logger.info(f"下载器 {downloader} 中没有需要检查的校验任务，清空待处理列表")
-            self._recheck_torrents[downloader] = []
+                # 已从下载器中删除的任务不再检查
+                self._journal.remove(set(recheck_torrents).difference(exist_torrents))
 
-        self._is_recheck_running = False
+                if can_seeding_torrents:
+                    logger.info(f"共 {len(can_seeding_torrents)} 个任务校验完成，开始做种")
+                    # 开始做种
+                    downloader_obj.start_torrents(ids=can_seeding_torrents)
+                    # 删除源种子
+                    if self._deletesource:
+                        self._journal.update(can_seeding_torrents, TransferJournal.STARTED)
+                        self.__delete_source(can_seeding_torrents, self.__get_downloader(self._fromdownloader))
+                    else:
+                        # 不需要删除源任务，转移完成
+                        self._journal.remove(can_seeding_torrents)
+                else:
+                    logger.info(f"没有新的任务校验完成，将在下次个周期继续检查 ...")
+            else:
+                logger.info(f"下载器 {downloader} 中没有需要检查的校验任务，清空待处理列表")
+                self._journal.remove(recheck_torrents)
+        finally:
+            self._is_recheck_running = False
 
     @staticmethod
     def __get_hash(torrent: Any, dl_type: str):
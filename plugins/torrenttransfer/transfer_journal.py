@@ -0,0 +1,122 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+from app.log import logger
+
+
+class TransferJournal:
+    """
+    转移做种日志，持久化记录每个种子的转移阶段，转移中断后下次运行从中断处继续，
+    已添加的任务不会重复添加和校验，待检查的校验任务在重启后也不会丢失，
+    任务按当前设置转移完成后即移除记录，日志中只保留处理中的任务
+    - queued：已加入转移队列
+    - added：已添加到目的下载器
+    - rechecking：已开始校验，等待校验完成后做种
+    - started：已开始做种，等待删除源下载器任务
+    - source_deleted：已删除源下载器任务，仅用于清理旧版本记录
+    """
+
+    QUEUED = "queued"
+    ADDED = "added"
+    RECHECKING = "rechecking"
+    STARTED = "started"
+    SOURCE_DELETED = "source_deleted"
+
+    def __init__(self, db_path: Union[str, Path]):
+        self._db_path = str(db_path)
+        self._lock = threading.RLock()
+        self.__init_db()
+
+    def __connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def __init_db(self):
+        with self._lock:
+            conn = self.__connect()
+            try:
+                with conn:
+                    conn.execute("""
+                        CREATE TABLE IF NOT EXISTS transfer_journal (
+                            hash TEXT PRIMARY KEY,
+                            from_downloader TEXT NOT NULL,
+                            to_downloader TEXT NOT NULL,
+                            stage TEXT NOT NULL,
+                            updated_at REAL NOT NULL
+                        )""")
+                    conn.execute("""
+                        CREATE INDEX IF NOT EXISTS transfer_journal_stage
+                        ON transfer_journal (to_downloader, stage)""")
+            finally:
+                conn.close()
+
+    def get_stages(self, from_downloader: str, to_downloader: str) -> Dict[str, str]:
+        """
+        获取指定转移方向上所有种子的阶段，hash -> 阶段
+        """
+        with self._lock:
+            conn = self.__connect()
+            try:
+                return {hash_str: stage for hash_str, stage in conn.execute(
+                    "SELECT hash, stage FROM transfer_journal WHERE from_downloader = ? AND to_downloader = ?",
+                    (from_downloader, to_downloader))}
+            finally:
+                conn.close()
+
+    def get_hashes(self, to_downloader: str, stage: str, from_downloader: Optional[str] = None) -> List[str]:
+        """
+        获取处于指定阶段的种子hash
+        """
+        sql = "SELECT hash FROM transfer_journal WHERE to_downloader = ? AND stage = ?"
+        params = [to_downloader, stage]
+        if from_downloader:
+            sql += " AND from_downloader = ?"
+            params.append(from_downloader)
+        with self._lock:
+            conn = self.__connect()
+            try:
+                return [hash_str for hash_str, in conn.execute(sql, params)]
+            finally:
+                conn.close()
+
+    def add(self, hashes: Iterable[str], from_downloader: str, to_downloader: str):
+        """
+        将种子加入转移队列，立即写入
+        """
+        now = time.time()
+        rows = [(hash_str, from_downloader, to_downloader, self.QUEUED, now) for hash_str in hashes if hash_str]
+        self.__execute("INSERT OR REPLACE INTO transfer_journal "
+                       "(hash, from_downloader, to_downloader, stage, updated_at) "
+                       "VALUES (?, ?, ?, ?, ?)", rows)
+
+    def update(self, hashes: Iterable[str], stage: str):
+        """
+        批量更新种子的转移阶段，立即写入
+        """
+        now = time.time()
+        self.__execute("UPDATE transfer_journal SET stage = ?, updated_at = ? WHERE hash = ?",
+                       [(stage, now, hash_str) for hash_str in hashes if hash_str])
+
+    def remove(self, hashes: Iterable[str]):
+        """
+        移除种子的转移记录
+        """
+        self.__execute("DELETE FROM transfer_journal WHERE hash = ?",
+                       [(hash_str,) for hash_str in hashes if hash_str])
+
+    def __execute(self, sql: str, rows: list):
+        if not rows:
+            return
+        with self._lock:
+            conn = self.__connect()
+            try:
+                with conn:
+                    conn.executemany(sql, rows)
+            except Exception as e:
+                logger.error(f"转移做种日志保存失败：{str(e)}")
+            finally:
+                conn.close()